@@ -0,0 +1,37 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.data import LEUKEMIA_STATS, PARAMETER_N, PARAMETER_N_CONSTANT
+from mmb.figures import turnover_ranking
+from mmb.turnover import compare_curves, family_grid, knot_curve
+
+# Exponenciální a logistické poklesy obnovy buněk
+exponential_curves, exponential_labels = family_grid(
+    'exponential', rate=np.linspace(0.01, 0.15, 57), onset=np.arange(20, 61, 5))
+logistic_curves, logistic_labels = family_grid(
+    'logistic', n_old=np.geomspace(1e11, 1e13, 10), midpoint=np.arange(40, 91, 5), width=[5, 10, 15, 20])
+
+# Spliny přes uzly ve věku 35, 60 a 95 let (před 35 lety je obnova konstantní)
+knot_ages = [5, 35, 60, 95]
+middle, end = np.meshgrid(np.geomspace(1e12, 4.2e13, 15), np.geomspace(1e11, 4.2e13, 15), indexing='ij')
+young = np.full(middle.size, PARAMETER_N_CONSTANT)
+knot_values = np.column_stack([young, young, middle.ravel(), end.ravel()])
+spline_curves = knot_curve(knot_values, knot_ages)
+spline_labels = [f'spline(n60={m:.3g}, n95={e:.3g})' for m, e in zip(middle.ravel(), end.ravel())]
+
+# Všechny křivky (a křivky z leukemia_2) v jednom dávkovém průchodu modelem
+curves = np.concatenate([exponential_curves, logistic_curves, spline_curves,
+                         [PARAMETER_N, np.full(len(PARAMETER_N), PARAMETER_N_CONSTANT)]])
+labels = (exponential_labels + logistic_labels + spline_labels
+          + ['with turnover reduction', 'without turnover reduction'])
+comparison = compare_curves(curves, LEUKEMIA_STATS, labels)
+print(comparison.format(10))
+turnover_ranking(LEUKEMIA_STATS, 'Leukaemia', comparison)
+
+# Zobrazení grafu
+plt.show()
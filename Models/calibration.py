@@ -0,0 +1,28 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.data import CANCERSTATS, LEUKEMIA_STATS
+from mmb.fit import fit
+
+# Pozorovaná data, pro která se hledají nejlépe padnoucí parametry
+datasets = {
+    'Cancerstats (all cancers)': CANCERSTATS,
+    'Cancerstats (leukaemia)': LEUKEMIA_STATS,
+}
+
+# Kalibrace modelu pro každou sadu dat a výpis výsledků
+if __name__ == '__main__':
+    for name, observed in datasets.items():
+        result = fit(observed)
+
+        # Parametry na mezi prohledávaného rozsahu data neurčují
+        bound = {name: ' (at bound)' if value else '' for name, value in result.at_bound.items()}
+        print(name)
+        print(f'  q = {result.q}{bound["q"]}')
+        print(f'  p_c = {result.p_c:.3e}{bound["log10_p_c"]}')
+        print(f'  generation = {result.generation_offset:.3f}{bound["generation_offset"]} + '
+              f'{result.generation_slope:.3f}{bound["generation_slope"]} * (G - G_0)')
+        print(f'  SSE = {result.loss:.4f}, R² = {result.r2:.4f}')
@@ -0,0 +1,21 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.data import CANCERSTATS, LEUKEMIA_STATS
+from mmb.mixture import fit_mixture
+
+# Kalibrované varianty: jen rozptyl q a rozptyl q, p_c i n současně
+variants = [('rozptyl q', {'log10_p_c_sd': 0.0, 'log_n_sd': 0.0}), ('rozptyl q, p_c a n', None)]
+
+
+# Kalibrace rozdělení q, p_c a n v populaci pro rakovinu a leukémii
+if __name__ == '__main__':
+    for disease, observed in (('Cancer', CANCERSTATS), ('Leukaemia', LEUKEMIA_STATS)):
+        for title, fixed in variants:
+            result = fit_mixture(observed, fixed=fixed)
+            parameters = ', '.join(f'{name} = {value:.4g}' for name, value in result.parameters.items())
+            print(f'{disease} ({title}): R² = {result.r2:.4f}')
+            print(f'  {parameters}')
@@ -0,0 +1,35 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+import matplotlib.pyplot as plt
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.simulation import simulate
+
+# Počet simulovaných jedinců
+n_individuals = 10_000_000
+
+if __name__ == '__main__':
+
+    # Simulace výskytu rakoviny s výchozími parametry modelu
+    result = simulate(n_individuals, workers=None)
+
+    # Vytvoření grafu
+    plt.figure(figsize=(10, 6))
+
+    # Vykreslení empirického výskytu s intervalem spolehlivosti a analytického modelu
+    plt.fill_between(result.age_groups, result.lower, result.upper, color='red', alpha=0.3,
+                     label='95% confidence band')
+    plt.plot(result.age_groups, result.p_cancer_year, label='Monte Carlo', marker='o', color='red')
+    plt.plot(result.age_groups, result.analytic, label='Analytic model', linestyle='--', color='black')
+
+    # Přidání názvů a legendy
+    plt.xlabel('Age')
+    plt.ylabel('Cancer probability/year')
+    plt.title(f'Monte Carlo simulation of {n_individuals:,} individuals')
+    plt.yscale('log')
+    plt.legend()
+
+    # Zobrazení grafu
+    plt.show()
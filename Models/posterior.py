@@ -0,0 +1,39 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.bayes import PARAMETERS, posterior_predictive, sample_posterior
+from mmb.data import CANCERSTATS, LEUKEMIA_STATS
+from mmb.figures import q_comparison, turnover_comparison
+
+# Velikost populace v jedné věkové skupině, ke které se vztahují pozorované podíly
+population = 100_000
+
+
+# Definice funkce pro výpis souhrnu aposteriorního rozdělení
+def print_summary(title, result):
+    print(f'{title}: {result.samples.shape[0]} řetězců × {result.samples.shape[1]} vzorků, '
+          f'míra přijetí {result.acceptance.mean():.2f}')
+    print(f'{"parametr":<20}{"5 %":>12}{"medián":>12}{"95 %":>12}{"R-hat":>8}')
+    quantiles = result.quantiles()
+    for name, rhat in zip(PARAMETERS, result.rhat):
+        lower, median, upper = quantiles[name]
+        print(f'{name:<20}{lower:>12.4g}{median:>12.4g}{upper:>12.4g}{rhat:>8.3f}')
+    print()
+
+
+# Aposteriorní rozdělení parametrů a prediktivní pásma v grafech 3a a leukemia_2
+if __name__ == '__main__':
+    cancer = sample_posterior(CANCERSTATS, population, workers=None)
+    print_summary('Cancer', cancer)
+    q_comparison(CANCERSTATS, 'Cancer', band=posterior_predictive(cancer))
+
+    leukemia = sample_posterior(LEUKEMIA_STATS, population, workers=None)
+    print_summary('Leukaemia', leukemia)
+    turnover_comparison(LEUKEMIA_STATS, 'Leukaemia', r2_interval=True,
+                        band=posterior_predictive(leukemia))
+    plt.show()
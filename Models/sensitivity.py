@@ -0,0 +1,33 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.sensitivity import morris_effects, sobol_indices
+
+# Výstupy, pro které se vypíšou indexy (věkové skupiny a R²)
+shown_outputs = [5, 25, 50, 75, 95, 'r2']
+
+
+# Definice funkce pro výpis tabulky hodnot pro faktory
+def print_table(title, factors, outputs, values):
+    print(title)
+    print(f'{"výstup":>8}' + ''.join(f'{name:>18}' for name in factors))
+    for output in shown_outputs:
+        row = values[outputs.index(output)]
+        print(f'{output:>8}' + ''.join(f'{value:>18.3f}' for value in row))
+    print()
+
+
+# Sobolovy indexy a Morrisovy efekty pro predikce P(cancer)/5 let a pro R²
+if __name__ == '__main__':
+    sobol = sobol_indices(2 ** 15, workers=None)
+    print(f'Sobolovy indexy ({sobol.evaluations} vyhodnocení modelu)')
+    print_table('Indexy prvního řádu S_i', sobol.factors, sobol.outputs, sobol.first_order)
+    print_table('Celkové indexy S_Ti', sobol.factors, sobol.outputs, sobol.total)
+
+    morris = morris_effects(5000, workers=None)
+    print(f'Morrisovy elementární efekty ({morris.evaluations} vyhodnocení modelu)')
+    print_table('mu* (průměr absolutních efektů)', morris.factors, morris.outputs, morris.mu_star)
+    print_table('sigma (směrodatná odchylka efektů)', morris.factors, morris.outputs, morris.sigma)
@@ -0,0 +1,32 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.model import AdaptiveModel
+from mmb.slopes import log_slopes
+
+# Mřížka prahů q a pravděpodobností p_c
+q_values = np.arange(100, 141, 5)
+p_c_values = np.geomspace(1e-20, 1e-16, 5)
+
+
+# Sklon v nejlepším věkovém okně pro všechny kombinace q a p_c jedním dávkovým výpočtem
+if __name__ == '__main__':
+    q, p_c = np.meshgrid(q_values, p_c_values, indexing='ij')
+    model = AdaptiveModel().evaluate(p_c=p_c, q=q)
+    analysis = log_slopes(model.p_cancer_year)
+    ages = analysis.best_ages
+
+    print('Sklon log(P(cancer)/rok) proti log(věk) v nejlepším okně (věk od-do, R²)')
+    print(f'{"q":>5}' + ''.join(f'{f"p_c = {value:.0e}":>24}' for value in p_c_values))
+    for i, q_value in enumerate(q_values):
+
+        # Křivky bez platného okna (nasycené nebo ploché) se vypíšou jako pomlčka
+        cells = ('-' if np.isnan(analysis.best_r2[i, j]) else
+                 f'{analysis.best_slope[i, j]:.2f} ({ages[i, j, 0]:.0f}-{ages[i, j, 1]:.0f}, '
+                 f'{analysis.best_r2[i, j]:.3f})' for j in range(len(p_c_values)))
+        print(f'{q_value:>5}' + ''.join(f'{cell:>24}' for cell in cells))
@@ -0,0 +1,23 @@
+# Načtení knihoven
+import sys
+from pathlib import Path
+
+# Zpřístupnění balíčku mmb z kořenového adresáře repozitáře
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from mmb.incremental import ModelTable
+
+# Násobek počtu obnov buněk v jedné věkové skupině
+factor = 0.5
+
+
+# Vliv poloviční obnovy buněk v každé věkové skupině zvlášť na R² a celoživotní riziko
+# (po každé změně se přepočítá jen jedna skupina a kumulativní riziko od ní dál)
+if __name__ == '__main__':
+    table = ModelTable()
+    r2, lifetime = table.r2, table['cumulative_risk'][-1]
+    print(f'Výchozí model: R² = {r2:.4f}, celoživotní riziko = {lifetime:.2f} %')
+    print(f'{"věk":>5}{"ΔR²":>12}{"Δ riziko (%)":>16}')
+    for row, age in enumerate(table['age_groups']):
+        with table.override('parameter_n', table['parameter_n'][row] * factor, rows=row):
+            print(f'{age:>5.0f}{table.r2 - r2:>12.4f}{table["cumulative_risk"][-1] - lifetime:>16.3f}')
+    print(f'Přepočítané řádky: {dict(table.evaluations)}')
@@ -0,0 +1,36 @@
+# Společné jádro modelů výskytu rakoviny v závislosti na věku
+#
+# Jména z __all__ se načítají líně (PEP 562), takže import balíčku nebo příkaz mmb
+# nenačítá NumPy, dokud ho podpříkaz nepotřebuje.
+
+# Jméno -> modul, ze kterého se při prvním použití načte
+_EXPORTS = {
+    'r2_score': 'mmb.metrics',
+    'AdaptiveModel': 'mmb.model',
+    'ModelJacobian': 'mmb.model',
+    'ModelResult': 'mmb.model',
+    'evaluate': 'mmb.model',
+    'scale_generation': 'mmb.model',
+    'compute_pa': 'mmb.poisson',
+    'log_poisson_pmf': 'mmb.poisson',
+    'log_poisson_tail': 'mmb.poisson',
+    'poisson_pmf': 'mmb.poisson',
+    'TailTable': 'mmb.tail_table',
+}
+
+__all__ = list(_EXPORTS)
+
+
+# Definice funkce pro líné načtení jména z __all__
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+# Definice funkce pro seznam jmen balíčku (včetně dosud nenačtených)
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,4 @@
+# Spuštění rozhraní příkazové řádky přes python -m mmb
+from mmb.cli import main
+
+main()
@@ -0,0 +1,224 @@
+# Načtení knihoven
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal, localcontext
+
+import numpy as np
+
+from mmb import reference
+from mmb.poisson import log_poisson_tail
+from mmb.tail_table import TailTable
+
+# Porovnání rychlého výpočtu p_accumulative s referenčním výpočtem v Decimal.
+#
+# Rovina (q, λ) se rozdělí na buňky s logaritmicky rovnoměrnými hranicemi a
+# v každé buňce se náhodně vybere několik bodů. Pro každý bod se spočítá
+# referenční hodnota mmb.reference.compute_pa s přesností zvolenou podle
+# velikosti chvostu (reference.required_precision), takže reference zůstane
+# přesná i tam, kde 50 platných číslic nestačí. Referenční výpočty běží
+# v pracovních procesech. Relativní chyba se počítá v Decimal z logaritmu
+# chvostu, takže jde ověřit i výsledky, které by ve float64 podtekly k nule.
+# Výsledkem je mapa největší relativní chyby pro každou buňku.
+
+
+# Definice funkce pro rychlý výpočet přes tabulku chvostů
+def _table_log_tail(q, lambd):
+    table = TailTable(lambd, int(q.max()), int(q.min()))
+    return table.log_tail[q - table.q_min, np.arange(len(lambd))]
+
+
+# Porovnávané rychlé výpočty log P(X > q) pro pole bodů (q, λ)
+ENGINES = {
+    'series': log_poisson_tail,
+    'table': _table_log_tail,
+}
+
+
+# Definice výsledku porovnání
+@dataclass
+class AccuracyReport:
+
+    """
+    Třída s mapou největší relativní chyby rychlého výpočtu vůči referenci.
+
+    Atributy:
+        engine (str): Název rychlého výpočtu z ENGINES.
+        q_edges (ndarray): Hranice buněk v q, tvar (Q + 1,).
+        lambda_edges (ndarray): Hranice buněk v λ, tvar (L + 1,).
+        max_error (ndarray): Největší relativní chyba v buňce, tvar (Q, L).
+        q (ndarray): Prahy q testovaných bodů.
+        lambd (ndarray): Hodnoty λ testovaných bodů.
+        error (ndarray): Relativní chyba v testovaných bodech.
+        digits (ndarray): Přesnost (počet číslic) reference v testovaných bodech.
+    """
+
+    engine: str
+    q_edges: np.ndarray
+    lambda_edges: np.ndarray
+    max_error: np.ndarray
+    q: np.ndarray
+    lambd: np.ndarray
+    error: np.ndarray
+    digits: np.ndarray
+
+    def worst(self, count=5):
+
+        """
+        Funkce pro výběr bodů s největší relativní chybou.
+
+        Parametry:
+            count (int): Počet bodů.
+
+        Návratová hodnota:
+            list: Trojice (q, λ, relativní chyba) seřazené sestupně podle chyby.
+        """
+
+        order = np.argsort(-np.nan_to_num(self.error, nan=np.inf))[:count]
+        return [(int(self.q[i]), float(self.lambd[i]), float(self.error[i])) for i in order]
+
+    def format(self):
+
+        """
+        Funkce pro převod mapy chyb na textovou tabulku (řádky q, sloupce λ, hodnoty log10 chyby).
+
+        Návratová hodnota:
+            str: Tabulka jako text.
+        """
+
+        with np.errstate(divide='ignore'):
+            log_error = np.log10(self.max_error)
+        header = 'q \\ λ'.ljust(14) + ''.join(f'{edge:>9.3g}' for edge in self.lambda_edges[:-1])
+        lines = [f'{self.engine}: max log10(relativní chyba)', header]
+        for i, row in enumerate(log_error):
+            cells = ''.join('      nan' if np.isnan(value) else f'{value:>9.1f}' for value in row)
+            lines.append(f'{self.q_edges[i]:>6.0f}-{self.q_edges[i + 1]:<6.0f} ' + cells)
+        return '\n'.join(lines)
+
+
+# Definice funkce pro výběr testovaných bodů
+def sample_points(q_range=(0, 10_000), lambda_range=(1e-2, 1e4), cells=(8, 8), per_cell=2, seed=0):
+
+    """
+    Funkce pro náhodný výběr bodů (q, λ) v buňkách s logaritmicky rovnoměrnými hranicemi.
+
+    Parametry:
+        q_range (tuple): Rozsah prahů q (včetně mezí).
+        lambda_range (tuple): Rozsah λ.
+        cells (tuple): Počet buněk v q a v λ.
+        per_cell (int): Počet bodů v každé buňce.
+        seed (int): Semínko generátoru náhodných čísel.
+
+    Návratová hodnota:
+        tuple: Hranice buněk v q a v λ, prahy q, hodnoty λ a index buňky (i_q, i_λ) každého bodu.
+    """
+
+    rng = np.random.default_rng(seed)
+    q_edges = np.expm1(np.linspace(np.log1p(q_range[0]), np.log1p(q_range[1] + 1), cells[0] + 1))
+    lambda_edges = np.geomspace(lambda_range[0], lambda_range[1], cells[1] + 1)
+    iq, il = np.divmod(np.repeat(np.arange(cells[0] * cells[1]), per_cell), cells[1])
+
+    # Body rovnoměrně v log(q + 1) a log λ uvnitř buňky
+    u = rng.random((2, len(iq)))
+    log_q = np.log1p(q_edges[iq]) + u[0] * (np.log1p(q_edges[iq + 1]) - np.log1p(q_edges[iq]))
+    q = np.clip(np.floor(np.expm1(log_q)), q_range[0], q_range[1]).astype(np.int64)
+    lambd = np.exp(np.log(lambda_edges[il]) + u[1] * np.log(lambda_edges[il + 1] / lambda_edges[il]))
+    return q_edges, lambda_edges, q, lambd, iq, il
+
+
+# Funkce spouštěná v pracovním procesu: relativní chyba v jednom bodě
+def _reference_error(q, lambd, log_fast, guard, max_digits):
+    digits = reference.required_precision(q, lambd, guard)
+    if max_digits is not None and digits > max_digits:
+        return np.nan, digits
+    expected = reference.compute_pa(int(q), float(lambd), prec=digits)
+    if expected <= 0:
+        return (0.0 if log_fast == -np.inf else np.inf), digits
+    if not np.isfinite(log_fast):
+        return np.inf, digits
+    with localcontext() as ctx:
+        ctx.prec = guard
+        error = abs((Decimal(float(log_fast)) - expected.ln(ctx)).exp(ctx) - 1)
+    return float(error), digits
+
+
+# Definice funkce pro výpočet mapy chyb
+def accuracy_map(engine='series', q_range=(0, 10_000), lambda_range=(1e-2, 1e4), cells=(8, 8),
+                 per_cell=2, seed=0, guard=30, max_digits=None, workers=None):
+
+    """
+    Funkce pro porovnání rychlého výpočtu s referencí v Decimal na mřížce buněk (q, λ).
+
+    Parametry:
+        engine (str): Název rychlého výpočtu z ENGINES.
+        q_range (tuple): Rozsah prahů q.
+        lambda_range (tuple): Rozsah λ.
+        cells (tuple): Počet buněk v q a v λ.
+        per_cell (int): Počet náhodných bodů v každé buňce.
+        seed (int): Semínko generátoru náhodných čísel.
+        guard (int): Počet platných číslic reference po odečtení (viz reference.required_precision).
+        max_digits (int): Body, které by potřebovaly přesnější referenci, se vynechají (NaN).
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        AccuracyReport: Mapa největší relativní chyby a chyby v jednotlivých bodech.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f'Neznámý výpočet {engine!r}, podporované jsou {list(ENGINES)}')
+    q_edges, lambda_edges, q, lambd, iq, il = sample_points(q_range, lambda_range, cells, per_cell,
+                                                            seed)
+    log_fast = ENGINES[engine](q, lambd)
+
+    # Nejdražší body (vysoká přesnost, mnoho členů) se odesílají první kvůli vyrovnání zátěže
+    cost = np.array([reference.required_precision(qi, li, guard) for qi, li in zip(q, lambd)]) * (q + 1)
+    order = np.argsort(-cost)
+    arguments = (q[order], lambd[order], log_fast[order], [guard] * len(q), [max_digits] * len(q))
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        results = list(map(_reference_error, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_reference_error, *arguments))
+
+    error, digits = np.empty(len(q)), np.empty(len(q), dtype=np.int64)
+    error[order], digits[order] = np.array(results).T
+    max_error = np.full(cells, np.nan)
+    for i, j, value in zip(iq, il, error):
+        if not np.isnan(value):
+            max_error[i, j] = np.fmax(max_error[i, j], value)
+    return AccuracyReport(engine=engine, q_edges=q_edges, lambda_edges=lambda_edges,
+                          max_error=max_error, q=q, lambd=lambd, error=error, digits=digits)
+
+
+# Definice funkce pro spuštění z příkazové řádky (python -m mmb.accuracy)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Porovnání rychlého výpočtu p_a s referencí v Decimal.')
+    parser.add_argument('--engine', choices=list(ENGINES), default='series', help='rychlý výpočet')
+    parser.add_argument('--q-max', type=int, default=10_000, help='největší práh q')
+    parser.add_argument('--lambda-max', type=float, default=1e4, help='největší λ')
+    parser.add_argument('--cells', type=int, nargs=2, default=(8, 8), help='počet buněk v q a v λ')
+    parser.add_argument('--per-cell', type=int, default=2, help='počet bodů v buňce')
+    parser.add_argument('--max-digits', type=int, default=None,
+                        help='vynechat body, které potřebují přesnější referenci')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='počet pracovních procesů (0 = bez procesů)')
+    args = parser.parse_args(argv)
+
+    # Použitý rozsah modelu a celý rozsah až po q, λ = 10^4
+    ranges = [('použitý rozsah', (80, 200), (40.0, 60.0), (4, 4)),
+              ('celý rozsah', (0, args.q_max), (1e-2, args.lambda_max), tuple(args.cells))]
+    for title, q_range, lambda_range, cells in ranges:
+        report = accuracy_map(args.engine, q_range, lambda_range, cells, args.per_cell,
+                              max_digits=args.max_digits, workers=args.workers)
+        print(f'== {title}: q {q_range[0]}..{q_range[1]}, λ {lambda_range[0]:g}..{lambda_range[1]:g}')
+        print(report.format())
+        print(f'Největší relativní chyba: {np.nanmax(report.error):.3e}')
+        for q, lambd, error in report.worst(3):
+            print(f'  q = {q}, λ = {lambd:.6g}: {error:.3e}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
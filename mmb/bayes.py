@@ -0,0 +1,382 @@
+# Načtení knihoven
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from math import lgamma
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N
+from mmb.fit import BOUNDS, fit, generation_curve
+from mmb.model import evaluate
+from mmb.poisson import log_poisson_tail
+
+# Bayesovské odvození parametrů q, p_c a křivky generation metodou MCMC.
+#
+# Pozorovaný výskyt P(cancer)/5 let (%) se převede na počty případů k_a v
+# populaci velikosti N_a pro každou věkovou skupinu a věrohodnost je
+#
+#   binomická:  k_a ~ Binomial(N_a, p_a),    Poissonova:  k_a ~ Poisson(N_a p_a),
+#
+# kde p_a = P(cancer)/5 let / 100 z modelu. Parametry jsou θ = (q, log10 p_c,
+# posun generation, sklon generation) s rovnoměrným apriorním rozdělením na
+# mezích (q celé číslo, ostatní meze jako v mmb.fit). Vzorkuje se adaptivní
+# Metropolisovou metodou s náhodnou procházkou: během zahřívací fáze se kovariance
+# návrhu odhaduje z dosavadních vzorků, potom je pevná. Návrh pro q se zaokrouhlí
+# na celé číslo, což zachová jeho symetrii.
+#
+# Řetězce se rozdělí mezi pracovní procesy a každý proces posouvá všechny své
+# řetězce najednou: jedna iterace je jedno dávkové vyhodnocení log-věrohodnosti
+# pro všechny řetězce. Mezivýsledky se zapisují do předem alokovaných polí
+# (parametr out), nová pole vznikají jen při výpočtu chvostu Poissonova rozdělení.
+
+# Názvy parametrů a meze apriorního rozdělení
+PARAMETERS = ('q', 'log10_p_c', 'generation_offset', 'generation_slope')
+Q_BOUNDS = (80, 200)
+
+# Podporované věrohodnosti
+LIKELIHOODS = ('binomial', 'poisson')
+
+
+# Definice výsledku vzorkování
+@dataclass
+class PosteriorResult:
+
+    """
+    Třída se vzorky z aposteriorního rozdělení.
+
+    Atributy:
+        samples (ndarray): Vzorky parametrů, tvar (řetězce, vzorky, 4), pořadí podle PARAMETERS.
+        log_posterior (ndarray): Logaritmus aposteriorní hustoty vzorků, tvar (řetězce, vzorky).
+        acceptance (ndarray): Podíl přijatých návrhů v každém řetězci po zahřívací fázi.
+        rhat (ndarray): Dělená statistika R-hat (Gelman-Rubin) pro každý parametr.
+        population (ndarray): Velikost populace pro každou věkovou skupinu.
+        likelihood (str): Použitá věrohodnost.
+    """
+
+    samples: np.ndarray
+    log_posterior: np.ndarray
+    acceptance: np.ndarray
+    rhat: np.ndarray
+    population: np.ndarray
+    likelihood: str
+
+    @property
+    def flat(self):
+        return self.samples.reshape(-1, self.samples.shape[-1])
+
+    def quantiles(self, probabilities=(0.05, 0.5, 0.95)):
+
+        """
+        Funkce pro kvantily aposteriorního rozdělení každého parametru.
+
+        Parametry:
+            probabilities (sequence): Požadované pravděpodobnosti.
+
+        Návratová hodnota:
+            dict: Kvantily pro každý parametr z PARAMETERS.
+        """
+
+        values = np.quantile(self.flat, probabilities, axis=0)
+        return {name: values[:, i] for i, name in enumerate(PARAMETERS)}
+
+
+# Definice pásma aposteriorní prediktivní distribuce
+@dataclass
+class PredictiveBand:
+
+    """
+    Třída s pásmem aposteriorní prediktivní distribuce pro P(cancer)/5 let (%).
+
+    Atributy:
+        age_groups (ndarray): Věkové skupiny, tvar (A,).
+        lower (ndarray): Dolní mez pásma, tvar (A,).
+        median (ndarray): Medián, tvar (A,).
+        upper (ndarray): Horní mez pásma, tvar (A,).
+        confidence (float): Pravděpodobnost pokrytí pásma.
+    """
+
+    age_groups: np.ndarray
+    lower: np.ndarray
+    median: np.ndarray
+    upper: np.ndarray
+    confidence: float
+
+
+# Definice log-věrohodnosti pro dávku řetězců
+class LogLikelihood:
+
+    """
+    Třída pro výpočet log-věrohodnosti pro pevný počet řetězců s předem alokovanými poli.
+
+    Atributy:
+        cases (ndarray): Pozorované počty případů, tvar (A,).
+        population (ndarray): Velikost populace, tvar (A,).
+        likelihood (str): 'binomial' nebo 'poisson'.
+    """
+
+    def __init__(self, observed, population, likelihood, walkers, generation=GENERATION,
+                 parameter_n=PARAMETER_N):
+        if likelihood not in LIKELIHOODS:
+            raise ValueError(f'Neznámá věrohodnost {likelihood!r}, podporované jsou {LIKELIHOODS}')
+        observed = np.asarray(observed, dtype=np.float64)
+        self.population = np.broadcast_to(np.asarray(population, dtype=np.float64), observed.shape)
+        self.cases = np.rint(observed / 100 * self.population)
+        self.likelihood = likelihood
+        generation = np.asarray(generation, dtype=np.float64)
+        self.generation_shift = generation - generation[0]
+        self.parameter_n = np.asarray(parameter_n, dtype=np.float64)
+
+        # Konstantní část log-věrohodnosti (nezávisí na parametrech)
+        if likelihood == 'binomial':
+            self.constant = sum(lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+                                for n, k in zip(self.population, self.cases))
+        else:
+            self.constant = sum(k * np.log(n) - lgamma(k + 1)
+                                for n, k in zip(self.population, self.cases))
+
+        # Pracovní pole pro všechny řetězce
+        shape = (walkers, len(observed))
+        self._generation = np.empty(shape)
+        self._p = np.empty(shape)
+        self._work = np.empty(shape)
+        self._sum = np.empty(walkers)
+
+    def __call__(self, theta):
+
+        """
+        Funkce pro výpočet log-věrohodnosti pro všechny řetězce najednou.
+
+        Parametry:
+            theta (ndarray): Parametry řetězců, tvar (K, 4), pořadí podle PARAMETERS.
+
+        Návratová hodnota:
+            ndarray: Log-věrohodnost, tvar (K,) (sdílené pracovní pole, přepíše ho další volání).
+        """
+
+        generation, p, work = self._generation, self._p, self._work
+
+        # Křivka generation a p_a = P(X > q)
+        np.multiply(theta[:, 3, None], self.generation_shift, out=generation)
+        generation += theta[:, 2, None]
+        np.exp(log_poisson_tail(theta[:, 0, None], generation), out=p)
+
+        # λ = n (p_c + p_a) a pravděpodobnost onemocnění za 5 let p = 5 (1 - exp(-λ))
+        p += 10.0 ** theta[:, 1, None]
+        p *= self.parameter_n
+        np.negative(p, out=p)
+        np.expm1(p, out=p)
+        p *= -5.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.likelihood == 'binomial':
+                # k log p + (N - k) log(1 - p); pro p ≥ 1 je věrohodnost nulová
+                np.log(p, out=work)
+                work *= self.cases
+                np.negative(p, out=p)
+                np.log1p(p, out=p)
+                p *= self.population - self.cases
+                work += p
+            else:
+                # k log p - N p (konstanta k log N - log k! je v self.constant)
+                np.log(p, out=work)
+                work *= self.cases
+                p *= self.population
+                work -= p
+            np.sum(work, axis=1, out=self._sum)
+        self._sum[np.isnan(self._sum)] = -np.inf
+        self._sum += self.constant
+        return self._sum
+
+
+# Definice funkce pro logaritmus apriorní hustoty (0 uvnitř mezí, jinak -inf)
+def _log_prior(theta, q_bounds):
+    inside = (theta[:, 0] >= q_bounds[0]) & (theta[:, 0] <= q_bounds[1])
+    inside &= np.all((theta[:, 1:] >= BOUNDS[:, 0]) & (theta[:, 1:] <= BOUNDS[:, 1]), axis=1)
+    return np.where(inside, 0.0, -np.inf)
+
+
+# Funkce spouštěná v pracovním procesu: vzorkování skupiny řetězců
+def _run_chains(start, profile, observed, population, likelihood, draws, warmup, thin, q_bounds,
+                seed):
+    rng = np.random.default_rng(seed)
+    walkers, dim = start.shape
+    log_likelihood = LogLikelihood(observed, population, likelihood, walkers)
+    theta = start.copy()
+    lower = np.concatenate([[q_bounds[0]], BOUNDS[:, 0]])
+    upper = np.concatenate([[q_bounds[1]], BOUNDS[:, 1]])
+    log_post = _log_prior(theta, q_bounds) + log_likelihood(theta)
+
+    # Počáteční kovariance návrhu spojitých parametrů a škálování podle optimální míry přijetí
+    covariance = np.diag([0.01, 0.05, 0.001]) ** 2
+    scale = 2.38 ** 2 / (dim - 1)
+    history = []
+
+    samples = np.empty((walkers, draws, dim))
+    log_posterior = np.empty((walkers, draws))
+    accepted = np.zeros(walkers)
+    for step in range(warmup + draws * thin):
+        # Střídají se dva kroky: náhodná procházka spojitých parametrů při pevném q a skok
+        # q -> q ± 1, 2, při kterém se spojité parametry posunou o rozdíl profilových optim.
+        # Posun závisí jen na dvojici (q, q'), takže je vratný a zachovává objem.
+        proposal = theta.copy()
+        continuous = step % 2 == 0
+        if continuous:
+            factor = np.linalg.cholesky(scale * covariance)
+            proposal[:, 1:] += rng.standard_normal((walkers, dim - 1)) @ factor.T
+        else:
+            proposal[:, 0] += rng.choice([-2, -1, 1, 2], walkers)
+            index = np.clip(proposal[:, :1].astype(np.int64) - q_bounds[0], 0, len(profile) - 1)
+            proposal[:, 1:] += profile[index[:, 0]] - profile[theta[:, 0].astype(np.int64) - q_bounds[0]]
+
+        # Návrhy mimo meze mají nulovou apriorní hustotu; věrohodnost se pro ně počítá v mezích
+        log_post_new = _log_prior(proposal, q_bounds) + log_likelihood(np.clip(proposal, lower, upper))
+        with np.errstate(invalid='ignore'):
+            accept = np.log(rng.random(walkers)) < log_post_new - log_post
+        accept |= np.isneginf(log_post) & np.isfinite(log_post_new)
+        theta[accept], log_post[accept] = proposal[accept], log_post_new[accept]
+
+        if step < warmup:
+            # Adaptace kovariance ze vzorků zahřívací fáze (posunutých na společné q)
+            # a úprava škálování podle míry přijetí
+            if continuous:
+                history.append(theta[:, 1:] - profile[theta[:, 0].astype(np.int64) - q_bounds[0]])
+                scale *= np.exp((accept.mean() - 0.234) / np.sqrt(len(history)))
+                if len(history) % 50 == 0:
+                    recent = np.concatenate(history[len(history) // 2:])
+                    covariance = np.cov(recent, rowvar=False) + 1e-10 * np.eye(dim - 1)
+        else:
+            accepted += accept
+            index, keep = divmod(step - warmup, thin)
+            if keep == thin - 1:
+                samples[:, index] = theta
+                log_posterior[:, index] = log_post
+    return samples, log_posterior, accepted / (draws * thin)
+
+
+# Definice funkce pro dělenou statistiku R-hat
+def split_rhat(samples):
+
+    """
+    Funkce pro výpočet dělené statistiky R-hat (Gelman-Rubin) pro každý parametr.
+
+    Parametry:
+        samples (ndarray): Vzorky, tvar (řetězce, vzorky, parametry).
+
+    Návratová hodnota:
+        ndarray: R-hat pro každý parametr (hodnoty blízké 1 značí shodu řetězců).
+    """
+
+    half = samples.shape[1] // 2
+    chains = np.concatenate([samples[:, :half], samples[:, half:2 * half]])
+    within = chains.var(axis=1, ddof=1).mean(axis=0)
+    between = half * chains.mean(axis=1).var(axis=0, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (half - 1) / half * within + between / half
+        return np.sqrt(variance / within)
+
+
+# Definice funkce pro vzorkování z aposteriorního rozdělení
+def sample_posterior(observed, population=100_000, likelihood='binomial', chains=8, draws=2000,
+                     warmup=2000, thin=1, calibration=None, q_bounds=Q_BOUNDS, seed=0, workers=None):
+
+    """
+    Funkce pro vzorkování parametrů (q, log10 p_c, posun a sklon generation) metodou MCMC.
+
+    Parametry:
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,).
+        population (array-like): Velikost populace v každé věkové skupině (číslo nebo tvar (A,)).
+        likelihood (str): 'binomial' nebo 'poisson'.
+        chains (int): Počet řetězců.
+        draws (int): Počet uložených vzorků na řetězec.
+        warmup (int): Počet kroků zahřívací fáze (adaptace návrhu, vzorky se neukládají).
+        thin (int): Ukládá se každý thin-tý vzorek.
+        calibration (FitResult): Výsledek mmb.fit.fit pro všechna q v q_bounds (profil optim
+            určuje skoky v q a počáteční body; None = spočítá se).
+        q_bounds (tuple): Meze apriorního rozdělení q.
+        seed (int): Semínko generátoru náhodných čísel.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        PosteriorResult: Vzorky všech řetězců a diagnostika.
+    """
+
+    if likelihood not in LIKELIHOODS:
+        raise ValueError(f'Neznámá věrohodnost {likelihood!r}, podporované jsou {LIKELIHOODS}')
+    observed = np.asarray(observed, dtype=np.float64)
+    population = np.broadcast_to(np.asarray(population, dtype=np.float64), observed.shape)
+    if calibration is None:
+        calibration = fit(observed, q_values=range(q_bounds[0], q_bounds[1] + 1), workers=workers)
+    if not np.array_equal(calibration.q_values, np.arange(q_bounds[0], q_bounds[1] + 1)):
+        raise ValueError('Kalibrace musí obsahovat profil pro všechna q v q_bounds')
+    profile = calibration.profile_theta
+
+    # Počáteční body v profilových optimech pro q rozptýlená kolem nejlepšího q
+    rng = np.random.default_rng(seed)
+    q = np.clip(calibration.q + np.rint(rng.normal(0, 2.0, chains)), *q_bounds)
+    starts = np.column_stack([q, profile[q.astype(np.int64) - q_bounds[0]]])
+
+    workers = os.cpu_count() if workers is None else workers
+    groups = np.array_split(starts, max(min(workers, chains), 1))
+    seeds = np.random.SeedSequence(seed).spawn(len(groups))
+    arguments = (groups, [profile] * len(groups), [observed] * len(groups), [population] * len(groups),
+                 [likelihood] * len(groups), [draws] * len(groups), [warmup] * len(groups),
+                 [thin] * len(groups), [q_bounds] * len(groups), seeds)
+    if workers <= 1:
+        parts = list(map(_run_chains, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+            parts = list(executor.map(_run_chains, *arguments))
+
+    samples = np.concatenate([part[0] for part in parts])
+    return PosteriorResult(
+        samples=samples,
+        log_posterior=np.concatenate([part[1] for part in parts]),
+        acceptance=np.concatenate([part[2] for part in parts]),
+        rhat=split_rhat(samples),
+        population=population,
+        likelihood=likelihood,
+    )
+
+
+# Definice funkce pro aposteriorní prediktivní pásmo
+def posterior_predictive(result, draws=1000, confidence=0.9, noise=True, seed=0,
+                         age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N):
+
+    """
+    Funkce pro pásmo aposteriorní prediktivní distribuce P(cancer)/5 let (%).
+
+    Parametry:
+        result (PosteriorResult): Výsledek sample_posterior.
+        draws (int): Počet vybraných aposteriorních vzorků.
+        confidence (float): Pravděpodobnost pokrytí pásma.
+        noise (bool): Zda přidat náhodnost počtů případů (jinak jen nejistota parametrů).
+        seed (int): Semínko generátoru náhodných čísel.
+        age_groups (array-like): Věkové skupiny.
+        generation (array-like): Výchozí křivka generation G.
+        parameter_n (array-like): Počet obnov buněk během jednoho roku.
+
+    Návratová hodnota:
+        PredictiveBand: Dolní mez, medián a horní mez pro každou věkovou skupinu.
+    """
+
+    rng = np.random.default_rng(seed)
+    theta = result.flat[rng.integers(0, len(result.flat), draws)]
+    curves = generation_curve(theta[:, 2], theta[:, 3], generation)
+    model = evaluate(age_groups, curves, parameter_n, 10.0 ** theta[:, 1], theta[:, 0])
+    predicted = model.p_cancer_5_years
+
+    # Simulace počtů případů ze stejné věrohodnosti, jaká byla použita při vzorkování
+    if noise:
+        p = np.clip(predicted / 100, 0.0, None)
+        population = result.population
+        if result.likelihood == 'binomial':
+            counts = rng.binomial(population.astype(np.int64), np.minimum(p, 1.0))
+        else:
+            counts = rng.poisson(population * p)
+        predicted = 100 * counts / population
+
+    alpha = (1 - confidence) / 2
+    lower, median, upper = np.quantile(predicted, [alpha, 0.5, 1 - alpha], axis=0)
+    return PredictiveBand(age_groups=np.asarray(age_groups), lower=lower, median=median, upper=upper,
+                          confidence=confidence)
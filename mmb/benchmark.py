@@ -0,0 +1,285 @@
+# Načtení knihoven
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Měření rychlosti jednotlivých částí výpočtu při několika velikostech úlohy.
+#
+# Každé měření je v tabulce BENCHMARKS zadáno funkcí, která pro danou velikost
+# připraví data a vrátí měřenou funkci bez parametrů, a seznamem velikostí.
+# Měřená funkce se volá opakovaně (počet volání se zvolí tak, aby jedno opakování
+# trvalo alespoň min_time) a ukládá se nejlepší a střední čas jednoho volání.
+# Výsledky se připisují jako řádky JSON do souboru historie, takže lze porovnat
+# běh s předchozími běhy na stejném stroji a odhalit zpomalení.
+
+# Výchozí soubor s historií měření
+HISTORY_FILE = Path(__file__).resolve().parents[1] / 'Benchmarks' / 'history.jsonl'
+
+
+# Příprava měření: rychlý výpočet p_accumulative pro pole hodnot λ
+def _poisson_compute_pa(size):
+    from mmb.poisson import compute_pa
+    lambd = np.linspace(40.0, 60.0, size)
+    return lambda: compute_pa(118, lambd)
+
+
+# Příprava měření: referenční výpočet p_accumulative v Decimal (size = počet volání)
+def _reference_compute_pa(size):
+    from mmb.reference import compute_pa
+    lambd = np.linspace(45.0, 55.0, size).tolist()
+    return lambda: [compute_pa(118, value) for value in lambd]
+
+
+# Příprava měření: referenční výpočet p_health (size = počet volání)
+def _reference_compute_phealth(size):
+    from mmb.data import PARAMETER_N, P_CONSTANT
+    from mmb.reference import compute_pa, compute_phealth
+    pa = compute_pa(118, 50.0)
+    parameter_n = np.resize(PARAMETER_N, size).tolist()
+    return lambda: [compute_phealth(n, P_CONSTANT, pa) for n in parameter_n]
+
+
+# Příprava měření: celý model pro 19 věkových skupin (size = počet sad parametrů)
+def _evaluate(size):
+    from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N
+    from mmb.model import evaluate
+    p_c = np.geomspace(1e-19, 1e-17, size)
+    return lambda: evaluate(AGE_GROUPS, GENERATION, PARAMETER_N, p_c, 118)
+
+
+# Příprava měření: prohledávání mřížky q × p_c (size = počet bodů mřížky)
+def _q_sweep(size):
+    from mmb.sweep import SweepGrid, evaluate_chunk
+    grid = SweepGrid(q=np.arange(80, 80 + max(size // 100, 1)), p_c=np.geomspace(1e-19, 1e-17, 100))
+    return lambda: evaluate_chunk(grid, 0, min(size, grid.size))
+
+
+# Příprava měření: kalibrace modelu (size = počet prahů q)
+def _fit(size):
+    from mmb.data import CANCERSTATS
+    from mmb.fit import fit
+    return lambda: fit(CANCERSTATS, q_values=range(118 - size // 2, 118 - size // 2 + size), workers=0)
+
+
+# Příprava měření: výskyt v heterogenní populaci (size = počet sad parametrů rozdělení)
+def _mixture(size):
+    from mmb.mixture import mixture_rates
+    q_sd = np.linspace(0.0, 20.0, size)
+    return lambda: mixture_rates(q_sd=q_sd, log10_p_c_sd=0.5, log_n_sd=0.2)
+
+
+# Příprava měření: adaptivní křivky P(x) pro mnoho hodnot p (size = počet hodnot p)
+def _division(size):
+    from mmb.division import adaptive_divisions
+    p = np.geomspace(1e-20, 1e-10, size)
+    return lambda: adaptive_divisions(p)
+
+
+# Příprava měření: vykreslení grafů do PNG (size = počet grafů)
+def _render(size):
+    from mmb import render
+    names = list(render.FIGURES)[:size]
+
+    # Dočasná složka pro každé volání, aby po měření nezůstaly vykreslené soubory
+    def run():
+        with tempfile.TemporaryDirectory() as output_dir:
+            render.render_all(names, output_dir, force=True, workers=0)
+    return run
+
+
+# Tabulka měření: název -> (příprava, velikosti úlohy)
+BENCHMARKS = {
+    'poisson.compute_pa': (_poisson_compute_pa, (1_000, 100_000, 1_000_000)),
+    'reference.compute_pa': (_reference_compute_pa, (1, 10, 100)),
+    'reference.compute_phealth': (_reference_compute_phealth, (19, 1_000, 100_000)),
+    'model.evaluate': (_evaluate, (1, 1_000, 100_000)),
+    'sweep.q_sweep': (_q_sweep, (1_000, 10_000, 100_000)),
+    'fit.fit': (_fit, (1, 5, 21)),
+    'mixture.rates': (_mixture, (1, 16, 256)),
+    'division.curves': (_division, (1, 100, 10_000)),
+    'render.figures': (_render, (1, 4, 10)),
+}
+
+
+# Definice funkce pro měření jedné funkce
+def time_function(function, repeat=5, min_time=0.2):
+
+    """
+    Funkce pro změření času jednoho volání funkce.
+
+    Parametry:
+        function (callable): Měřená funkce bez parametrů.
+        repeat (int): Počet opakování měření.
+        min_time (float): Nejkratší doba jednoho opakování v sekundách.
+
+    Návratová hodnota:
+        dict: Počet volání v opakování ('number') a nejlepší a střední čas jednoho volání v sekundách.
+    """
+
+    # Zahřátí a odhad počtu volání v jednom opakování
+    start = time.perf_counter()
+    function()
+    single = time.perf_counter() - start
+    number = max(1, int(min_time / max(single, 1e-9)))
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return {'number': number, 'best': min(times), 'median': float(np.median(times))}
+
+
+# Definice funkce pro popis prostředí měření
+def environment():
+
+    """
+    Funkce pro zjištění údajů o prostředí, ke kterým se měření vztahuje.
+
+    Návratová hodnota:
+        dict: Revize gitu, verze Pythonu a NumPy, stroj a počet jader.
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).resolve().parent,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.node(), 'processor': platform.machine(), 'cpus': os.cpu_count()}
+
+
+# Definice funkce pro spuštění měření
+def run_benchmarks(names=None, sizes=None, repeat=5, min_time=0.2, progress=None):
+
+    """
+    Funkce pro spuštění vybraných měření pro všechny jejich velikosti úlohy.
+
+    Parametry:
+        names (iterable): Názvy měření z tabulky BENCHMARKS (None = všechna).
+        sizes (str): 'small' (jen nejmenší velikost) nebo None (všechny velikosti).
+        repeat (int): Počet opakování měření.
+        min_time (float): Nejkratší doba jednoho opakování v sekundách.
+        progress (callable): Volitelná funkce progress(záznam) volaná po každém měření.
+
+    Návratová hodnota:
+        list: Záznamy měření (slovníky připravené k uložení do historie).
+    """
+
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f'Neznámá měření {unknown}, dostupná jsou {list(BENCHMARKS)}')
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    env = environment()
+
+    records = []
+    for name in names:
+        setup, benchmark_sizes = BENCHMARKS[name]
+        for size in benchmark_sizes[:1] if sizes == 'small' else benchmark_sizes:
+            record = {'timestamp': timestamp, 'benchmark': name, 'size': size, **env,
+                      **time_function(setup(size), repeat, min_time)}
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    return records
+
+
+# Definice funkce pro načtení historie měření
+def load_history(path=HISTORY_FILE):
+
+    """
+    Funkce pro načtení všech záznamů z historie měření.
+
+    Parametry:
+        path (str | Path): Soubor s historií (řádky JSON).
+
+    Návratová hodnota:
+        list: Záznamy měření v pořadí, ve kterém byly uloženy.
+    """
+
+    path = Path(path)
+    if not path.exists():
+        return []
+    with path.open(encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+# Definice funkce pro uložení záznamů do historie
+def append_history(records, path=HISTORY_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+# Definice funkce pro porovnání měření s historií
+def compare(records, history, threshold=1.25):
+
+    """
+    Funkce pro porovnání měření s nejlepším dřívějším výsledkem na stejném stroji.
+
+    Parametry:
+        records (list): Nové záznamy měření.
+        history (list): Dřívější záznamy z historie.
+        threshold (float): Poměr časů, od kterého se měření považuje za zpomalení.
+
+    Návratová hodnota:
+        list: Trojice (záznam, poměr k nejlepšímu dřívějšímu času nebo None, zpomalení ano/ne).
+    """
+
+    result = []
+    for record in records:
+        previous = [old['best'] for old in history
+                    if old['benchmark'] == record['benchmark'] and old['size'] == record['size']
+                    and old.get('machine') == record['machine']]
+        ratio = record['best'] / min(previous) if previous else None
+        result.append((record, ratio, ratio is not None and ratio > threshold))
+    return result
+
+
+# Definice funkce pro spuštění z příkazové řádky (python -m mmb.benchmark)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Měření rychlosti částí výpočtu modelu.')
+    parser.add_argument('names', nargs='*', help='názvy měření (výchozí: všechna)')
+    parser.add_argument('--history', default=HISTORY_FILE, help='soubor s historií (řádky JSON)')
+    parser.add_argument('--small', action='store_true', help='jen nejmenší velikost úlohy')
+    parser.add_argument('--repeat', type=int, default=5, help='počet opakování měření')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='nejkratší doba jednoho opakování (s)')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='poměr časů, od kterého jde o zpomalení')
+    parser.add_argument('--no-save', action='store_true', help='neukládat výsledky do historie')
+    parser.add_argument('--check', action='store_true',
+                        help='skončit s chybovým kódem, pokud došlo ke zpomalení')
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+
+    def report(record):
+        (_, ratio, slower), = compare([record], history, args.threshold)
+        change = '' if ratio is None else f'  ×{ratio:.2f}' + ('  ZPOMALENÍ' if slower else '')
+        print(f'{record["benchmark"]:<28}{record["size"]:>10}  {record["best"] * 1e3:>12.3f} ms{change}')
+
+    records = run_benchmarks(args.names or None, 'small' if args.small else None, args.repeat,
+                             args.min_time, report)
+    if not args.no_save:
+        append_history(records, args.history)
+    if args.check and any(slower for _, _, slower in compare(records, history, args.threshold)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
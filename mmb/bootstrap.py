@@ -0,0 +1,142 @@
+# Načtení knihoven
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.fit import PARAMETERS, fit
+from mmb.metrics import r2_score
+
+# Bootstrap intervaly spolehlivosti pro R² a kalibrované parametry.
+#
+# Pro R² se převzorkují dvojice (pozorovaná, predikovaná hodnota) přes věkové
+# skupiny. Všechna převzorkování tvoří jedno pole indexů tvaru (B, A) a R² se
+# spočítá jedinou dávkovou operací mmb.metrics.r2_score, bez smyčky přes vzorky.
+#
+# Pro parametry se převzorkují rezidua nejlépe padnoucí křivky (věkové skupiny
+# zůstanou zachovány) a každá převzorkovaná křivka se znovu kalibruje; kalibrace
+# se mohou rozdělit mezi pracovní procesy.
+
+
+# Definice výsledku bootstrapu
+@dataclass
+class BootstrapResult:
+
+    """
+    Třída s bodovým odhadem, bootstrap vzorky a percentilovým intervalem spolehlivosti.
+
+    Atributy:
+        estimate (ndarray): Hodnota pro původní data.
+        samples (ndarray): Hodnoty pro jednotlivá převzorkování, tvar (B, ...).
+        lower (ndarray): Dolní mez intervalu spolehlivosti.
+        upper (ndarray): Horní mez intervalu spolehlivosti.
+        confidence (float): Hladina spolehlivosti.
+    """
+
+    estimate: np.ndarray
+    samples: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    confidence: float
+
+
+# Definice funkce pro percentilový interval
+def _percentile_result(estimate, samples, confidence):
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    return BootstrapResult(estimate=estimate, samples=samples, lower=lower, upper=upper,
+                           confidence=confidence)
+
+
+# Definice funkce pro bootstrap koeficientu determinace
+def bootstrap_r2(true_values, predicted_values, n_resamples=10_000, confidence=0.95, seed=0):
+
+    """
+    Funkce pro výpočet intervalu spolehlivosti R² převzorkováním věkových skupin.
+
+    Parametry:
+        true_values (array-like): Skutečné hodnoty, tvar (A,).
+        predicted_values (array-like): Predikované hodnoty, tvar (..., A) (i více modelů najednou).
+        n_resamples (int): Počet převzorkování.
+        confidence (float): Hladina spolehlivosti.
+        seed (int): Semínko generátoru náhodných čísel.
+
+    Návratová hodnota:
+        BootstrapResult: R² pro původní data, vzorky tvaru (B, ...) a interval.
+    """
+
+    true_values = np.asarray(true_values, dtype=np.float64)
+    predicted_values = np.asarray(predicted_values, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, true_values.shape[-1], size=(n_resamples, true_values.shape[-1]))
+
+    # Osa převzorkování se dá na začátek, modely zůstanou v prostředních osách
+    resampled_true = true_values[indices].reshape((n_resamples,) + (1,) * (predicted_values.ndim - 1)
+                                                  + (indices.shape[-1],))
+    resampled_predicted = np.moveaxis(predicted_values[..., indices], -2, 0)
+
+    # Převzorkování se samými stejnými hodnotami nemá R² definované
+    with np.errstate(divide='ignore', invalid='ignore'):
+        samples = r2_score(resampled_true, resampled_predicted)
+    samples[~np.isfinite(samples)] = np.nan
+    return _percentile_result(r2_score(true_values, predicted_values), samples, confidence)
+
+
+# Funkce spouštěná v pracovním procesu: kalibrace jedné převzorkované křivky
+def _refit(observed, fit_kwargs):
+    result = fit(observed, workers=0, **fit_kwargs)
+    return [result.q, np.log10(result.p_c), result.generation_offset, result.generation_slope,
+            result.r2]
+
+
+# Definice funkce pro bootstrap kalibrovaných parametrů
+def bootstrap_fit(observed, n_resamples=200, confidence=0.95, seed=0, workers=None,
+                  q_window=10, **fit_kwargs):
+
+    """
+    Funkce pro výpočet intervalů spolehlivosti parametrů q, p_c, generation a R² z kalibrace.
+
+    Parametry:
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%).
+        n_resamples (int): Počet převzorkování.
+        confidence (float): Hladina spolehlivosti.
+        seed (int): Semínko generátoru náhodných čísel.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+        q_window (int): Převzorkované křivky se kalibrují jen pro q v okolí původního optima.
+        **fit_kwargs: Další parametry pro mmb.fit.fit (loss, age_groups, ...).
+
+    Návratová hodnota:
+        dict: BootstrapResult pro 'q', 'log10_p_c', 'generation_offset', 'generation_slope' a 'r2'.
+    """
+
+    observed = np.asarray(observed, dtype=np.float64)
+    best = fit(observed, workers=workers, **fit_kwargs)
+    loss = fit_kwargs.get('loss', 'sse')
+
+    # Převzorkování reziduí (pro log_sse v logaritmickém měřítku) všech vzorků najednou
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(observed), size=(n_resamples, len(observed)))
+    if loss == 'log_sse':
+        residual = np.log(observed) - np.log(best.p_cancer_5_years)
+        resampled = best.p_cancer_5_years * np.exp(residual[indices])
+    else:
+        residual = observed - best.p_cancer_5_years
+        resampled = best.p_cancer_5_years + residual[indices]
+
+    # Opakovaná kalibrace pro q v okolí původního optima
+    refit_kwargs = dict(fit_kwargs)
+    refit_kwargs.setdefault('q_values', range(max(best.q - q_window, 0), best.q + q_window + 1))
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        samples = [_refit(curve, refit_kwargs) for curve in resampled]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            samples = list(executor.map(_refit, resampled, [refit_kwargs] * n_resamples,
+                                        chunksize=max(n_resamples // (4 * workers), 1)))
+    samples = np.array(samples)
+
+    estimates = [best.q, np.log10(best.p_c), best.generation_offset, best.generation_slope, best.r2]
+    names = ('q',) + PARAMETERS + ('r2',)
+    return {name: _percentile_result(estimate, samples[:, i], confidence)
+            for i, (name, estimate) in enumerate(zip(names, estimates))}
@@ -0,0 +1,257 @@
+# Načtení knihoven
+import argparse
+import sys
+
+from mmb.data import P_CONSTANT
+
+# Jednotné rozhraní příkazové řádky (mmb table, mmb figure 3a, mmb leukemia 2, mmb sweep ...).
+#
+# Modul sám načítá jen argparse a mmb.data (jen seznamy čísel). NumPy, matplotlib
+# a ostatní části balíčku se načtou až uvnitř podpříkazu, který je potřebuje, takže
+# např. mmb table nebo mmb metrics nenačítají matplotlib ani pandas a R² se počítá přes mmb.metrics
+# (bez scikit-learn). Podpříkazy render, benchmark, accuracy a trace předají
+# zbytek příkazové řádky funkci main() příslušného modulu.
+
+# Pozorovaná data: název -> (proměnná v mmb.data, název onemocnění v grafech)
+DATASETS = {
+    'cancer': ('CANCERSTATS', 'Cancer'),
+    'leukemia': ('LEUKEMIA_STATS', 'Leukaemia'),
+}
+
+# Grafy ze skriptů ve složkách Figures/ a Leukemia/ -> graf z tabulky mmb.render.FIGURES
+FIGURE_PLOTS = {
+    'figure': {'3a': 'plot4', '3b': 'plot5', '3c': 'plot6', '3d': 'plot7'},
+    'leukemia': {'1': 'plot8', '2': 'plot9'},
+}
+
+# Podpříkazy předávané funkci main() jiného modulu
+DELEGATED = {
+    'render': ('mmb.render', 'dávkové vykreslení grafů do složky Plots/'),
+    'benchmark': ('mmb.benchmark', 'měření rychlosti částí výpočtu'),
+    'accuracy': ('mmb.accuracy', 'porovnání rychlého výpočtu p_a s referencí v Decimal'),
+    'trace': ('mmb.trace', 'spuštění skriptu se sledováním částí výpočtu'),
+}
+
+
+# Definice funkce pro načtení pozorovaných dat
+def _observed(name):
+    from mmb import data
+    variable, disease = DATASETS[name]
+    return getattr(data, variable), disease
+
+
+# Podpříkaz table: tabulka mezivýsledků modelu (jako vysledky.csv)
+def _table(args):
+    import numpy as np
+
+    from mmb.metrics import r2_score
+    from mmb.model import AdaptiveModel
+    from mmb.store import MODEL_LABELS
+
+    observed, _ = _observed(args.data)
+    model = AdaptiveModel().evaluate(p_c=args.p_c, q=args.q)
+    columns = {name: np.broadcast_to(getattr(model, name), model.p_cancer_5_years.shape)
+               for name in MODEL_LABELS if name != 'cancerstats'}
+    columns['cancerstats'] = np.asarray(observed, dtype=np.float64)
+
+    if args.store:
+        from mmb.store import store_model
+        store_model(args.store, model, observed)
+    if args.csv:
+        import csv
+        with open(args.csv, 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.writer(file)
+            writer.writerow(MODEL_LABELS[name] for name in columns)
+            writer.writerows(zip(*(values.tolist() for values in columns.values())))
+
+    shown = ['age_groups', 'generation', 'parameter_n', 'p_accumulative', 'lambda_np',
+             'p_cancer_5_years', 'cancerstats']
+    print(''.join(f'{MODEL_LABELS[name]:>22}' for name in shown))
+    for row in zip(*(columns[name] for name in shown)):
+        print(''.join(f'{value:>22.6g}' for value in row))
+    print(f'R² = {r2_score(observed, model.p_cancer_5_years):.4f}')
+
+
+# Podpříkaz metrics: R² modelu pro několik prahů q najednou
+def _metrics(args):
+    import numpy as np
+
+    from mmb.metrics import r2_score
+    from mmb.model import AdaptiveModel
+
+    observed, disease = _observed(args.data)
+    q = np.asarray(args.q)
+    model = AdaptiveModel().evaluate(p_c=args.p_c, q=q)
+    r_squared = r2_score(observed, model.p_cancer_5_years)
+    print(f'{disease}, p_c = {args.p_c:g}')
+    for q_value, r2 in zip(q, np.atleast_1d(r_squared)):
+        print(f'  q = {q_value}: R² = {r2:.4f}')
+
+
+# Podpříkazy figure a leukemia: graf ze skriptu ve Figures/ nebo Leukemia/
+def _figure(args):
+    import matplotlib
+    if args.save:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from mmb import figures
+    from mmb.render import FIGURES
+
+    function, kwargs = FIGURES[FIGURE_PLOTS[args.command][args.name]]
+    fig = getattr(figures, function)(**kwargs)
+    if args.save:
+        fig.savefig(args.save, dpi=args.dpi, bbox_inches='tight')
+        print(f'Uloženo: {args.save}')
+    else:
+        plt.show()
+
+
+# Podpříkaz sweep: prohledání mřížky parametrů a uložení do sloupcového úložiště
+def _sweep(args):
+    import numpy as np
+
+    from mmb.sweep import SweepGrid, run_sweep
+
+    observed, _ = _observed(args.data)
+    grid = SweepGrid(q=np.arange(args.q[0], args.q[1]),
+                     p_c=np.geomspace(args.p_c[0], args.p_c[1], int(args.p_c[2])),
+                     generation_slope=np.linspace(args.slope[0], args.slope[1], int(args.slope[2])))
+    try:
+        run_sweep(grid, args.output, observed, args.chunk_size, args.workers, _progress, **_lease(args))
+    except ValueError as error:
+        args.parser.error(str(error))
+    print(file=sys.stderr)
+    _merge(args)
+
+
+# Podpříkaz worker: připojení k prohledávání ve sdíleném adresáři (z jiného uzlu)
+def _worker(args):
+    from mmb.sweep import run_worker
+
+    try:
+        run_worker(args.output, args.workers, _progress, **_lease(args))
+    except FileNotFoundError as error:
+        args.parser.error(str(error))
+    print(file=sys.stderr)
+    _merge(args)
+
+
+# Podpříkaz merge: spojení hotových bloků do úložiště a výpis nejlepšího bodu
+def _merge(args):
+    from pathlib import Path
+
+    import numpy as np
+
+    from mmb.store import sweep_to_store
+    from mmb.sweep import pending_chunks
+
+    try:
+        pending = pending_chunks(args.output)
+        if pending:
+            print(f'Zbývá {len(pending)} bloků (počítají je jiní pracovníci nebo je spusťte znovu), '
+                  f'spojení výsledků se přeskočí')
+            return
+        store = sweep_to_store(args.output, args.store or Path(args.output) / 'store')
+    except (ValueError, FileNotFoundError) as error:
+        args.parser.error(str(error))
+    best = int(np.nanargmax(store['r2']))
+    print(f'{len(store)} bodů, nejlepší q = {store["q"][best]}, '
+          f'p_c = {store["p_c"][best]:.4g}, sklon generation = {store["generation_slope"][best]:.4g}, '
+          f'R² = {store["r2"][best]:.4f}')
+    print(f'Výsledky: {store.path}')
+
+
+# Definice funkce pro dobu pronájmu bloku (nezadaná = výchozí mmb.sweep.LEASE)
+def _lease(args):
+    return {} if args.lease is None else {'lease': args.lease}
+
+
+# Definice funkce pro výpis průběhu prohledávání
+def _progress(done, total):
+    print(f'\r{done}/{total} bodů', end='', file=sys.stderr, flush=True)
+
+
+# Definice funkce pro sestavení parseru
+def build_parser():
+
+    """
+    Funkce pro sestavení parseru příkazové řádky se všemi podpříkazy.
+
+    Návratová hodnota:
+        ArgumentParser: Parser příkazu mmb.
+    """
+
+    parser = argparse.ArgumentParser(prog='mmb', description='Modely výskytu rakoviny v závislosti na věku.')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='příkaz')
+
+    table = commands.add_parser('table', help='tabulka mezivýsledků modelu (jako vysledky.csv)')
+    table.add_argument('--data', choices=list(DATASETS), default='cancer', help='pozorovaná data')
+    table.add_argument('--q', type=int, default=None, help='práh počtu akumulovaných mutací')
+    table.add_argument('--p-c', type=float, default=None, help='pravděpodobnost p_c')
+    table.add_argument('--csv', help='uložit celou tabulku do souboru CSV')
+    table.add_argument('--store', help='uložit výsledky do sloupcového úložiště (složka)')
+    table.set_defaults(handler=_table)
+
+    metrics = commands.add_parser('metrics', help='R² modelu pro několik prahů q')
+    metrics.add_argument('--data', choices=list(DATASETS), default='cancer', help='pozorovaná data')
+    metrics.add_argument('--q', type=int, nargs='+', default=[117, 118, 119], help='prahy q')
+    metrics.add_argument('--p-c', type=float, default=P_CONSTANT, help='pravděpodobnost p_c')
+    metrics.set_defaults(handler=_metrics)
+
+    for command, help_text in (('figure', 'graf z obrázku 3 článku (Figures/)'),
+                               ('leukemia', 'graf s daty o leukémii (Leukemia/)')):
+        figure = commands.add_parser(command, help=help_text)
+        figure.add_argument('name', choices=list(FIGURE_PLOTS[command]), help='číslo grafu')
+        figure.add_argument('--save', help='uložit graf do souboru místo zobrazení')
+        figure.add_argument('--dpi', type=int, default=72, help='rozlišení uloženého grafu')
+        figure.set_defaults(handler=_figure)
+
+    sweep = commands.add_parser('sweep', help='paralelní prohledání mřížky q × p_c × sklon generation')
+    sweep.add_argument('--data', choices=list(DATASETS), default='cancer', help='pozorovaná data')
+    sweep.add_argument('--q', type=int, nargs=2, default=(80, 201), metavar=('OD', 'DO'),
+                       help='rozsah prahů q (bez horní meze)')
+    sweep.add_argument('--p-c', type=float, nargs=3, default=(1e-20, 1e-16, 41),
+                       metavar=('OD', 'DO', 'POČET'), help='logaritmická mřížka p_c')
+    sweep.add_argument('--slope', type=float, nargs=3, default=(1.0, 1.0, 1),
+                       metavar=('OD', 'DO', 'POČET'), help='mřížka sklonu křivky generation')
+    sweep.add_argument('--output', default='sweep', help='adresář pro bloky výsledků')
+    sweep.add_argument('--chunk-size', type=int, default=20_000, help='počet bodů v jednom bloku')
+    sweep.set_defaults(handler=_sweep, parser=sweep)
+
+    worker = commands.add_parser('worker', help='připojení k prohledávání ve sdíleném adresáři')
+    worker.add_argument('output', help='adresář prohledávání (se souborem sweep.npz)')
+    worker.set_defaults(handler=_worker, parser=worker)
+
+    for command_parser in (sweep, worker):
+        command_parser.add_argument('--store', help='složka úložiště (výchozí: OUTPUT/store)')
+        command_parser.add_argument('--workers', type=int, default=None,
+                                    help='počet pracovních procesů (0 = bez procesů)')
+        command_parser.add_argument('--lease', type=float, default=None,
+                                    help='doba pronájmu bloku v sekundách (výchozí: mmb.sweep.LEASE)')
+
+    merge = commands.add_parser('merge', help='spojení hotových bloků prohledávání do úložiště')
+    merge.add_argument('output', help='adresář prohledávání')
+    merge.add_argument('--store', help='složka úložiště (výchozí: OUTPUT/store)')
+    merge.set_defaults(handler=_merge, parser=merge)
+
+    for command, (_, help_text) in DELEGATED.items():
+        commands.add_parser(command, help=help_text, add_help=False)
+    return parser
+
+
+# Definice funkce pro spuštění z příkazové řádky (mmb nebo python -m mmb)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # Podpříkazy jiných modulů dostanou zbytek příkazové řádky beze změny
+    if argv and argv[0] in DELEGATED:
+        from importlib import import_module
+        return import_module(DELEGATED[argv[0]][0]).main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# Načtení knihoven
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.model import evaluate
+from mmb.risk import age_edges, hazard_risk
+
+# Vyhodnocení modelu na jemné (roční nebo měsíční) věkové mřížce.
+#
+# Křivky generation a parameter_n jsou zadány jen pro 19 věkových skupin, a tak se
+# mezi nimi interpolují (generation lineárně, parameter_n lineárně v logaritmu,
+# protože počet obnov s věkem klesá přibližně exponenciálně); lze je zadat i jako
+# funkce věku. Model pak dává roční intenzitu λ(t) = n(t) p(t) pro každý bod mřížky
+# a pravděpodobnost vzniku rakoviny v intervalu [a, b) je
+#
+#   1 - exp(-∫_a^b λ(t) dt),
+#
+# kde se integrál počítá z kumulativního součtu λ(t) Δt přes mřížku. Náhrada
+# 100 * 5 * p_cancer_year tak odpadá. Hranice intervalů věkových skupin i převod
+# integrálu na rizika sdílí tento modul s mmb.risk (age_edges, hazard_risk):
+# skupina a je středem svého intervalu [a - 2,5, a + 2,5).
+
+
+# Definice funkce pro vytvoření věkové mřížky
+def age_grid(start=0.0, stop=100.0, step=1 / 12):
+
+    """
+    Funkce pro vytvoření rovnoměrné věkové mřížky (středy intervalů délky step).
+
+    Parametry:
+        start (float): Počáteční věk v letech.
+        stop (float): Koncový věk v letech.
+        step (float): Krok mřížky v letech (1 = roční, 1/12 = měsíční rozlišení).
+
+    Návratová hodnota:
+        ndarray: Věky ve středech intervalů mřížky.
+    """
+
+    count = int(round((stop - start) / step))
+    return start + step * (np.arange(count) + 0.5)
+
+
+# Definice funkce pro interpolaci křivky zadané ve věkových skupinách
+def interpolate_curve(ages, values, knot_ages=AGE_GROUPS, log=False):
+
+    """
+    Funkce pro interpolaci (nebo vyhodnocení) křivky parametru v zadaných věkových bodech.
+
+    Mimo rozsah uzlů se křivka prodlouží konstantně.
+
+    Parametry:
+        ages (array-like): Věky, pro které se křivka počítá.
+        values (array-like | callable): Hodnoty v uzlech, tvar (..., K), nebo funkce věku.
+        knot_ages (array-like): Věky uzlů, tvar (K,).
+        log (bool): Zda interpolovat lineárně v logaritmu hodnot.
+
+    Návratová hodnota:
+        ndarray: Hodnoty křivky tvaru (..., len(ages)).
+    """
+
+    ages = np.asarray(ages, dtype=np.float64)
+    if callable(values):
+        return np.asarray(values(ages), dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    knot_ages = np.asarray(knot_ages, dtype=np.float64)
+    if log:
+        values = np.log(values)
+
+    # Interpolace pro všechny křivky najednou přes společné váhy sousedních uzlů
+    right = np.clip(np.searchsorted(knot_ages, ages), 1, len(knot_ages) - 1)
+    left = right - 1
+    weight = np.clip((ages - knot_ages[left]) / (knot_ages[right] - knot_ages[left]), 0.0, 1.0)
+    result = values[..., left] * (1 - weight) + values[..., right] * weight
+    return np.exp(result) if log else result
+
+
+# Definice funkce pro vyhodnocení modelu na věkové mřížce
+def evaluate_ages(ages, generation=GENERATION, parameter_n=PARAMETER_N, p_c=P_CONSTANT, q=Q,
+                  knot_ages=AGE_GROUPS):
+
+    """
+    Funkce pro výpočet modelu na libovolné věkové mřížce.
+
+    Parametry:
+        ages (array-like): Věky v letech, tvar (T,).
+        generation (array-like | callable): Křivka generation v uzlech (..., K) nebo funkce věku.
+        parameter_n (array-like | callable): Křivka parameter_n v uzlech (..., K) nebo funkce věku.
+        p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení, tvar (...).
+        q (array-like): Práh počtu akumulovaných mutací, tvar (...).
+        knot_ages (array-like): Věky uzlů křivek, tvar (K,).
+
+    Návratová hodnota:
+        ModelResult: Mezivýsledky modelu jako pole tvaru (..., T).
+    """
+
+    ages = np.asarray(ages, dtype=np.float64)
+    generation = interpolate_curve(ages, generation, knot_ages)
+    parameter_n = interpolate_curve(ages, parameter_n, knot_ages, log=True)
+    return evaluate(ages, generation, parameter_n, p_c, q)
+
+
+# Definice funkce pro agregaci roční intenzity do věkových intervalů
+def interval_risk(ages, lambda_np, edges):
+
+    """
+    Funkce pro výpočet pravděpodobnosti (v %) vzniku rakoviny ve věkových intervalech.
+
+    Parametry:
+        ages (array-like): Rovnoměrná věková mřížka (středy intervalů), tvar (T,).
+        lambda_np (array-like): Roční intenzita λ = n p v bodech mřížky, tvar (..., T).
+        edges (array-like): Hranice věkových intervalů, tvar (G + 1,).
+
+    Návratová hodnota:
+        ndarray: Pravděpodobnost (v %) vzniku rakoviny v každém intervalu, tvar (..., G).
+    """
+
+    return hazard_risk(interval_hazard(ages, lambda_np, edges)).interval_risk
+
+
+# Definice funkce pro integrál roční intenzity přes věkové intervaly
+def interval_hazard(ages, lambda_np, edges):
+
+    """
+    Funkce pro kumulovanou intenzitu H = ∫ λ(t) dt přes každý věkový interval.
+
+    Parametry:
+        ages (array-like): Rovnoměrná věková mřížka (středy intervalů), tvar (T,).
+        lambda_np (array-like): Roční intenzita λ = n p v bodech mřížky, tvar (..., T).
+        edges (array-like): Hranice věkových intervalů, tvar (G + 1,).
+
+    Návratová hodnota:
+        ndarray: Kumulovaná intenzita v každém intervalu, tvar (..., G).
+    """
+
+    ages = np.asarray(ages, dtype=np.float64)
+    lambda_np = np.asarray(lambda_np, dtype=np.float64)
+    step = ages[1] - ages[0]
+
+    # Kumulativní integrál intenzity na hranicích buněk mřížky
+    cumulative = np.concatenate([np.zeros(lambda_np.shape[:-1] + (1,)),
+                                 np.cumsum(lambda_np * step, axis=-1)], axis=-1)
+    boundaries = np.concatenate([ages - step / 2, [ages[-1] + step / 2]])
+
+    # Lineární interpolace kumulativního integrálu v hranicích intervalů (pro všechny křivky najednou)
+    position = np.interp(edges, boundaries, np.arange(len(boundaries), dtype=np.float64))
+    lower = np.minimum(position.astype(np.int64), len(ages) - 1)
+    fraction = position - lower
+    at_edges = cumulative[..., lower] * (1 - fraction) + cumulative[..., lower + 1] * fraction
+    return np.diff(at_edges, axis=-1)
+
+
+# Definice funkce pro rizika věkových skupin z jemné věkové mřížky
+def continuous_risk(age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N,
+                    p_c=P_CONSTANT, q=Q, step=1 / 12, width=None):
+
+    """
+    Funkce pro rizika v intervalech a kumulativní rizika integrací přes věkovou mřížku.
+
+    Intervaly mají stejnou konvenci jako mmb.risk (viz age_edges): skupina a je středem
+    intervalu [a - 2,5, a + 2,5) pro skupiny po 5 letech, tedy bodu, ve kterém původní
+    model počítá p_cancer_year. Výsledek se od mmb.risk.model_risk liší jen tím, že se
+    λ v intervalu neuvažuje konstantní, ale integruje se po interpolaci křivek.
+
+    Parametry:
+        age_groups (array-like): Středy věkových skupin, tvar (G,).
+        generation (array-like | callable): Křivka generation v uzlech nebo funkce věku.
+        parameter_n (array-like | callable): Křivka parameter_n v uzlech nebo funkce věku.
+        p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení, tvar (...).
+        q (array-like): Práh počtu akumulovaných mutací, tvar (...).
+        step (float): Krok věkové mřížky v letech.
+        width (float): Pevná délka věkové skupiny v letech (None = podle sousedních skupin).
+
+    Návratová hodnota:
+        RiskResult: Rizika v intervalech a kumulativní rizika, tvar (..., G).
+    """
+
+    edges = age_edges(age_groups, width)
+    ages = age_grid(edges[0], edges[-1], step)
+    model = evaluate_ages(ages, generation, parameter_n, p_c, q)
+    return hazard_risk(interval_hazard(ages, model.lambda_np, edges), age_groups)
+
+
+# Definice funkce pro výpočet pětiletých pravděpodobností z jemné věkové mřížky
+def five_year_rates(age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N,
+                    p_c=P_CONSTANT, q=Q, step=1 / 12, width=None):
+
+    """
+    Funkce pro výpočet P(cancer)/5 let (%) integrací přes věkovou mřížku.
+
+    Intervaly mají stejnou konvenci jako mmb.risk (viz age_edges a continuous_risk).
+
+    Parametry:
+        age_groups (array-like): Středy věkových skupin, tvar (G,).
+        generation (array-like | callable): Křivka generation v uzlech nebo funkce věku.
+        parameter_n (array-like | callable): Křivka parameter_n v uzlech nebo funkce věku.
+        p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení, tvar (...).
+        q (array-like): Práh počtu akumulovaných mutací, tvar (...).
+        step (float): Krok věkové mřížky v letech.
+        width (float): Pevná délka věkové skupiny v letech (None = podle sousedních skupin).
+
+    Návratová hodnota:
+        ndarray: Pravděpodobnost (v %) vzniku rakoviny v každé věkové skupině, tvar (..., G).
+    """
+
+    return continuous_risk(age_groups, generation, parameter_n, p_c, q, step, width).interval_risk
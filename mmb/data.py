@@ -0,0 +1,31 @@
+# Definice zadaných parametrů modelu a pozorovaných dat (společné pro všechny skripty)
+
+# Intervaly věku v letech
+AGE_GROUPS = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85,
+              90, 95]
+
+# Průměrný počet mutací pro každou buňku
+GENERATION = [45, 46, 47, 47.5, 48, 48.5, 49, 49.5, 50, 50.5, 51, 51.5, 52,
+              52.5, 53, 53.5, 54, 54.5, 55]
+
+# Počet obnov buněk během jednoho roku
+PARAMETER_N = [4.2e+13, 4.2e+13, 4.2e+13, 4.2e+13, 4.2e+13, 4.2e+13, 4.2e+13,
+               3.15e+13, 2.36e+13, 1.77e+13, 1.33e+13, 9.97e+12, 7.48e+12, 5.61e+12,
+               4.2e+12, 2.73e+12, 1.78e+12, 1.07e+12, 5.33e+11]
+
+# Konstantní počet obnov buněk (model bez snižování obnovy s věkem)
+PARAMETER_N_CONSTANT = 4.2e+13
+
+# Pravděpodobnost, že se zdravá buňka změní v rakovinnou v průběhu jednoho dělení
+P_CONSTANT = 2.38e-18
+
+# Práh počtu akumulovaných mutací, při jehož překročení se buňka stává rakovinnou
+Q = 118
+
+# Pozorované pravděpodobnosti výskytu rakoviny za 5 let podle Cancerstats UK
+CANCERSTATS = [0.1028, 0.0553, 0.0633, 0.1023, 0.1643, 0.3003, 0.4533, 0.6380, 0.9550, 1.5588,
+               2.3953, 3.5565, 5.3138, 7.5760, 9.5098, 11.8208, 13.0510, 14.2038, 13.3100]
+
+# Pozorované pravděpodobnosti výskytu leukémie za 5 let podle Cancerstats UK
+LEUKEMIA_STATS = [0.279, 0.139, 0.106, 0.095, 0.091, 0.111, 0.132, 0.154, 0.199, 0.3120, 0.478,
+                  0.675, 0.855, 1.186, 1.549, 1.362, 1.267, 0.842, 0.472]
@@ -0,0 +1,155 @@
+# Načtení knihoven
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.profiling import stage
+
+# Pravděpodobnost, že po x děleních vznikne rakovinná buňka: P(x) = 1 - exp(-2^x p).
+#
+# Přímý zápis 1 - 1/np.exp(2**x * p) se pro malé x zaokrouhlí na 0 (2^x p ≈ 1e-15
+# je pod přesností 1 - ...), proto se počítá jako -expm1(-λ) s λ = exp(x ln 2 + ln p),
+# které pro malé λ dává správně P ≈ λ. Logaritmus P se počítá zvlášť (log λ + log(P/λ)),
+# takže zůstane konečný i tam, kde by λ v plovoucí čárce podteklo.
+#
+# Křivka je v x skoro všude plochá (0 nebo 1) a mění se jen v pásu šířky několika
+# dělení kolem x = -log2 p. Místo pevné mřížky se body přidávají adaptivně: interval
+# se rozpůlí, dokud se hodnota ve středu liší od lineární interpolace krajních bodů
+# o víc než tolerance. Všechny hodnoty p sdílejí jednu mřížku, která se zjemní tam,
+# kde to potřebuje kterákoli z křivek, takže celá rodina křivek vznikne jedním
+# vektorizovaným výpočtem tvaru (K, M).
+
+# Měřítka, ve kterých se hlídá chyba lineární interpolace
+SCALES = ('linear', 'log')
+
+
+# Definice výsledku adaptivního vzorkování
+@dataclass
+class DivisionCurves:
+
+    """
+    Třída s křivkami P(x) pro několik hodnot p na společné adaptivní mřížce.
+
+    Atributy:
+        x (ndarray): Počty dělení (rostoucí), tvar (M,).
+        p (ndarray): Pravděpodobnosti změny buňky v rakovinnou, tvar (K,).
+        probability (ndarray): Pravděpodobnost P(x) pro každé p, tvar (K, M).
+        log_probability (ndarray): Přirozený logaritmus P(x), tvar (K, M).
+        refinements (int): Počet provedených zjemnění mřížky.
+    """
+
+    x: np.ndarray
+    p: np.ndarray
+    probability: np.ndarray
+    log_probability: np.ndarray
+    refinements: int
+
+
+# Definice funkce pro logaritmus intenzity λ = 2^x p
+def _log_lambda(x, p):
+    x = np.asarray(x, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    return x * math.log(2) + np.log(p)[..., None] if p.ndim else x * math.log(2) + np.log(p)
+
+
+# Definice funkce pro pravděpodobnost vzniku rakovinné buňky
+def division_probability(x, p):
+
+    """
+    Funkce pro pravděpodobnost P = 1 - exp(-2^x p) bez ztráty přesnosti pro malé 2^x p.
+
+    Parametry:
+        x (array-like): Počet dělení buněk, tvar (M,).
+        p (array-like): Pravděpodobnost změny buňky v rakovinnou, skalár nebo tvar (K,).
+
+    Návratová hodnota:
+        ndarray: Pravděpodobnost, tvar (M,) pro skalární p, jinak (K, M).
+    """
+
+    with np.errstate(over='ignore'):
+        return -np.expm1(-np.exp(_log_lambda(x, p)))
+
+
+# Definice funkce pro logaritmus pravděpodobnosti vzniku rakovinné buňky
+def log_division_probability(x, p):
+
+    """
+    Funkce pro přirozený logaritmus P = 1 - exp(-2^x p), konečný i při podtečení 2^x p.
+
+    Parametry:
+        x (array-like): Počet dělení buněk, tvar (M,).
+        p (array-like): Pravděpodobnost změny buňky v rakovinnou, skalár nebo tvar (K,).
+
+    Návratová hodnota:
+        ndarray: log P, tvar (M,) pro skalární p, jinak (K, M).
+    """
+
+    log_lambda = _log_lambda(x, p)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        lam = np.exp(log_lambda)
+
+        # Pro λ ≤ 1 je log P = log λ + log(P/λ), pro λ > 1 přímo log(1 - exp(-λ))
+        ratio = np.where(lam > 0, -np.expm1(-lam) / lam, 1.0)
+        return np.where(log_lambda > 0, np.log1p(-np.exp(-lam)), log_lambda + np.log(ratio))
+
+
+# Definice funkce pro adaptivní vzorkování křivek
+def adaptive_divisions(p, divisions=80.0, start=0.0, tolerance=1e-3, scale='linear', initial=33,
+                       max_points=4096):
+
+    """
+    Funkce pro křivky P(x) pro všechny hodnoty p na společné adaptivně zjemněné mřížce.
+
+    Parametry:
+        p (array-like): Pravděpodobnosti změny buňky v rakovinnou, skalár nebo tvar (K,).
+        divisions (float): Největší počet dělení.
+        start (float): Nejmenší počet dělení.
+        tolerance (float): Největší dovolená odchylka hodnoty ve středu intervalu od lineární
+            interpolace krajních bodů (v P pro scale='linear', v log10 P pro scale='log').
+        scale (str): Měřítko, ve kterém se chyba hlídá ('linear' nebo 'log').
+        initial (int): Počet bodů počáteční rovnoměrné mřížky.
+        max_points (int): Největší počet bodů mřížky.
+
+    Návratová hodnota:
+        DivisionCurves: Mřížka a hodnoty P(x) i log P(x) pro každé p.
+    """
+
+    if scale not in SCALES:
+        raise ValueError(f'Neznámé měřítko {scale!r}, podporovaná jsou {SCALES}')
+    p = np.atleast_1d(np.asarray(p, dtype=np.float64))
+    if np.any(p <= 0):
+        raise ValueError('Pravděpodobnosti p musí být kladné')
+
+    def values(x):
+        log_probability = log_division_probability(x, p)
+        measured = np.exp(log_probability) if scale == 'linear' else log_probability / math.log(10)
+        return log_probability, measured
+
+    with stage('division_curve'):
+        x = np.linspace(start, divisions, initial)
+        log_probability, measured = values(x)
+        refinements = 0
+        while len(x) < max_points:
+
+            # Chyba lineární interpolace ve středech intervalů (nejhorší přes všechna p)
+            middle = (x[:-1] + x[1:]) / 2
+            log_middle, measured_middle = values(middle)
+            error = np.max(np.abs(measured_middle - (measured[:, :-1] + measured[:, 1:]) / 2), axis=0)
+            refine = np.flatnonzero(error > tolerance)
+            if not len(refine):
+                break
+
+            # Při překročení rozpočtu bodů se zjemní jen intervaly s největší chybou
+            budget = max_points - len(x)
+            if len(refine) > budget:
+                refine = np.sort(refine[np.argsort(error[refine])[::-1][:budget]])
+
+            # Vložení středů za levé krajní body zjemňovaných intervalů
+            x = np.insert(x, refine + 1, middle[refine])
+            log_probability = np.insert(log_probability, refine + 1, log_middle[:, refine], axis=1)
+            measured = np.insert(measured, refine + 1, measured_middle[:, refine], axis=1)
+            refinements += 1
+
+        return DivisionCurves(x=x, p=p, probability=np.exp(log_probability),
+                              log_probability=log_probability, refinements=refinements)
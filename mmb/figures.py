@@ -0,0 +1,281 @@
+# Načtení knihoven
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import numpy as np
+
+from mmb.bootstrap import bootstrap_r2
+from mmb.data import (AGE_GROUPS, CANCERSTATS, GENERATION, PARAMETER_N, PARAMETER_N_CONSTANT,
+                      P_CONSTANT, Q)
+from mmb.division import adaptive_divisions
+from mmb.metrics import r2_score
+from mmb.model import evaluate
+from mmb.profiling import stage
+from mmb.risk import cumulative_from_intervals, model_risk
+from mmb.slopes import log_slopes
+
+# Grafy z článku (obrázek 3) a jejich varianty pro data o leukémii.
+#
+# Každá funkce graf vytvoří a vrátí objekt Figure, nic nezobrazuje ani neukládá.
+# Skripty ve složkách Figures/ a Leukemia/ graf zobrazí přes plt.show(),
+# mmb.render ho bez interaktivního prostředí uloží do složky Plots/.
+
+
+# Definice funkce pro graf pravděpodobnosti v závislosti na počtu dělení buněk
+def division_curve(p, divisions=80, tolerance=1e-3, scale='linear'):
+
+    """
+    Funkce pro vykreslení P(rakovinné) = 1 - 1/exp(2^x p) jako funkce počtu dělení x.
+
+    Křivka se počítá stabilně a na adaptivní mřížce z mmb.division.adaptive_divisions.
+
+    Parametry:
+        p (float | sequence): Pravděpodobnost změny buňky v rakovinnou na jednu buňku
+            (pro více hodnot se vykreslí rodina křivek).
+        divisions (float): Největší zobrazený počet dělení.
+        tolerance (float): Dovolená chyba lineární interpolace mezi body křivky.
+        scale (str): Měřítko osy y ('linear' nebo 'log').
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    curves = adaptive_divisions(p, divisions, tolerance=tolerance, scale=scale)
+    colors = ['red'] if len(curves.p) == 1 else plt.cm.viridis(np.linspace(0, 1, len(curves.p)))
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for p_value, probability, color in zip(curves.p, curves.probability, colors):
+            ax.plot(curves.x, probability, color=color,
+                    label=rf'$P_{{cancer}} = 1 - \frac{{1}}{{e^{{2^x \cdot p}}}},\ p = {p_value:g}$')
+        ax.set_xlabel('Počet dělení buněk')
+        ax.set_ylabel('P_{rakovinné}')
+        ax.set_yscale(scale)
+        ax.set_title('P(rakovinné) jako funkce počtu dělení buněk')
+        ax.grid(True)
+        ax.legend()
+        return fig
+
+
+# Definice funkce pro graf porovnání modelu pro různé prahy q
+def q_comparison(observed=CANCERSTATS, disease='Cancer', q_list=(117, 118, 119), groups=7, band=None):
+
+    """
+    Funkce pro porovnání modelu s pozorováním pro několik prahů q (obrázek 3a).
+
+    Parametry:
+        observed (array-like): Pozorované pravděpodobnosti výskytu za 5 let (%).
+        disease (str): Název onemocnění v popiscích grafu.
+        q_list (sequence): Porovnávané prahy počtu akumulovaných mutací.
+        groups (int): Počet prvních věkových skupin v grafu.
+        band (PredictiveBand): Volitelné aposteriorní prediktivní pásmo z mmb.bayes.
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    age_groups = AGE_GROUPS[:groups]
+    observed = np.asarray(observed[:groups], dtype=np.float64)
+
+    # Výpočet modelu pro všechny prahy jedním dávkovým voláním (řádek = jedna hodnota q)
+    model = evaluate(age_groups, GENERATION[:groups], PARAMETER_N[:groups], P_CONSTANT,
+                     np.array(q_list))
+    r_squared = r2_score(observed, model.p_cancer_5_years)
+
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        markers = ['s', 'o', '^', 'v']
+        colors = ['blue', 'red', 'lightblue', 'black']
+        for i, q in enumerate(q_list):
+            ax.plot(age_groups, model.p_cancer_5_years[i],
+                    label=f'Model q = {q}, R² = {r_squared[i]:.3f}',
+                    marker=markers[i % len(markers)],
+                    color=colors[i % len(colors)])
+        ax.plot(age_groups, observed, label='Cancerstats', linestyle='--', color=colors[-1],
+                marker=markers[-1])
+        if band is not None:
+            _draw_band(ax, band, groups)
+
+        ax.set_xlabel('Age')
+        ax.set_ylabel(f'{disease} rates/5 years')
+        ax.set_title(f'Comparison of {disease} Probability for Different q Values')
+        ax.legend()
+        ax.set_yscale('log')
+        ax.set_ylim(0.01, 1.2)
+        ax.set_yticks([0.01, 0.1, 1], ['0.01', '0.1', '1'])
+        return fig
+
+
+# Definice funkce pro vykreslení aposteriorního prediktivního pásma (prvních groups skupin)
+def _draw_band(ax, band, groups=None):
+    ax.fill_between(band.age_groups[:groups], band.lower[:groups], band.upper[:groups], color='gray',
+                    alpha=0.3, label=f'Posterior predictive {band.confidence:.0%} band')
+    ax.plot(band.age_groups[:groups], band.median[:groups], color='gray', linestyle=':',
+            label='Posterior predictive median')
+
+
+# Definice funkce pro výpočet modelu se snižováním obnovy buněk a bez něj
+def _turnover_models():
+    parameter_n_curves = np.stack([PARAMETER_N, np.full(len(PARAMETER_N), PARAMETER_N_CONSTANT)])
+    return evaluate(AGE_GROUPS, GENERATION, parameter_n_curves, P_CONSTANT, Q)
+
+
+# Definice funkce pro graf modelu se snižováním obnovy buněk a bez něj
+def turnover_comparison(observed=CANCERSTATS, disease='Cancer', r2_interval=False, band=None):
+
+    """
+    Funkce pro porovnání modelu se snižováním obnovy buněk s věkem a bez něj (obrázek 3b).
+
+    Parametry:
+        observed (array-like): Pozorované pravděpodobnosti výskytu za 5 let (%).
+        disease (str): Název onemocnění v popiscích grafu.
+        r2_interval (bool): Zda do legendy přidat bootstrap interval spolehlivosti R².
+        band (PredictiveBand): Volitelné aposteriorní prediktivní pásmo z mmb.bayes.
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    observed = np.asarray(observed, dtype=np.float64)
+    model = _turnover_models()
+    r_squared = r2_score(observed, model.p_cancer_5_years)
+    labels = [f'Model with turnover reduction  R²={r_squared[0]:.3f}',
+              f'Model without turnover reduction  R²={r_squared[1]:.3f}']
+
+    # Bootstrap intervaly spolehlivosti R² pro oba modely najednou
+    if r2_interval:
+        r2_bootstrap = bootstrap_r2(observed, model.p_cancer_5_years)
+        labels = [f'{label} (95% CI {lower:.3f} – {upper:.3f})'
+                  for label, lower, upper in zip(labels, r2_bootstrap.lower, r2_bootstrap.upper)]
+
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(AGE_GROUPS, model.p_cancer_5_years[0], label=labels[0], color='red', marker='o')
+        ax.plot(AGE_GROUPS, model.p_cancer_5_years[1], label=labels[1], color='blue', marker='o')
+        ax.plot(AGE_GROUPS, observed, label='Cancerstats', linestyle='--', color='black', marker='^')
+        if band is not None:
+            _draw_band(ax, band)
+
+        ax.set_yscale('log')
+        ax.set_ylim(0.02, 110)
+        ax.set_yticks([0.1, 1, 10, 100], ['0.1', '1', '10', '100'])
+        ax.set_xlabel('Age')
+        ax.set_ylabel(f'{disease} rates/5 years')
+        ax.set_title(f'{disease} Probability with/out turnover reduction')
+        ax.legend()
+        return fig
+
+
+# Definice funkce pro graf nejlépe padnoucích křivek parameter_n
+def turnover_ranking(observed, disease, comparison, count=5):
+
+    """
+    Funkce pro porovnání modelu s nejlépe padnoucími křivkami obnovy buněk s pozorováním.
+
+    Parametry:
+        observed (array-like): Pozorované pravděpodobnosti výskytu za 5 let (%).
+        disease (str): Název onemocnění v popiscích grafu.
+        comparison (CurveComparison): Výsledek mmb.turnover.compare_curves.
+        count (int): Počet zobrazených nejlepších křivek.
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    observed = np.asarray(observed, dtype=np.float64)
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for i in comparison.order[:count]:
+            ax.plot(AGE_GROUPS, comparison.p_cancer_5_years[i], marker='o',
+                    label=f'{comparison.labels[i]}  R²={comparison.r2[i]:.3f}')
+        ax.plot(AGE_GROUPS, observed, label='Cancerstats', linestyle='--', color='black', marker='^')
+
+        ax.set_yscale('log')
+        ax.set_ylim(0.02, 110)
+        ax.set_yticks([0.1, 1, 10, 100], ['0.1', '1', '10', '100'])
+        ax.set_xlabel('Age')
+        ax.set_ylabel(f'{disease} rates/5 years')
+        ax.set_title(f'{disease} Probability for the best of {len(comparison.labels)} turnover curves')
+        ax.legend()
+        return fig
+
+
+# Definice funkce pro graf v logaritmickém měřítku
+def log_slope(age_range=(25, 75)):
+
+    """
+    Funkce pro vykreslení log(P(cancer)/rok) proti log(věk) s regresní přímkou (obrázek 3c).
+
+    Parametry:
+        age_range (tuple): Věkové skupiny (včetně mezí), ze kterých se počítá sklon
+            (None = nejširší lineární okno podle mmb.slopes.log_slopes).
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    model = evaluate(AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT, Q)
+    log_age_groups = np.log10(AGE_GROUPS)
+    log_p_cancer_year = np.log10(model.p_cancer_year)
+
+    # Regresní přímka pro body ve zvoleném rozsahu věku (červené body)
+    slopes = log_slopes(model.p_cancer_year)
+    window = slopes.best if age_range is None else slopes.window(*age_range)
+    age_range = slopes.age_groups[slopes.windows[window]]
+    slope, intercept = slopes.slope[window], slopes.intercept[window]
+    selected = (np.asarray(AGE_GROUPS) >= age_range[0]) & (np.asarray(AGE_GROUPS) <= age_range[1])
+    colors = np.where(selected, 'red', 'black')
+    regression_line = slope * log_age_groups[selected] + intercept
+
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.scatter(log_age_groups, log_p_cancer_year, c=colors, marker='o')
+        ax.plot(log_age_groups[selected], regression_line, color='red', linestyle='--',
+                label='Fitting Slope')
+
+        ax.set_xlim(0.5, 2.1)
+        ax.set_ylim(-4.2, 0)
+        ax.set_xticks(np.arange(0.6, 2.2, 0.2))
+        ax.set_yticks(np.arange(-4, 1, 1))
+        ax.set_xlabel('Log(Age)')
+        ax.set_ylabel('Log(cancer probability/year)')
+        ax.set_title('Cancer probability on logarithmic scale')
+        ax.text(1.3, -2.0, f'Fitting Slope = {slope:.2f}', color='black', fontsize=12)
+        return fig
+
+
+# Definice funkce pro graf kumulativních pravděpodobností
+def cumulative_rates(observed=CANCERSTATS, disease='Cancer'):
+
+    """
+    Funkce pro vykreslení kumulativních pravděpodobností výskytu podle věku (obrázek 3d).
+
+    Parametry:
+        observed (array-like): Pozorované pravděpodobnosti výskytu za 5 let (%).
+        disease (str): Název onemocnění v popiscích grafu.
+
+    Návratová hodnota:
+        Figure: Vytvořený graf.
+    """
+
+    observed = np.asarray(observed, dtype=np.float64)
+
+    # Kumulativní riziko ze součinu ročních pravděpodobností přežití (místo součtu 5letých rizik)
+    cumulative = model_risk(_turnover_models()).cumulative_risk
+
+    with stage('plotting'):
+        fig, ax = plt.subplots(figsize=(12, 7))
+        ax.plot(AGE_GROUPS, cumulative[0], label='Model with turnover reduction', marker='s',
+                linestyle='-', color='red')
+        ax.plot(AGE_GROUPS, cumulative[1], label='Model without turnover reduction', marker='o',
+                linestyle='-', color='blue')
+        ax.plot(AGE_GROUPS[:len(observed)], cumulative_from_intervals(observed), label='Cancerstats',
+                marker='^', linestyle='-', color='black')
+        ax.axhline(y=50, color='gray', linestyle='--')
+
+        ax.legend()
+        ax.set_xlabel('Age')
+        ax.set_ylabel(f'Cumulative {disease.lower()} rates')
+        ax.set_title(f'Cumulative {disease.lower()} rates accorfing to age')
+        ax.yaxis.set_major_formatter(ticker.PercentFormatter())
+        ax.set_ylim(0, 100)
+        fig.tight_layout()
+        return fig
@@ -0,0 +1,276 @@
+# Načtení knihoven
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT
+from mmb.metrics import r2_score
+from mmb.model import evaluate
+
+# Kalibrace parametrů q, p_c a křivky generation podle pozorovaného výskytu.
+#
+# Spojité parametry θ = (log10 p_c, posun generation, sklon generation) se hledají
+# Levenbergovou-Marquardtovou metodou s analytickým Jakobiánem z evaluate(jacobian=True),
+# a to pro všechny starty a všechny prahy q najednou jako jedna dávka modelu. Celé číslo q se
+# prochází po hodnotách (profil ztrátové funkce přes q). Rozsah q se rozdělí mezi
+# pracovní procesy.
+#
+# Křivka generation je g = posun + sklon * (G - G_0), kde G je výchozí křivka,
+# takže posun = G_0 a sklon = 1 odpovídají parametrům z článku.
+
+# Názvy spojitých parametrů a jejich meze
+PARAMETERS = ('log10_p_c', 'generation_offset', 'generation_slope')
+BOUNDS = np.array([[-24.0, -12.0], [1.0, 500.0], [0.0, 20.0]])
+
+# Relativní vzdálenost od meze (vůči šířce rozsahu), při které je parametr na mezi
+BOUND_TOLERANCE = 1e-6
+
+# Rozsah pro náhodné počáteční body
+START_BOX = np.array([[-20.0, -16.0], [35.0, 55.0], [0.5, 2.0]])
+
+# Podporované ztrátové funkce (součet čtverců reziduí)
+LOSSES = ('sse', 'log_sse')
+
+
+# Definice výsledku kalibrace
+@dataclass
+class FitResult:
+
+    """
+    Třída s nejlépe padnoucími parametry a profilem ztráty přes q.
+
+    Atributy:
+        q (int): Nejlepší práh počtu akumulovaných mutací.
+        p_c (float): Nejlepší pravděpodobnost vzniku rakoviny během jednoho dělení.
+        generation_offset (float): Posun křivky generation.
+        generation_slope (float): Sklon křivky generation.
+        generation (ndarray): Výsledná křivka generation.
+        loss (float): Hodnota ztrátové funkce v optimu.
+        r2 (float): Koeficient determinace v optimu.
+        p_cancer_5_years (ndarray): Predikovaná křivka v optimu.
+        q_values (ndarray): Prohledané prahy q.
+        profile_loss (ndarray): Nejlepší ztráta pro každé q.
+        profile_theta (ndarray): Nejlepší spojité parametry pro každé q, tvar (Q, 3).
+        at_bound (dict): Pro q a každý parametr z PARAMETERS, zda optimum leží na mezi
+            (BOUNDS, u q krajní hodnota q_values); takový parametr data neurčují.
+    """
+
+    q: int
+    p_c: float
+    generation_offset: float
+    generation_slope: float
+    generation: np.ndarray
+    loss: float
+    r2: float
+    p_cancer_5_years: np.ndarray
+    q_values: np.ndarray
+    profile_loss: np.ndarray
+    profile_theta: np.ndarray
+    at_bound: dict
+
+
+# Definice funkce pro výpočet křivky generation z posunu a sklonu
+def generation_curve(offset, slope, generation=GENERATION):
+
+    """
+    Funkce pro výpočet křivek generation g = posun + sklon * (G - G_0).
+
+    Parametry:
+        offset (array-like): Posun křivky, tvar (...).
+        slope (array-like): Sklon křivky, tvar (...).
+        generation (array-like): Výchozí křivka G, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Křivky generation tvaru (..., A).
+    """
+
+    generation = np.asarray(generation, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)[..., None]
+    slope = np.asarray(slope, dtype=np.float64)[..., None]
+    return offset + slope * (generation - generation[0])
+
+
+# Definice funkce pro rozpoznání parametrů na mezi
+def at_bounds(theta, tolerance=BOUND_TOLERANCE):
+
+    """
+    Funkce pro rozpoznání spojitých parametrů, které leží na mezi z BOUNDS.
+
+    Parametry:
+        theta (array-like): Spojité parametry (log10 p_c, posun, sklon), tvar (..., 3).
+        tolerance (float): Relativní vzdálenost od meze vůči šířce rozsahu.
+
+    Návratová hodnota:
+        ndarray: Zda je parametr na dolní nebo horní mezi, tvar (..., 3).
+    """
+
+    theta = np.asarray(theta, dtype=np.float64)
+    margin = tolerance * (BOUNDS[:, 1] - BOUNDS[:, 0])
+    return (theta <= BOUNDS[:, 0] + margin) | (theta >= BOUNDS[:, 1] - margin)
+
+
+# Definice funkce pro výpočet reziduí a jejich Jakobiánu
+def residuals(theta, q, observed, loss='sse', age_groups=AGE_GROUPS, generation=GENERATION,
+              parameter_n=PARAMETER_N):
+
+    """
+    Funkce pro výpočet reziduí a analytického Jakobiánu pro dávku parametrů.
+
+    Parametry:
+        theta (ndarray): Spojité parametry (log10 p_c, posun, sklon), tvar (K, 3).
+        q (ndarray): Prahy mutací, tvar (K,).
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,).
+        loss (str): 'sse' (rezidua v %) nebo 'log_sse' (rezidua logaritmů).
+        age_groups (array-like): Intervaly věku v letech.
+        generation (array-like): Výchozí křivka generation G.
+        parameter_n (array-like): Počet obnov buněk během jednoho roku.
+
+    Návratová hodnota:
+        tuple: Rezidua (K, A), Jakobián (K, A, 3) a predikované křivky (K, A).
+    """
+
+    generation = np.asarray(generation, dtype=np.float64)
+    parameter_n = np.asarray(parameter_n, dtype=np.float64)
+    p_c = 10.0 ** theta[:, 0]
+    curves = generation_curve(theta[:, 1], theta[:, 2], generation)
+    model = evaluate(age_groups, curves, parameter_n, p_c, q, jacobian=True)
+    predicted = model.p_cancer_5_years
+
+    # Řetízkové pravidlo z analytických derivací modelu podle p_c a generation
+    d_generation = model.jacobian.p_cancer_5_years_d_generation
+    jacobian = np.stack([
+        model.jacobian.p_cancer_5_years_d_p_c * p_c[:, None] * np.log(10),
+        d_generation,
+        d_generation * (generation - generation[0]),
+    ], axis=-1)
+
+    observed = np.asarray(observed, dtype=np.float64)
+    if loss == 'sse':
+        return predicted - observed, jacobian, predicted
+    if loss == 'log_sse':
+        return np.log(predicted) - np.log(observed), jacobian / predicted[..., None], predicted
+    raise ValueError(f'Neznámá ztrátová funkce {loss!r}, podporované jsou {LOSSES}')
+
+
+# Definice funkce pro dávkovou Levenbergovu-Marquardtovu optimalizaci
+def _levenberg_marquardt(theta, q, observed, loss, model_kwargs, max_iter=200, tol=1e-12):
+    theta = np.clip(theta, BOUNDS[:, 0], BOUNDS[:, 1])
+    r, jac, _ = residuals(theta, q, observed, loss, **model_kwargs)
+    cost = np.sum(r ** 2, axis=-1)
+    damping = np.full(len(theta), 1e-3)
+    active = np.ones(len(theta), dtype=bool)
+    for _ in range(max_iter):
+        if not np.any(active):
+            break
+        idx = np.flatnonzero(active)
+
+        # Krok z rovnic (JᵀJ + μ diag(JᵀJ)) δ = -Jᵀr pro všechny aktivní starty najednou
+        jt = np.swapaxes(jac[idx], -1, -2)
+        hessian = jt @ jac[idx]
+        gradient = (jt @ r[idx][..., None])[..., 0]
+        diagonal = np.einsum('kii->ki', hessian) + 1e-300
+        system = hessian + (damping[idx, None] * diagonal)[..., None] * np.eye(3)
+        step = -np.linalg.solve(system, gradient[..., None])[..., 0]
+        candidate = np.clip(theta[idx] + step, BOUNDS[:, 0], BOUNDS[:, 1])
+
+        r_new, jac_new, _ = residuals(candidate, q[idx], observed, loss, **model_kwargs)
+        cost_new = np.sum(r_new ** 2, axis=-1)
+        better = np.isfinite(cost_new) & (cost_new < cost[idx])
+
+        # Přijetí zlepšujících kroků, u ostatních se zvětší tlumení
+        accepted = idx[better]
+        improvement = cost[accepted] - cost_new[better]
+        theta[accepted], r[accepted], jac[accepted] = candidate[better], r_new[better], jac_new[better]
+        cost[accepted] = cost_new[better]
+        damping[accepted] = np.maximum(damping[accepted] / 3, 1e-12)
+        damping[idx[~better]] *= 4
+
+        # Konec pro starty, které se už nezlepšují
+        stalled = idx[~better][damping[idx[~better]] > 1e12]
+        converged = accepted[improvement <= tol * np.maximum(cost[accepted], 1e-300)]
+        active[stalled] = False
+        active[converged] = False
+    return theta, cost
+
+
+# Funkce spouštěná v pracovním procesu: optimalizace všech startů pro skupinu prahů q
+def _fit_q_block(q_values, starts, observed, loss, model_kwargs):
+    q = np.repeat(q_values, len(starts))
+    theta = np.tile(starts, (len(q_values), 1))
+    theta, cost = _levenberg_marquardt(theta, q, observed, loss, model_kwargs)
+    cost = cost.reshape(len(q_values), len(starts))
+    best = np.argmin(np.where(np.isfinite(cost), cost, np.inf), axis=1)
+    rows = np.arange(len(q_values))
+    theta = theta.reshape(len(q_values), len(starts), 3)
+    return cost[rows, best], theta[rows, best]
+
+
+# Definice funkce pro kalibraci modelu
+def fit(observed, q_values=range(80, 201), loss='sse', n_starts=8, workers=None, seed=0,
+        age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N):
+
+    """
+    Funkce pro nalezení parametrů q, p_c a křivky generation, které nejlépe odpovídají datům.
+
+    Parametry:
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%).
+        q_values (iterable): Prohledávané prahy q.
+        loss (str): Ztrátová funkce 'sse' nebo 'log_sse'.
+        n_starts (int): Počet počátečních bodů pro každé q (první je vždy bod z článku).
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+        seed (int): Semínko generátoru náhodných počátečních bodů.
+        age_groups (array-like): Intervaly věku v letech.
+        generation (array-like): Výchozí křivka generation G.
+        parameter_n (array-like): Počet obnov buněk během jednoho roku.
+
+    Návratová hodnota:
+        FitResult: Nejlepší parametry a profil ztráty přes q.
+    """
+
+    if loss not in LOSSES:
+        raise ValueError(f'Neznámá ztrátová funkce {loss!r}, podporované jsou {LOSSES}')
+    observed = np.asarray(observed, dtype=np.float64)
+    q_values = np.asarray(list(q_values), dtype=np.int64)
+    generation = np.asarray(generation, dtype=np.float64)
+    model_kwargs = {'age_groups': age_groups, 'generation': generation, 'parameter_n': parameter_n}
+
+    # Počáteční body: parametry z článku a náhodné body z rozumného rozsahu
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(START_BOX[:, 0], START_BOX[:, 1], size=(n_starts, 3))
+    starts[0] = [np.log10(P_CONSTANT), generation[0], 1.0]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        profile_loss, profile_theta = _fit_q_block(q_values, starts, observed, loss, model_kwargs)
+    else:
+        blocks = np.array_split(q_values, min(workers, len(q_values)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_fit_q_block, blocks, [starts] * len(blocks),
+                                      [observed] * len(blocks), [loss] * len(blocks),
+                                      [model_kwargs] * len(blocks)))
+        profile_loss = np.concatenate([part[0] for part in parts])
+        profile_theta = np.concatenate([part[1] for part in parts])
+
+    # Výběr nejlepšího prahu a přepočet modelu v optimu
+    best = int(np.argmin(profile_loss))
+    theta = profile_theta[best]
+    curve = generation_curve(theta[1], theta[2], generation)
+    model = evaluate(age_groups, curve, parameter_n, 10.0 ** theta[0], q_values[best])
+    return FitResult(
+        q=int(q_values[best]),
+        p_c=float(10.0 ** theta[0]),
+        generation_offset=float(theta[1]),
+        generation_slope=float(theta[2]),
+        generation=curve,
+        loss=float(profile_loss[best]),
+        r2=float(r2_score(observed, model.p_cancer_5_years)),
+        p_cancer_5_years=np.asarray(model.p_cancer_5_years),
+        q_values=q_values,
+        profile_loss=profile_loss,
+        profile_theta=profile_theta,
+        at_bound=dict(zip(('q',) + PARAMETERS,
+                          [len(q_values) > 1 and best in (0, len(q_values) - 1)]
+                          + at_bounds(theta).tolist())),
+    )
@@ -0,0 +1,178 @@
+# Načtení knihoven
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, CANCERSTATS, LEUKEMIA_STATS
+from mmb.profiling import stage
+
+# Pozorovaný výskyt pro více druhů rakoviny (a pohlaví) najednou.
+#
+# Každý soubor CSV ve složce odpovídá jednomu druhu rakoviny (název souboru bez
+# přípony). První sloupec obsahuje věkovou skupinu, každý další sloupec jednu
+# řadu pozorovaných hodnot P(cancer)/5 let (%), typicky pro pohlaví ('Persons',
+# 'Male', 'Female'). Oddělovač (',' nebo ';') se rozpozná automaticky. Všechny
+# řady se zarovnají na společné věkové skupiny do pole tvaru (S, A); chybějící
+# věkové skupiny jsou NaN a při výpočtu R² se vynechají.
+#
+# R² všech řad proti všem predikovaným křivkám se počítá najednou maticovým
+# součinem (rozvinutím součtu čtverců), takže nevzniká pomocné pole tvaru
+# (S, N, A) a porovnání 30 druhů rakoviny stojí jeden průchod přes křivky.
+
+
+# Definice pozorovaných dat pro více řad
+@dataclass
+class IncidenceData:
+
+    """
+    Třída s pozorovaným výskytem pro více druhů rakoviny a pohlaví.
+
+    Atributy:
+        sites (list): Druh rakoviny pro každou řadu.
+        sexes (list): Pohlaví (název sloupce) pro každou řadu.
+        age_groups (ndarray): Společné věkové skupiny, tvar (A,).
+        rates (ndarray): Pozorované hodnoty P(cancer)/5 let (%), tvar (S, A), chybějící jsou NaN.
+    """
+
+    sites: list
+    sexes: list
+    age_groups: np.ndarray
+    rates: np.ndarray
+
+    def __len__(self):
+        return len(self.rates)
+
+    @property
+    def labels(self):
+        return [f'{site} ({sex})' for site, sex in zip(self.sites, self.sexes)]
+
+    def select(self, sites=None, sexes=None):
+
+        """
+        Funkce pro výběr řad podle druhu rakoviny a pohlaví.
+
+        Parametry:
+            sites (iterable): Vybrané druhy rakoviny (None = všechny).
+            sexes (iterable): Vybraná pohlaví (None = všechna).
+
+        Návratová hodnota:
+            IncidenceData: Data jen s vybranými řadami.
+        """
+
+        keep = [i for i, (site, sex) in enumerate(zip(self.sites, self.sexes))
+                if (sites is None or site in sites) and (sexes is None or sex in sexes)]
+        return IncidenceData(sites=[self.sites[i] for i in keep], sexes=[self.sexes[i] for i in keep],
+                             age_groups=self.age_groups, rates=self.rates[keep])
+
+    def score(self, predicted_values):
+
+        """
+        Funkce pro výpočet R² každé řady proti každé predikované křivce.
+
+        Parametry:
+            predicted_values (array-like): Predikované hodnoty, tvar (..., A).
+
+        Návratová hodnota:
+            ndarray: Koeficient determinace, tvar (S, ...).
+        """
+
+        return score_sites(self.rates, predicted_values)
+
+
+# Definice funkce pro načtení jednoho souboru CSV
+def _read_site(path):
+    text = Path(path).read_text(encoding='utf-8-sig')
+    dialect = csv.Sniffer().sniff(text.splitlines()[0], delimiters=',;\t')
+    rows = [row for row in csv.reader(text.splitlines(), dialect) if row]
+    header, body = rows[0], rows[1:]
+    ages = np.array([float(row[0]) for row in body])
+    columns = {name.strip(): np.array([float(row[i]) if row[i].strip() else np.nan for row in body])
+               for i, name in enumerate(header[1:], start=1)}
+    return ages, columns
+
+
+# Definice funkce pro načtení složky se soubory CSV
+def load_incidence(directory, age_groups=AGE_GROUPS, pattern='*.csv'):
+
+    """
+    Funkce pro načtení pozorovaného výskytu ze složky souborů CSV (jeden soubor = jeden druh rakoviny).
+
+    Parametry:
+        directory (str | Path): Složka se soubory CSV.
+        age_groups (array-like): Věkové skupiny, na které se data zarovnají.
+        pattern (str): Maska názvů souborů.
+
+    Návratová hodnota:
+        IncidenceData: Všechny řady jako pole tvaru (S, A).
+    """
+
+    age_groups = np.asarray(age_groups)
+    paths = sorted(Path(directory).glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f'Ve složce {directory} nejsou žádné soubory {pattern}')
+
+    sites, sexes, rates = [], [], []
+    for path in paths:
+        ages, columns = _read_site(path)
+        position = {age: i for i, age in enumerate(ages)}
+        unknown = set(position) - set(age_groups.astype(np.float64))
+        if unknown:
+            raise ValueError(f'Soubor {path.name} obsahuje neznámé věkové skupiny {sorted(unknown)}')
+        index = np.array([position.get(float(age), -1) for age in age_groups])
+        for sex, values in columns.items():
+            sites.append(path.stem)
+            sexes.append(sex)
+            rates.append(np.where(index >= 0, values[index], np.nan))
+    return IncidenceData(sites=sites, sexes=sexes, age_groups=age_groups, rates=np.array(rates))
+
+
+# Definice funkce pro data, která jsou součástí mmb.data
+def builtin_incidence():
+
+    """
+    Funkce pro vytvoření dat z řad CANCERSTATS a LEUKEMIA_STATS.
+
+    Návratová hodnota:
+        IncidenceData: Dvě řady ('all cancers' a 'leukaemia', obě pro 'Persons').
+    """
+
+    return IncidenceData(sites=['all cancers', 'leukaemia'], sexes=['Persons', 'Persons'],
+                         age_groups=np.asarray(AGE_GROUPS),
+                         rates=np.array([CANCERSTATS, LEUKEMIA_STATS], dtype=np.float64))
+
+
+# Definice funkce pro výpočet R² všech řad proti všem křivkám
+def score_sites(observed, predicted_values):
+
+    """
+    Funkce pro výpočet koeficientu determinace (R^2) pro všechny dvojice (řada, křivka).
+
+    Věkové skupiny, pro které řada nemá hodnotu (NaN), se pro danou řadu vynechají.
+
+    Parametry:
+        observed (array-like): Pozorované hodnoty, tvar (S, A).
+        predicted_values (array-like): Predikované hodnoty, tvar (..., A).
+
+    Návratová hodnota:
+        ndarray: Koeficient determinace, tvar (S, ...).
+    """
+
+    with stage('metrics'):
+        observed = np.atleast_2d(np.asarray(observed, dtype=np.float64))
+        predicted_values = np.asarray(predicted_values, dtype=np.float64)
+        batch_shape = predicted_values.shape[:-1]
+        predicted = predicted_values.reshape(-1, predicted_values.shape[-1])
+
+        # Váhy 0/1 pro chybějící hodnoty a součet čtverců Σ w (o - p)² = Σ w o² - 2 (w o) p + w p²
+        weight = np.isfinite(observed).astype(np.float64)
+        observed = np.where(weight > 0, observed, 0.0)
+        count = weight.sum(axis=-1)
+        mean = (weight * observed).sum(axis=-1) / count
+        ss_tot = (weight * (observed - mean[:, None]) ** 2).sum(axis=-1)
+        ss_res = ((weight * observed ** 2).sum(axis=-1)[:, None]
+                  - 2 * (weight * observed) @ predicted.T
+                  + weight @ (predicted ** 2).T)
+        r2 = 1 - np.maximum(ss_res, 0.0) / ss_tot[:, None]
+        return r2.reshape((len(observed),) + batch_shape)
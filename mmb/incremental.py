@@ -0,0 +1,247 @@
+# Načtení knihoven
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, CANCERSTATS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.metrics import r2_score
+from mmb.model import ModelResult
+from mmb.poisson import compute_pa
+from mmb.profiling import stage
+from mmb.risk import interval_widths
+
+# Tabulka modelu jako graf závislostí pojmenovaných sloupců s uloženými hodnotami.
+#
+# Každý odvozený sloupec (p_a, p, λ, p_0, P(cancer)/rok, ...) zná své vstupní sloupce
+# a ke každému sloupci se pamatuje maska řádků (věkových skupin), jejichž hodnota
+# je zastaralá. Změna vstupu (např. jedné hodnoty parameter_n) označí jen změněné
+# řádky a maska se šíří po grafu dolů:
+#
+#   rows:        řádek i závisí jen na řádku i vstupů (většina sloupců),
+#   neighbors:   řádek i závisí na řádcích i - 1, i a i + 1 (délky věkových intervalů
+#                se středy ve věkových skupinách, viz mmb.risk.age_edges),
+#   cumulative:  řádek i závisí na všech řádcích ≤ i (logaritmus přežití),
+#
+# takže např. změna n v jedné věkové skupině přepočítá p_0 a P(cancer) jen v této
+# skupině a kumulativní riziko od ní dál, zatímco p_a (závisí jen na q a generation)
+# se nepřepočítá vůbec. Hodnoty se počítají líně až při čtení sloupce.
+
+# Vstupní sloupce tabulky
+INPUTS = ('age_groups', 'generation', 'parameter_n', 'p_c', 'q', 'cancerstats')
+
+
+# Definice odvozeného sloupce
+@dataclass(frozen=True)
+class Column:
+
+    """
+    Třída s popisem odvozeného sloupce grafu.
+
+    Atributy:
+        inputs (tuple): Názvy sloupců, ze kterých se sloupec počítá.
+        function (callable): Výpočet hodnot z vybraných řádků vstupních sloupců
+            (pro kind='cumulative' přírůstek, který se kumulativně sečte, pro
+            kind='neighbors' hodnoty všech řádků z celých vstupních sloupců).
+        kind (str): Závislost řádků na vstupech ('rows', 'neighbors' nebo 'cumulative').
+    """
+
+    inputs: tuple
+    function: callable
+    kind: str = 'rows'
+
+
+# Definice funkce pro exponent e^λ (pro extrémní λ může být inf)
+def _e_lambda(lambda_np):
+    with np.errstate(over='ignore'):
+        return np.exp(lambda_np)
+
+
+# Graf odvozených sloupců v topologickém pořadí
+COLUMNS = {
+    'p_accumulative': Column(('q', 'generation'), compute_pa),
+    'p_all': Column(('p_c', 'p_accumulative'), np.add),
+    'lambda_np': Column(('parameter_n', 'p_all'), np.multiply),
+    'e_lambda': Column(('lambda_np',), _e_lambda),
+    'p_0': Column(('lambda_np',), lambda lambda_np: np.exp(-lambda_np)),
+    'p_cancer_year': Column(('lambda_np',), lambda lambda_np: -np.expm1(-lambda_np)),
+    'p_cancer_5_years': Column(('p_cancer_year',), lambda p_cancer_year: 100 * 5 * p_cancer_year),
+    'interval_width': Column(('age_groups',), interval_widths, kind='neighbors'),
+    'hazard': Column(('lambda_np', 'interval_width'), np.multiply),
+    'log_survival': Column(('hazard',), np.negative, kind='cumulative'),
+    'cumulative_risk': Column(('log_survival',), lambda log_survival: -100 * np.expm1(log_survival)),
+}
+
+
+# Definice tabulky modelu s přírůstkovým přepočtem
+class ModelTable:
+
+    """
+    Třída tabulky modelu pro jednu sadu parametrů, která po změně vstupu přepočítá
+    jen řádky a sloupce závislé na změně.
+
+    Příklad:
+        table = ModelTable()
+        table.update('parameter_n', 5e11, rows=12)
+        table['p_cancer_5_years'], table.r2
+
+    Atributy:
+        values (dict): Uložené hodnoty všech sloupců, tvar (A,).
+        stale (dict): Masky zastaralých řádků odvozených sloupců, tvar (A,).
+        evaluations (Counter): Počet přepočítaných řádků pro každý sloupec.
+    """
+
+    def __init__(self, age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N,
+                 p_c=P_CONSTANT, q=Q, cancerstats=CANCERSTATS):
+
+        """
+        Funkce pro vytvoření tabulky; všechny odvozené sloupce jsou na začátku zastaralé.
+
+        Parametry:
+            age_groups (array-like): Intervaly věku v letech, tvar (A,).
+            generation (array-like): Průměrný počet mutací pro každou buňku, tvar (A,).
+            parameter_n (array-like): Počet obnov buněk během jednoho roku, tvar (A,).
+            p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení (skalár nebo (A,)).
+            q (array-like): Práh počtu akumulovaných mutací (skalár nebo (A,)).
+            cancerstats (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,).
+        """
+
+        count = len(age_groups)
+        inputs = dict(age_groups=age_groups, generation=generation, parameter_n=parameter_n,
+                      p_c=p_c, q=q, cancerstats=cancerstats)
+        self.values = {name: np.array(np.broadcast_to(np.asarray(value, dtype=np.float64), (count,)))
+                       for name, value in inputs.items()}
+        for name in COLUMNS:
+            self.values[name] = np.full(count, np.nan)
+        self.stale = {name: np.ones(count, dtype=bool) for name in COLUMNS}
+        self.evaluations = Counter()
+
+        # Přímí následníci každého sloupce pro šíření zastaralých řádků
+        self._dependents = {name: [] for name in INPUTS + tuple(COLUMNS)}
+        for name, column in COLUMNS.items():
+            for source in column.inputs:
+                self._dependents[source].append(name)
+
+    def __len__(self):
+        return len(self.values['age_groups'])
+
+    def __getitem__(self, name):
+        if name in COLUMNS:
+            self._refresh(name)
+        elif name not in INPUTS:
+            raise KeyError(f'Neznámý sloupec {name!r}')
+        return self.values[name]
+
+    def update(self, name, values, rows=None):
+
+        """
+        Funkce pro změnu vstupního sloupce; zastaralé se označí jen řádky, jejichž hodnota se změnila.
+
+        Parametry:
+            name (str): Název vstupního sloupce z INPUTS.
+            values (array-like): Nové hodnoty pro vybrané řádky (nebo skalár).
+            rows (int | slice | array-like): Řádky, které se mění (None = všechny).
+
+        Návratová hodnota:
+            ndarray: Maska změněných řádků, tvar (A,).
+        """
+
+        if name not in INPUTS:
+            raise KeyError(f'Sloupec {name!r} není vstupem tabulky, vstupy jsou {INPUTS}')
+        rows = slice(None) if rows is None else rows
+        updated = self.values[name].copy()
+        updated[rows] = values
+        changed = updated != self.values[name]
+        self.values[name] = updated
+        if changed.any():
+            self._invalidate(name, changed)
+        return changed
+
+    @contextmanager
+    def override(self, name, values, rows=None):
+
+        """
+        Funkce pro dočasnou změnu vstupu (co kdyby); po opuštění bloku se hodnoty vrátí.
+
+        Parametry:
+            name (str): Název vstupního sloupce z INPUTS.
+            values (array-like): Dočasné hodnoty pro vybrané řádky (nebo skalár).
+            rows (int | slice | array-like): Řádky, které se mění (None = všechny).
+        """
+
+        original = self.values[name].copy()
+        self.update(name, values, rows)
+        try:
+            yield self
+        finally:
+            self.update(name, original)
+
+    @property
+    def r2(self):
+        return r2_score(self.values['cancerstats'], self['p_cancer_5_years'])
+
+    def result(self):
+
+        """
+        Funkce pro převod aktuálního stavu tabulky na ModelResult (např. pro to_frame nebo store_model).
+
+        Návratová hodnota:
+            ModelResult: Mezivýsledky modelu, tvar (A,).
+        """
+
+        names = ('age_groups', 'generation', 'parameter_n', 'p_c', 'q', 'p_accumulative', 'p_all',
+                 'lambda_np', 'e_lambda', 'p_0', 'p_cancer_year', 'p_cancer_5_years')
+        return ModelResult(**{name: self[name] for name in names})
+
+    # Označení zastaralých řádků všech sloupců pod změněným sloupcem
+    def _invalidate(self, name, changed):
+        pending = [(name, changed)]
+        while pending:
+            source, mask = pending.pop()
+            for target in self._dependents[source]:
+                kind = COLUMNS[target].kind
+                if kind == 'neighbors':
+                    mask_target = mask.copy()
+                    mask_target[1:] |= mask[:-1]
+                    mask_target[:-1] |= mask[1:]
+                elif kind == 'cumulative':
+                    mask_target = np.cumsum(mask) > 0
+                else:
+                    mask_target = mask
+                new = mask_target & ~self.stale[target]
+                if new.any():
+                    self.stale[target] |= new
+                    pending.append((target, new))
+
+    # Přepočet zastaralých řádků sloupce (a nejdřív jeho vstupů)
+    def _refresh(self, name):
+        column = COLUMNS[name]
+        for source in column.inputs:
+            if source in COLUMNS:
+                self._refresh(source)
+        stale = self.stale[name]
+        if not stale.any():
+            return
+
+        with stage('incremental'):
+            # Nové pole místo zápisu do uloženého, aby se dříve vrácené hodnoty nezměnily
+            inputs = [self.values[source] for source in column.inputs]
+            values = self.values[name].copy()
+            if column.kind == 'cumulative':
+
+                # Od první zastaralé skupiny dál navázat na uloženou hodnotu předchozí skupiny
+                first = int(np.argmax(stale))
+                previous = values[first - 1] if first else 0.0
+                values[first:] = previous + np.cumsum(column.function(*(x[first:] for x in inputs)))
+                self.evaluations[name] += len(values) - first
+            elif column.kind == 'neighbors':
+                rows = np.flatnonzero(stale)
+                values[rows] = column.function(*inputs)[rows]
+                self.evaluations[name] += len(rows)
+            else:
+                rows = np.flatnonzero(stale)
+                values[rows] = column.function(*(x[rows] for x in inputs))
+                self.evaluations[name] += len(rows)
+            self.values[name] = values
+            stale[:] = False
@@ -0,0 +1,28 @@
+# Načtení knihoven
+import numpy as np
+
+from mmb.profiling import stage
+
+
+# Definice funkce pro výpočet koeficientu determinace
+def r2_score(true_values, predicted_values):
+
+    """
+    Funkce pro výpočet koeficientu determinace (R^2) pro celé dávky křivek najednou.
+
+    Výsledek pro jednu křivku je stejný jako sklearn.metrics.r2_score.
+
+    Parametry:
+        true_values (array-like): Skutečné hodnoty, tvar (..., A).
+        predicted_values (array-like): Predikované hodnoty, tvar (..., A).
+
+    Návratová hodnota:
+        ndarray: Koeficient determinace pro každou křivku, tvar (...).
+    """
+
+    with stage('metrics'):
+        true_values = np.asarray(true_values, dtype=np.float64)
+        predicted_values = np.asarray(predicted_values, dtype=np.float64)
+        ss_res = np.sum((true_values - predicted_values) ** 2, axis=-1)
+        ss_tot = np.sum((true_values - true_values.mean(axis=-1, keepdims=True)) ** 2, axis=-1)
+        return 1 - ss_res / ss_tot
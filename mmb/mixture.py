@@ -0,0 +1,300 @@
+# Načtení knihoven
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.metrics import r2_score
+from mmb.profiling import stage
+from mmb.risk import interval_widths
+from mmb.tail_table import TailTable
+
+# Model heterogenní populace: q, p_c a počet obnov n se liší mezi jedinci.
+#
+# Každý jedinec má vlastní práh q, vlastní p_c a vlastní násobek s křivky
+# parameter_n. Rozdělení v populaci jsou
+#
+#   q ~ N(q_mean, q_sd²) zaokrouhlené na celá čísla (q_sd = 0 je jediný práh),
+#   log10 p_c ~ N(log10_p_c_mean, log10_p_c_sd²),
+#   log s ~ N(0, log_n_sd²).
+#
+# Výskyt v populaci je směs přes jedince. Se selekcí (selection=True) se každý
+# jedinec váží pravděpodobností, že se věkové skupiny dožil bez rakoviny, takže
+# jedinci s vysokým rizikem z populace ve vyšším věku ubývají:
+#
+#   P_pop(a_i) = E[S_{i-1} P(a_i)] / E[S_{i-1}],   S_{i-1} = exp(-Σ_{j<i} λ_j Δa_j),
+#
+# kde Δa_j je délka intervalu se středem ve věkové skupině a_j (stejná konvence
+# jako v mmb.risk, viz interval_widths).
+#
+# Pro q se sčítá přes všechna celá čísla v rozsahu ±6 σ a p_accumulative se pro
+# ně jen vyhledá v jedné TailTable sestavené pro celý rozsah (tisíce prahů stojí
+# jedno sestavení tabulky). Přes p_c a s se integruje Gaussovou-Hermitovou
+# kvadraturou, nebo se jedinci náhodně vzorkují (method='sampling'). Všechny sady
+# parametrů rozdělení se počítají najednou po blocích, takže jde parametry rozdělení
+# kalibrovat metodou křížové entropie (fit_mixture).
+
+# Názvy parametrů rozdělení a jejich meze
+PARAMETERS = ('q_mean', 'q_sd', 'log10_p_c_mean', 'log10_p_c_sd', 'log_n_sd')
+BOUNDS = np.array([[50.0, 300.0], [0.0, 100.0], [-24.0, -12.0], [0.0, 3.0], [0.0, 2.0]])
+
+# Podporované metody integrace
+METHODS = ('quadrature', 'sampling')
+
+# Šířka rozsahu q v násobcích σ a největší počet prvků mezivýsledku jednoho bloku
+_Q_WIDTH = 6.0
+_BLOCK_ELEMENTS = 2 ** 21
+
+
+# Definice výsledku kalibrace směsi
+@dataclass
+class MixtureFit:
+
+    """
+    Třída s nejlépe padnoucími parametry rozdělení v populaci.
+
+    Atributy:
+        parameters (dict): Parametry rozdělení podle PARAMETERS.
+        loss (float): Součet čtverců reziduí v optimu.
+        r2 (float): Koeficient determinace v optimu.
+        p_cancer_5_years (ndarray): Výskyt v populaci v optimu, tvar (A,).
+        evaluations (int): Počet vyhodnocených sad parametrů.
+    """
+
+    parameters: dict
+    loss: float
+    r2: float
+    p_cancer_5_years: np.ndarray
+    evaluations: int
+
+
+# Distribuční funkce normovaného normálního rozdělení (NumPy nemá erf)
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _normal_cdf(z):
+    return 0.5 * (1 + _erf(z / math.sqrt(2)).astype(np.float64))
+
+
+# Definice funkce pro váhy prahů q
+def q_weights(q_mean, q_sd, q_values):
+
+    """
+    Funkce pro váhy normálního rozdělení prahu q zaokrouhleného na celá čísla.
+
+    Parametry:
+        q_mean (array-like): Střední hodnota q, tvar (K,).
+        q_sd (array-like): Směrodatná odchylka q, tvar (K,).
+        q_values (ndarray): Celočíselné prahy, tvar (Q,).
+
+    Návratová hodnota:
+        ndarray: Normované váhy, tvar (K, Q).
+    """
+
+    # P(q - 1/2 ≤ X < q + 1/2); pro q_sd = 0 je z = ±inf a celá váha připadne nejbližšímu prahu
+    q_mean = np.asarray(q_mean, dtype=np.float64)[..., None]
+    q_sd = np.asarray(q_sd, dtype=np.float64)[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (np.append(q_values, q_values[-1] + 1) - 0.5 - q_mean) / q_sd
+    cdf = _normal_cdf(np.nan_to_num(z, nan=0.0))
+    weights = np.diff(cdf, axis=-1)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+# Definice funkce pro výskyt v populaci z mezivýsledků jedinců
+def _population_rates(lambda_np, weights, widths, selection):
+
+    """
+    Funkce pro vážený průměr P(cancer)/5 let přes jedince (osa -2).
+
+    Parametry:
+        lambda_np (ndarray): Roční intenzita jedinců, tvar (K, J, A).
+        weights (ndarray): Váhy jedinců, tvar (K, J).
+        widths (ndarray): Délky věkových intervalů, tvar (A,).
+        selection (bool): Zda vážit pravděpodobností přežití bez rakoviny.
+
+    Návratová hodnota:
+        ndarray: Výskyt v populaci (v %), tvar (K, A).
+    """
+
+    rates = -500 * np.expm1(-lambda_np)
+    weights = np.broadcast_to(weights[..., None], lambda_np.shape)
+    if selection:
+        # Logaritmus přežití do začátku věkové skupiny (kumulativní součet bez aktuální skupiny)
+        hazard = lambda_np * widths
+        log_survival = hazard - np.cumsum(hazard, axis=-1)
+        weights = weights * np.exp(log_survival)
+
+    # Pokud rakovina vznikla u všech jedinců dřív, než se věkové skupiny dožili, je výsledek NaN
+    with np.errstate(invalid='ignore'):
+        return np.einsum('kja,kja->ka', weights, rates) / weights.sum(axis=-2)
+
+
+# Definice funkce pro výskyt v heterogenní populaci
+def mixture_rates(q_mean=Q, q_sd=0.0, log10_p_c_mean=np.log10(P_CONSTANT), log10_p_c_sd=0.0,
+                  log_n_sd=0.0, selection=True, method='quadrature', nodes=5, samples=4000, seed=0,
+                  age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N):
+
+    """
+    Funkce pro výskyt P(cancer)/5 let (%) v populaci s rozdělením q, p_c a n mezi jedinci.
+
+    Parametry rozdělení se broadcastují na tvar (K,) a pro každou sadu se vrátí jedna křivka.
+
+    Parametry:
+        q_mean (array-like): Střední hodnota prahu q.
+        q_sd (array-like): Směrodatná odchylka prahu q.
+        log10_p_c_mean (array-like): Střední hodnota log10 p_c.
+        log10_p_c_sd (array-like): Směrodatná odchylka log10 p_c.
+        log_n_sd (array-like): Směrodatná odchylka logaritmu násobku křivky parameter_n.
+        selection (bool): Zda vážit jedince pravděpodobností přežití bez rakoviny.
+        method (str): 'quadrature' (Gaussova-Hermitova kvadratura) nebo 'sampling' (náhodní jedinci).
+        nodes (int): Počet uzlů kvadratury pro p_c a pro n.
+        samples (int): Počet náhodných jedinců pro každou sadu (jen method='sampling').
+        seed (int): Semínko generátoru náhodných čísel (jen method='sampling').
+        age_groups (array-like): Středy věkových intervalů v letech (viz mmb.risk.age_edges), tvar (A,).
+        generation (array-like): Průměrný počet mutací pro každou buňku, tvar (A,).
+        parameter_n (array-like): Počet obnov buněk během jednoho roku, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Výskyt v populaci (v %), tvar (K, A) (nebo (A,) pro skalární parametry).
+    """
+
+    if method not in METHODS:
+        raise ValueError(f'Neznámá metoda {method!r}, podporované jsou {METHODS}')
+    q_mean, q_sd, log10_p_c_mean, log10_p_c_sd, log_n_sd = (
+        np.asarray(value, dtype=np.float64) for value in
+        np.broadcast_arrays(q_mean, q_sd, log10_p_c_mean, log10_p_c_sd, log_n_sd))
+    scalar = q_mean.ndim == 0
+    theta = np.stack([np.atleast_1d(value) for value in
+                      (q_mean, q_sd, log10_p_c_mean, log10_p_c_sd, log_n_sd)], axis=-1)
+    generation = np.asarray(generation, dtype=np.float64)
+    parameter_n = np.asarray(parameter_n, dtype=np.float64)
+    widths = interval_widths(age_groups)
+
+    # Jedna tabulka chvostů pro všechny prahy q, které mají u některé sady nenulovou váhu
+    reach = _Q_WIDTH * theta[:, 1] + 1
+    q_min = max(int(np.floor(np.min(theta[:, 0] - reach))), 0)
+    q_max = max(int(np.ceil(np.max(theta[:, 0] + reach))), q_min)
+    with stage('mixture_table', q_count=q_max - q_min + 1):
+        table = TailTable(generation, q_max, q_min)
+        p_accumulative = np.exp(table.log_tail)
+        q_values = np.arange(q_min, q_max + 1)
+
+    # Sady se seřadí podle q a rozdělí do bloků tak, aby souvislý rozsah prahů bloku
+    # krát počet jedinců na práh nepřesáhl _BLOCK_ELEMENTS
+    order = np.argsort(theta[:, 0], kind='stable')
+    low = np.clip(np.floor(theta[order, 0] - reach[order]).astype(np.int64), q_min, q_max) - q_min
+    high = np.clip(np.ceil(theta[order, 0] + reach[order]).astype(np.int64), q_min, q_max) - q_min
+    if method == 'quadrature':
+        x, w = np.polynomial.hermite_e.hermegauss(nodes)
+        w = w / w.sum()
+        per_set, per_q = 0, nodes * nodes * len(generation)
+    else:
+        rng = np.random.default_rng(seed)
+        per_set, per_q = samples * len(generation), 0
+
+    result = np.empty((len(theta), len(generation)))
+    start = 0
+    while start < len(theta):
+        stop = start + 1
+        while (stop < len(theta) and (stop + 1 - start) * (per_set + per_q * (
+                high[start:stop + 1].max() - low[start] + 1)) <= _BLOCK_ELEMENTS):
+            stop += 1
+        part = theta[order[start:stop]]
+        rows = slice(low[start], high[start:stop].max() + 1)
+        with stage('mixture', size=stop - start):
+            if method == 'quadrature':
+                # Jedinci = (q, uzel p_c, uzel s) s vahou w_q · w_c · w_s
+                p_c = 10.0 ** (part[:, 2, None] + part[:, 3, None] * x)
+                scale = np.exp(part[:, 4, None] * x)
+                p_all = p_c[:, None, :, None, None] + p_accumulative[None, rows, None, None, :]
+                lambda_np = scale[:, None, None, :, None] * parameter_n * p_all
+                weights = (q_weights(part[:, 0], part[:, 1], q_values[rows])[:, :, None, None]
+                           * w[:, None] * w)
+                lambda_np = lambda_np.reshape(len(part), -1, len(generation))
+                weights = weights.reshape(len(part), -1)
+            else:
+                # Náhodní jedinci se stejnou vahou
+                z = rng.standard_normal((3, len(part), samples))
+                q = np.rint(part[:, 0, None] + part[:, 1, None] * z[0])
+                q = np.clip(q, q_min, q_max).astype(np.int64)
+                p_c = 10.0 ** (part[:, 2, None] + part[:, 3, None] * z[1])
+                scale = np.exp(part[:, 4, None] * z[2])
+                lambda_np = (scale[..., None] * parameter_n
+                             * (p_c[..., None] + p_accumulative[q - q_min]))
+                weights = np.full((len(part), samples), 1 / samples)
+            result[order[start:stop]] = _population_rates(lambda_np, weights, widths, selection)
+        start = stop
+    return result[0] if scalar else result
+
+
+# Definice funkce pro kalibraci parametrů rozdělení
+def fit_mixture(observed, iterations=40, candidates=256, elite=0.1, fixed=None, selection=True,
+                nodes=5, seed=0, age_groups=AGE_GROUPS, generation=GENERATION,
+                parameter_n=PARAMETER_N):
+
+    """
+    Funkce pro kalibraci parametrů rozdělení v populaci metodou křížové entropie.
+
+    V každé iteraci se z normálního rozdělení vylosuje dávka kandidátů, všichni se
+    vyhodnotí jedním voláním mixture_rates a z nejlepšího podílu (elity) se odhadne
+    nový střed a rozptyl rozdělení kandidátů.
+
+    Parametry:
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,).
+        iterations (int): Počet iterací.
+        candidates (int): Počet kandidátů v jedné iteraci.
+        elite (float): Podíl nejlepších kandidátů, ze kterých se odhaduje nové rozdělení.
+        fixed (dict): Parametry z PARAMETERS, které se nekalibrují (např. {'log_n_sd': 0.0}).
+        selection (bool): Zda vážit jedince pravděpodobností přežití bez rakoviny.
+        nodes (int): Počet uzlů kvadratury pro p_c a pro n.
+        seed (int): Semínko generátoru náhodných čísel.
+        age_groups (array-like): Středy věkových intervalů v letech (viz mmb.risk.age_edges).
+        generation (array-like): Průměrný počet mutací pro každou buňku.
+        parameter_n (array-like): Počet obnov buněk během jednoho roku.
+
+    Návratová hodnota:
+        MixtureFit: Nejlepší parametry rozdělení a výskyt v populaci v optimu.
+    """
+
+    observed = np.asarray(observed, dtype=np.float64)
+    fixed = {} if fixed is None else dict(fixed)
+    unknown = set(fixed) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f'Neznámé parametry {sorted(unknown)}, podporované jsou {PARAMETERS}')
+    free = np.array([name not in fixed for name in PARAMETERS])
+
+    # Počáteční rozdělení kandidátů: střed v parametrech z článku, šířka čtvrtina rozsahu mezí
+    mean = np.array([Q, 5.0, np.log10(P_CONSTANT), 0.5, 0.2])
+    for i, name in enumerate(PARAMETERS):
+        mean[i] = fixed.get(name, mean[i])
+    sd = np.where(free, (BOUNDS[:, 1] - BOUNDS[:, 0]) / 4, 0.0)
+    rng = np.random.default_rng(seed)
+    count = max(int(round(elite * candidates)), 2)
+    best_theta, best_loss = mean.copy(), np.inf
+
+    for _ in range(iterations):
+        theta = np.clip(mean + sd * rng.standard_normal((candidates, len(PARAMETERS))),
+                        BOUNDS[:, 0], BOUNDS[:, 1])
+        theta[0] = np.clip(best_theta if np.isfinite(best_loss) else mean, BOUNDS[:, 0], BOUNDS[:, 1])
+        predicted = mixture_rates(*theta.T, selection=selection, nodes=nodes, age_groups=age_groups,
+                                  generation=generation, parameter_n=parameter_n)
+        loss = np.sum((predicted - observed) ** 2, axis=-1)
+        loss = np.where(np.isfinite(loss), loss, np.inf)
+        order = np.argsort(loss)
+        if loss[order[0]] < best_loss:
+            best_theta, best_loss = theta[order[0]].copy(), float(loss[order[0]])
+        elites = theta[order[:count]]
+        mean = elites.mean(axis=0)
+        sd = np.where(free, elites.std(axis=0), 0.0)
+
+    predicted = mixture_rates(*best_theta, selection=selection, nodes=nodes, age_groups=age_groups,
+                              generation=generation, parameter_n=parameter_n)
+    return MixtureFit(
+        parameters={name: float(value) for name, value in zip(PARAMETERS, best_theta)},
+        loss=best_loss,
+        r2=float(r2_score(observed, predicted)),
+        p_cancer_5_years=predicted,
+        evaluations=iterations * candidates,
+    )
@@ -0,0 +1,363 @@
+# Načtení knihoven
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.poisson import compute_pa, poisson_pmf
+from mmb.profiling import stage
+from mmb.tail_table import TailTable
+
+# Vektorizované jádro adaptivního modelu.
+#
+# Všechny vstupy se broadcastují na tvar (..., A), kde A je počet věkových skupin
+# a úvodní osy indexují sady parametrů. Skalární parametry jedné sady (p_c, q)
+# mají tvar (...) a k ose věkových skupin se rozšíří automaticky. Jedním voláním
+# evaluate() se tak spočítají celé průchody modelem pro tisíce sad parametrů.
+
+
+# Definice derivací mezivýsledků modelu podle vstupních parametrů
+@dataclass
+class ModelJacobian:
+
+    """
+    Třída s analytickými derivacemi modelu jako poli tvaru (..., A).
+
+    Věkové skupiny jsou na sobě nezávislé, takže Jakobián podle parametrů zadaných
+    pro každou věkovou skupinu (generation, parameter_n) je diagonální a ukládá se
+    jen jeho diagonála. Práh q je celé číslo, proto se místo derivace uvádějí přesné
+    rozdíly k sousedním prahům q + 1 a q - 1.
+
+    Atributy:
+        p_accumulative_d_generation (ndarray): dp_a/dλ_pa = P(X = q).
+        p_accumulative_q_forward (ndarray): p_a(q + 1) - p_a(q) = -P(X = q + 1).
+        p_accumulative_q_backward (ndarray): p_a(q) - p_a(q - 1) = -P(X = q).
+        p_0_d_generation (ndarray): dp_0/dλ_pa.
+        p_0_d_parameter_n (ndarray): dp_0/dn (derivace compute_phealth).
+        p_0_d_p_c (ndarray): dp_0/dp_c (derivace compute_phealth).
+        p_cancer_5_years_d_generation (ndarray): dP(cancer)/5 let / dλ_pa.
+        p_cancer_5_years_d_parameter_n (ndarray): dP(cancer)/5 let / dn.
+        p_cancer_5_years_d_p_c (ndarray): dP(cancer)/5 let / dp_c.
+        p_cancer_5_years_q_forward (ndarray): P(cancer)/5 let pro q + 1 minus hodnota pro q.
+        p_cancer_5_years_q_backward (ndarray): P(cancer)/5 let pro q minus hodnota pro q - 1.
+    """
+
+    p_accumulative_d_generation: np.ndarray
+    p_accumulative_q_forward: np.ndarray
+    p_accumulative_q_backward: np.ndarray
+    p_0_d_generation: np.ndarray
+    p_0_d_parameter_n: np.ndarray
+    p_0_d_p_c: np.ndarray
+    p_cancer_5_years_d_generation: np.ndarray
+    p_cancer_5_years_d_parameter_n: np.ndarray
+    p_cancer_5_years_d_p_c: np.ndarray
+    p_cancer_5_years_q_forward: np.ndarray
+    p_cancer_5_years_q_backward: np.ndarray
+
+
+# Definice výsledku jednoho (dávkového) průchodu modelem
+@dataclass
+class ModelResult:
+
+    """
+    Třída se všemi mezivýsledky modelu jako poli tvaru (..., A).
+
+    Atributy:
+        age_groups (ndarray): Intervaly věku v letech, tvar (A,).
+        generation (ndarray): Průměrný počet mutací pro každou buňku.
+        parameter_n (ndarray): Počet obnov buněk během jednoho roku.
+        p_c (ndarray): Pravděpodobnost vzniku rakoviny během jednoho dělení.
+        q (ndarray): Práh počtu akumulovaných mutací.
+        p_accumulative (ndarray): Pravděpodobnost vzniku rakoviny kvůli akumulaci mutací.
+        p_all (ndarray): Součet p_c + p_a.
+        lambda_np (ndarray): Konečná pravděpodobnost vzniku rakoviny λ = n p.
+        e_lambda (ndarray): Exponent e^λ.
+        p_0 (ndarray): Pravděpodobnost, že všechny buňky jsou zdravé.
+        p_cancer_year (ndarray): Pravděpodobnost vzniku rakoviny v průběhu jednoho roku.
+        p_cancer_5_years (ndarray): Pravděpodobnost (v %) vzniku rakoviny v průběhu pěti let.
+        jacobian (ModelJacobian): Derivace (jen pokud byly vyžádány, jinak None).
+    """
+
+    age_groups: np.ndarray
+    generation: np.ndarray
+    parameter_n: np.ndarray
+    p_c: np.ndarray
+    q: np.ndarray
+    p_accumulative: np.ndarray
+    p_all: np.ndarray
+    lambda_np: np.ndarray
+    e_lambda: np.ndarray
+    p_0: np.ndarray
+    p_cancer_year: np.ndarray
+    p_cancer_5_years: np.ndarray
+    jacobian: ModelJacobian = None
+
+    def to_frame(self, cancerstats=None):
+
+        """
+        Funkce pro převod jedné sady výsledků na tabulku ve formátu vysledky.csv.
+
+        Parametry:
+            cancerstats (array-like): Pozorované hodnoty, které se přidají jako poslední sloupec.
+
+        Návratová hodnota:
+            pandas.DataFrame: Tabulka se všemi mezivýsledky pro jednotlivé věkové skupiny.
+        """
+
+        import pandas as pd
+
+        if self.p_cancer_5_years.ndim != 1:
+            raise ValueError('Tabulku lze vytvořit jen pro jednu sadu parametrů')
+        columns = {
+            'Age group': self.age_groups,
+            'Generation (λ_pa)': self.generation,
+            'n (turnover/year)': self.parameter_n,
+            'p_c': self.p_c,
+            'p_a': self.p_accumulative,
+            'p = p_c + p_a': self.p_all,
+            'λ = np': np.round(self.lambda_np, 8),
+            'e^λ': self.e_lambda,
+            'p(0)': self.p_0,
+            'p(cancer)/year': self.p_cancer_year,
+            'p(cancer)/5 years (%)': self.p_cancer_5_years,
+        }
+        if cancerstats is not None:
+            columns['Cancerstats P(cancer)/5 years (%)'] = cancerstats
+        with stage('frame'):
+            return pd.DataFrame(columns)
+
+
+# Definice funkce pro výpočet p_accumulative pro dávku parametrů
+def _p_accumulative(q, generation):
+
+    """
+    Funkce pro výpočet p_accumulative pro broadcast prahů q a hodnot generation.
+
+    Sady parametrů se seskupí podle křivky generation a pro každou různou křivku
+    se sestaví jedna TailTable pro rozsah jejích prahů q. Přímé sčítání řad pro
+    každý prvek se použije jen tehdy, když by tabulky byly dražší (málo sad
+    s velkým rozptylem q) nebo když q není celé číslo.
+
+    Parametry:
+        q (ndarray): Prahy mutací tvaru (..., 1).
+        generation (ndarray): Parametr rozdělení tvaru (..., A).
+
+    Návratová hodnota:
+        ndarray: Pravděpodobnost vzniku rakoviny kvůli akumulaci škodlivých mutací.
+    """
+
+    if q.size == 1 or np.any(q != np.round(q)) or np.any(q < 0):
+        return compute_pa(q, generation)
+
+    lead = np.broadcast_shapes(q.shape[:-1], generation.shape[:-1])
+    age_count = generation.shape[-1]
+    flat_q = np.broadcast_to(q[..., 0], lead).reshape(-1).astype(np.int64)
+    flat_generation = np.broadcast_to(generation, lead + (age_count,)).reshape(-1, age_count)
+    curves, inverse = np.unique(flat_generation, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if len(curves) * (flat_q.max() - flat_q.min() + 2) > 4 * flat_q.size:
+        return compute_pa(q, generation)
+
+    result = np.empty((flat_q.size, age_count))
+    for index, curve in enumerate(curves):
+        mask = inverse == index
+        q_curve = flat_q[mask]
+        table = TailTable(curve, q_max=q_curve.max(), q_min=q_curve.min())
+        result[mask] = table.compute_pa(q_curve)
+    return result.reshape(lead + (age_count,))
+
+
+# Definice funkce pro výpočet derivací modelu
+def _jacobian(q, generation, parameter_n, p_all, p_0, shape):
+
+    """
+    Funkce pro výpočet analytických derivací modelu ze mezivýsledků téhož průchodu.
+
+    Derivace pravého chvostu podle λ je Poissonova pravděpodobnost:
+    d/dλ P(X > q) = P(X = q). Zbytek plyne z p_0 = exp(-n (p_c + p_a)).
+
+    Parametry:
+        q (ndarray): Prahy mutací tvaru (..., 1).
+        generation (ndarray): Parametr rozdělení tvaru (..., A).
+        parameter_n (ndarray): Počet obnov buněk tvaru (..., A).
+        p_all (ndarray): Součet p_c + p_a.
+        p_0 (ndarray): Pravděpodobnost, že všechny buňky jsou zdravé.
+        shape (tuple): Výsledný tvar (..., A).
+
+    Návratová hodnota:
+        ModelJacobian: Derivace a rozdíly k sousedním prahům.
+    """
+
+    pmf_q = poisson_pmf(q, generation)
+    pmf_next = pmf_q * generation / (q + 1)
+
+    # Derivace p_0 a P(cancer)/5 let podle λ = n p
+    d_p0 = -p_0
+    d_p5 = 100 * 5 * p_0
+
+    # Přesné rozdíly k sousedním prahům: λ se změní o -n P(X = q + 1), resp. o n P(X = q)
+    p_0_next = np.exp(-parameter_n * (p_all - pmf_next))
+    q_forward = 100 * 5 * p_0_next * np.expm1(-parameter_n * pmf_next)
+    q_backward = 100 * 5 * p_0 * np.expm1(-parameter_n * pmf_q)
+
+    def full(x):
+        return np.broadcast_to(x, shape)
+
+    return ModelJacobian(
+        p_accumulative_d_generation=full(pmf_q),
+        p_accumulative_q_forward=full(-pmf_next),
+        p_accumulative_q_backward=full(-pmf_q),
+        p_0_d_generation=full(d_p0 * parameter_n * pmf_q),
+        p_0_d_parameter_n=full(d_p0 * p_all),
+        p_0_d_p_c=full(d_p0 * parameter_n),
+        p_cancer_5_years_d_generation=full(d_p5 * parameter_n * pmf_q),
+        p_cancer_5_years_d_parameter_n=full(d_p5 * p_all),
+        p_cancer_5_years_d_p_c=full(d_p5 * parameter_n),
+        p_cancer_5_years_q_forward=full(q_forward),
+        p_cancer_5_years_q_backward=full(q_backward),
+    )
+
+
+# Definice funkce pro změnu sklonu křivky generation
+def scale_generation(slope, generation=GENERATION):
+
+    """
+    Funkce pro změnu sklonu průměrného počtu mutací s věkem.
+
+    Křivka se natáhne kolem své první hodnoty: g(slope) = g_0 + slope * (g - g_0),
+    takže slope = 1 vrací původní křivku.
+
+    Parametry:
+        slope (array-like): Násobek sklonu, tvar (...).
+        generation (array-like): Výchozí křivka, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Křivky generation tvaru (..., A).
+    """
+
+    generation = np.asarray(generation, dtype=np.float64)
+    slope = np.asarray(slope, dtype=np.float64)[..., None]
+    return generation[0] + slope * (generation - generation[0])
+
+
+# Definice funkce pro dávkový průchod modelem
+def evaluate(age_groups, generation, parameter_n, p_c, q, jacobian=False):
+
+    """
+    Funkce pro výpočet všech mezivýsledků modelu pro dávku sad parametrů najednou.
+
+    Parametry:
+        age_groups (array-like): Intervaly věku v letech, tvar (A,).
+        generation (array-like): Průměrný počet mutací pro každou buňku, tvar (..., A).
+        parameter_n (array-like): Počet obnov buněk během jednoho roku, tvar (..., A).
+        p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení, tvar (...).
+        q (array-like): Práh počtu akumulovaných mutací, tvar (...).
+        jacobian (bool): Zda ve stejném průchodu spočítat i derivace (ModelJacobian).
+
+    Návratová hodnota:
+        ModelResult: Mezivýsledky modelu jako pole tvaru (..., A).
+    """
+
+    age_groups = np.asarray(age_groups)
+    generation = np.asarray(generation, dtype=np.float64)
+    parameter_n = np.asarray(parameter_n, dtype=np.float64)
+    p_c = np.asarray(p_c, dtype=np.float64)[..., None]
+    q = np.asarray(q)[..., None]
+
+    # Pravděpodobnost vzniku rakoviny kvůli akumulaci škodlivých mutací
+    with stage('p_accumulative'):
+        p_accumulative = _p_accumulative(q, generation)
+
+    with stage('lambda_np'):
+
+        # Součet pravděpodobnosti vzniku rakoviny během jednoho dělení a kvůli akumulaci škodlivých mutací
+        p_all = p_c + p_accumulative
+
+        # Konečná pravděpodobnost vzniku rakoviny
+        lambda_np = parameter_n * p_all
+        shape = np.broadcast_shapes(lambda_np.shape, age_groups.shape)
+
+    with stage('p_0'):
+
+        # Exponent konečné pravděpodobnosti vzniku rakoviny (pro extrémní body prohledávání může být inf)
+        with np.errstate(over='ignore'):
+            e_lambda = np.exp(lambda_np)
+
+        # Pravděpodobnost, že všechny buňky jsou zdravé
+        p_0 = np.exp(-lambda_np)
+
+        # Pravděpodobnost vzniku rakoviny v průběhu jednoho roku života (bez ztráty přesnosti pro malé λ)
+        p_cancer_year = -np.expm1(-lambda_np)
+
+        # Pravděpodobnost (v %) vzniku rakoviny v průběhu pěti let života
+        p_cancer_5_years = 100 * 5 * p_cancer_year
+
+    derivatives = None
+    if jacobian:
+        with stage('jacobian'):
+            derivatives = _jacobian(q, generation, parameter_n, p_all, p_0, shape)
+
+    return ModelResult(
+        age_groups=age_groups,
+        generation=np.broadcast_to(generation, shape),
+        parameter_n=np.broadcast_to(parameter_n, shape),
+        p_c=np.broadcast_to(p_c, shape),
+        q=np.broadcast_to(q, shape),
+        p_accumulative=np.broadcast_to(p_accumulative, shape),
+        p_all=np.broadcast_to(p_all, shape),
+        lambda_np=np.broadcast_to(lambda_np, shape),
+        e_lambda=np.broadcast_to(e_lambda, shape),
+        p_0=np.broadcast_to(p_0, shape),
+        p_cancer_year=np.broadcast_to(p_cancer_year, shape),
+        p_cancer_5_years=np.broadcast_to(p_cancer_5_years, shape),
+        jacobian=derivatives,
+    )
+
+
+# Definice modelu s výchozími parametry z původního článku
+@dataclass
+class AdaptiveModel:
+
+    """
+    Třída adaptivního modelu s uloženými výchozími parametry.
+
+    Atributy:
+        age_groups (list): Intervaly věku v letech.
+        generation (list): Průměrný počet mutací pro každou buňku.
+        parameter_n (list): Počet obnov buněk během jednoho roku.
+        p_c (float): Pravděpodobnost vzniku rakoviny během jednoho dělení.
+        q (int): Práh počtu akumulovaných mutací.
+    """
+
+    age_groups: list = field(default_factory=lambda: list(AGE_GROUPS))
+    generation: list = field(default_factory=lambda: list(GENERATION))
+    parameter_n: list = field(default_factory=lambda: list(PARAMETER_N))
+    p_c: float = P_CONSTANT
+    q: int = Q
+
+    def evaluate(self, age_groups=None, generation=None, parameter_n=None, p_c=None, q=None,
+                 jacobian=False):
+
+        """
+        Funkce pro dávkový průchod modelem; nezadané parametry se převezmou z modelu.
+
+        Parametry:
+            age_groups (array-like): Intervaly věku v letech, tvar (A,).
+            generation (array-like): Průměrný počet mutací pro každou buňku, tvar (..., A).
+            parameter_n (array-like): Počet obnov buněk během jednoho roku, tvar (..., A).
+            p_c (array-like): Pravděpodobnost vzniku rakoviny během jednoho dělení, tvar (...).
+            q (array-like): Práh počtu akumulovaných mutací, tvar (...).
+            jacobian (bool): Zda ve stejném průchodu spočítat i derivace (ModelJacobian).
+
+        Návratová hodnota:
+            ModelResult: Mezivýsledky modelu jako pole tvaru (..., A).
+        """
+
+        return evaluate(
+            self.age_groups if age_groups is None else age_groups,
+            self.generation if generation is None else generation,
+            self.parameter_n if parameter_n is None else parameter_n,
+            self.p_c if p_c is None else p_c,
+            self.q if q is None else q,
+            jacobian=jacobian,
+        )
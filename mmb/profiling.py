@@ -0,0 +1,255 @@
+# Načtení knihoven
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+# Volitelné měření času, počtu volání a alokací pro jednotlivé části výpočtu.
+#
+# Části výpočtu (p_accumulative, lambda_np, p_0, jacobian, metrics, frame,
+# plotting, ...) jsou v kódu ohraničeny pomocí
+#
+#   with stage('p_accumulative'):
+#       ...
+#
+# Dokud není zapnuté sledování, vrací stage() sdílený prázdný objekt a cena je
+# jedno volání funkce a jedno porovnání. Uvnitř bloku with tracing() se každé
+# provedení části zaznamená jako událost s časem začátku a délkou (a volitelně
+# s alokacemi podle tracemalloc). Záznam lze uložit ve formátu Chrome trace
+# (chrome://tracing, Perfetto, speedscope) nebo jako složené zásobníky pro
+# flamegraph. Sleduje se jen aktuální proces, pracovní procesy ne. Celý skript
+# lze se sledováním spustit přes python -m mmb.trace skript.py.
+
+# Právě aktivní záznam (None = sledování je vypnuté)
+_tracer = None
+
+
+# Prázdný kontext pro vypnuté sledování
+class _NullStage:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+# Definice jednoho provedení části výpočtu
+class _Stage:
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.peak = 0
+
+    def __enter__(self):
+        tracer = self.tracer
+        self.parent = tracer._stack[-1] if tracer._stack else None
+        tracer._stack.append(self)
+        if tracer.allocations:
+            self.memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        tracer = self.tracer
+        tracer._stack.pop()
+        event = {'name': self.name, 'start': self.start - tracer.origin, 'duration': end - self.start,
+                 'stack': tuple(stage.name for stage in tracer._stack) + (self.name,),
+                 'args': self.args}
+        if tracer.allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.peak)
+            event['allocated'] = current - self.memory
+            event['peak'] = peak - self.memory
+
+            # Vynulováním špičky se ztratila i špička nadřazené části, proto se jí předá
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, peak)
+        tracer.events.append(event)
+        return False
+
+
+# Definice záznamu sledování
+class Tracer:
+
+    """
+    Třída se záznamem provedení částí výpočtu.
+
+    Atributy:
+        allocations (bool): Zda se sledují alokace paměti (tracemalloc).
+        events (list): Zaznamenané události (název, začátek, délka, zásobník, alokace).
+        origin (float): Čas začátku záznamu (time.perf_counter).
+    """
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self._stack = []
+
+    def stage(self, name, **args):
+        return _Stage(self, name, args)
+
+    def summary(self):
+
+        """
+        Funkce pro souhrn času, počtu volání a alokací podle názvu části.
+
+        Návratová hodnota:
+            dict: Pro každou část 'calls', 'total', 'self' (bez vnořených částí), 'mean', 'max'
+            a při sledování alokací 'allocated' a 'peak' (největší špička v bajtech).
+        """
+
+        summary = {}
+        for event in self.events:
+            entry = summary.setdefault(event['name'], {'calls': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0})
+            entry['calls'] += 1
+            entry['total'] += event['duration']
+            entry['max'] = max(entry['max'], event['duration'])
+            if 'allocated' in event:
+                entry['allocated'] = entry.get('allocated', 0) + event['allocated']
+                entry['peak'] = max(entry.get('peak', 0), event['peak'])
+        for entry in summary.values():
+            entry['mean'] = entry['total'] / entry['calls']
+        for stack, duration in _self_times(self.events).items():
+            summary[stack[-1]]['self'] += duration
+        return summary
+
+    def format_summary(self):
+
+        """
+        Funkce pro převod souhrnu na textovou tabulku seřazenou podle vlastního času.
+
+        Návratová hodnota:
+            str: Tabulka jako text.
+        """
+
+        summary = self.summary()
+        lines = [f'{"část":<24}{"volání":>8}{"celkem [ms]":>14}{"vlastní [ms]":>14}{"průměr [ms]":>14}'
+                 + (f'{"alokace [MB]":>14}{"špička [MB]":>14}' if self.allocations else '')]
+        for name, entry in sorted(summary.items(), key=lambda item: -item[1]['self']):
+            line = (f'{name:<24}{entry["calls"]:>8}{entry["total"] * 1e3:>14.3f}'
+                    f'{entry["self"] * 1e3:>14.3f}{entry["mean"] * 1e3:>14.3f}')
+            if self.allocations:
+                line += f'{entry.get("allocated", 0) / 2**20:>14.2f}{entry.get("peak", 0) / 2**20:>14.2f}'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self, path):
+
+        """
+        Funkce pro uložení záznamu ve formátu Chrome trace (události typu 'X').
+
+        Parametry:
+            path (str | Path): Cílový soubor JSON.
+
+        Návratová hodnota:
+            Path: Cesta k uloženému souboru.
+        """
+
+        events = []
+        for event in self.events:
+            args = dict(event['args'])
+            if 'allocated' in event:
+                args.update(allocated=event['allocated'], peak=event['peak'])
+            events.append({'name': event['name'], 'cat': 'mmb', 'ph': 'X', 'pid': self.pid,
+                           'tid': self.tid, 'ts': event['start'] * 1e6,
+                           'dur': event['duration'] * 1e6, 'args': args})
+        path = Path(path)
+        path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=str),
+                        encoding='utf-8')
+        return path
+
+    def to_folded(self, path):
+
+        """
+        Funkce pro uložení záznamu jako složených zásobníků ('a;b;c mikrosekundy') pro flamegraph.
+
+        Parametry:
+            path (str | Path): Cílový textový soubor.
+
+        Návratová hodnota:
+            Path: Cesta k uloženému souboru.
+        """
+
+        lines = [f'{";".join(stack)} {round(duration * 1e6)}'
+                 for stack, duration in sorted(_self_times(self.events).items())]
+        path = Path(path)
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        return path
+
+
+# Definice funkce pro výpočet vlastního času (bez vnořených částí) pro každý zásobník
+def _self_times(events):
+    times = {}
+    for event in events:
+        times[event['stack']] = times.get(event['stack'], 0.0) + event['duration']
+        if len(event['stack']) > 1:
+            times[event['stack'][:-1]] = times.get(event['stack'][:-1], 0.0) - event['duration']
+    return times
+
+
+# Definice funkce pro ohraničení části výpočtu
+def stage(name, **args):
+
+    """
+    Funkce pro ohraničení části výpočtu v bloku with; bez zapnutého sledování nic nedělá.
+
+    Parametry:
+        name (str): Název části výpočtu.
+        **args: Doplňující údaje uložené k události (např. velikost dávky).
+
+    Návratová hodnota:
+        Kontextový objekt pro příkaz with.
+    """
+
+    if _tracer is None:
+        return _NULL_STAGE
+    return _tracer.stage(name, **args)
+
+
+# Definice kontextu pro zapnutí sledování
+@contextmanager
+def tracing(allocations=False):
+
+    """
+    Funkce pro zapnutí sledování částí výpočtu po dobu bloku with.
+
+    Příklad:
+        with tracing(allocations=True) as tracer:
+            run_sweep(grid, 'vystup', workers=0)
+        print(tracer.format_summary())
+        tracer.to_chrome_trace('trace.json')
+
+    Parametry:
+        allocations (bool): Zda sledovat i alokace paměti (tracemalloc, výrazně zpomalí výpočet).
+
+    Návratová hodnota:
+        Tracer: Záznam sledování.
+    """
+
+    global _tracer
+    previous, tracer = _tracer, Tracer(allocations)
+    started_tracemalloc = allocations and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+        if started_tracemalloc:
+            tracemalloc.stop()
+
@@ -0,0 +1,87 @@
+# Načtení knihoven
+from math import ceil, exp, lgamma, log
+from decimal import Decimal, localcontext
+
+from mmb.profiling import stage
+
+# Požadovaná přesnost čísel referenčního výpočtu (stejná jako v původních skriptech)
+PRECISION = 50
+
+
+# Definice funkce pro odhad potřebné přesnosti referenčního výpočtu
+def required_precision(q, lambd, guard=30):
+
+    """
+    Funkce pro odhad počtu platných číslic, při kterém je compute_pa přesná na guard číslic.
+
+    Výraz 1 - Σ λ^k/k! / e^λ ztratí odečtením tolik číslic, kolik je řád výsledku.
+    Výsledek je zdola omezen členem P(X = q + 1), jehož logaritmus se spočítá ve
+    float64 přes lgamma, takže odhad nezávisí na testovaném rychlém výpočtu.
+
+    Parametry:
+        q (int): Práh mutací.
+        lambd (float): Parametr rozdělení.
+        guard (int): Počet platných číslic, které mají zůstat po odečtení.
+
+    Návratová hodnota:
+        int: Počet platných číslic aritmetiky Decimal.
+    """
+
+    lambd = float(lambd)
+    if lambd <= 0:
+        return guard
+    log10_pmf = (-lambd + (q + 1) * log(lambd) - lgamma(q + 2)) / log(10)
+    return guard + max(0, ceil(-log10_pmf)) + len(str(q + 1))
+
+
+# Definice funkce pro výpočet p_accumulative v aritmetice Decimal
+# Původní (pomalá) implementace, která slouží jako reference pro rychlý výpočet v mmb.poisson
+def compute_pa(q, lambd, prec=PRECISION):
+
+    """
+    Funkce pro výpočet pravděpodobnosti vzniku rakoviny při akumulaci škodlivých mutací.
+
+    Členy λ^k/k! se počítají postupně (člen_k = člen_(k-1) * λ / k), takže výpočet
+    zvládne i tisíce členů. Pro velmi malé výsledky je potřeba prec zvýšit
+    (viz required_precision).
+
+    Parametry:
+        q (int): Práh mutací.
+        lambd (Decimal): Parametr rozdělení.
+        prec (int): Počet platných číslic aritmetiky Decimal.
+
+    Návratová hodnota:
+        Decimal: Pravděpodobnost vzniku rakoviny kvůli akumulaci škodlivých mutací.
+    """
+
+    with stage('reference.compute_pa'), localcontext() as ctx:
+        ctx.prec = prec
+        lambd = Decimal(lambd)
+        term = summation = Decimal(1)
+        for k in range(1, q + 1):
+            term = term * lambd / k
+            summation += term
+        pa = 1 - summation / lambd.exp()
+    return pa
+
+
+# Definice funkce pro výpočet p_health (pravděpodobnost, že všechny buňky jsou zdravé)
+def compute_phealth(n, pc, pa, prec=PRECISION):
+
+    """
+    Funkce pro výpočet pravděpodobnosti zachování zdraví.
+
+    Parametry:
+        n (Decimal): Počet obnov buněk.
+        pc (Decimal): Pravděpodobnost vzniku rakoviny během jednoho dělení.
+        pa (Decimal): Pravděpodobnost vzniku rakoviny kvůli akumulaci škodlivých mutací.
+        prec (int): Počet platných číslic aritmetiky Decimal.
+
+    Návratová hodnota:
+        float: Pravděpodobnost zachování zdraví.
+    """
+
+    with stage('reference.compute_phealth'), localcontext() as ctx:
+        ctx.prec = prec
+        result = 1 / (exp(float(Decimal(n) * (Decimal(pc) + Decimal(pa)))))
+    return result
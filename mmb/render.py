@@ -0,0 +1,175 @@
+# Načtení knihoven
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from mmb.data import CANCERSTATS, LEUKEMIA_STATS
+from mmb.profiling import stage
+
+# Dávkové vykreslení všech grafů do složky Plots/ bez interaktivního prostředí.
+#
+# Každý graf je v tabulce FIGURES zadán funkcí z mmb.figures a jejími parametry.
+# Grafy se vykreslují backendem Agg v pracovních procesech a ukládají jako PNG
+# (a volitelně SVG). Pro každý graf se spočítá otisk z jeho parametrů (včetně dat)
+# a zdrojového kódu balíčku mmb; otisky posledního vykreslení jsou v souboru
+# .render_cache.json a graf, jehož otisk se nezměnil a jehož soubory existují,
+# se znovu nevykresluje. Selže-li některý graf, otisky úspěšně vykreslených grafů
+# se přesto uloží a chyba se vyvolá až potom; poškozený soubor s otisky se
+# považuje za prázdný.
+
+# Výchozí složka pro grafy a název souboru s otisky
+PLOTS_DIR = Path(__file__).resolve().parents[1] / 'Plots'
+CACHE_FILE = '.render_cache.json'
+
+# Grafy ve složce Plots/: název souboru -> (funkce z mmb.figures, parametry)
+FIGURES = {
+    'plot1': ('division_curve', {'p': 1e-15}),
+    'plot2': ('division_curve', {'p': 1e-14}),
+    'plot3': ('division_curve', {'p': 1e-16}),
+    'plot4': ('q_comparison', {'observed': CANCERSTATS, 'disease': 'Cancer'}),
+    'plot5': ('turnover_comparison', {'observed': CANCERSTATS, 'disease': 'Cancer'}),
+    'plot6': ('log_slope', {}),
+    'plot7': ('cumulative_rates', {'observed': CANCERSTATS, 'disease': 'Cancer'}),
+    'plot8': ('q_comparison', {'observed': LEUKEMIA_STATS, 'disease': 'Leukaemia'}),
+    'plot9': ('turnover_comparison', {'observed': LEUKEMIA_STATS, 'disease': 'Leukaemia',
+                                      'r2_interval': True}),
+    'plot10': ('cumulative_rates', {'observed': LEUKEMIA_STATS, 'disease': 'Leukaemia'}),
+}
+
+
+# Definice funkce pro výpočet otisku grafu
+def figure_hash(name, formats=('png',), dpi=72):
+
+    """
+    Funkce pro výpočet otisku vstupů grafu (parametry, data a zdrojový kód balíčku mmb).
+
+    Parametry:
+        name (str): Název grafu z tabulky FIGURES.
+        formats (sequence): Ukládané formáty souborů.
+        dpi (int): Rozlišení rastrových souborů.
+
+    Návratová hodnota:
+        str: Otisk SHA-256 v šestnáctkovém zápisu.
+    """
+
+    function, kwargs = FIGURES[name]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([name, function, kwargs, list(formats), dpi], sort_keys=True,
+                             default=list).encode())
+    for path in sorted(Path(__file__).resolve().parent.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+# Funkce spouštěná v pracovním procesu: vykreslení a uložení jednoho grafu
+def _render_figure(name, output_dir, formats, dpi):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from mmb import figures
+
+    function, kwargs = FIGURES[name]
+    with stage('figure', figure=name):
+        fig = getattr(figures, function)(**kwargs)
+    try:
+        with stage('savefig', figure=name):
+            for extension in formats:
+                fig.savefig(Path(output_dir) / f'{name}.{extension}', dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return name
+
+
+# Definice funkce pro dávkové vykreslení grafů
+def render_all(names=None, output_dir=PLOTS_DIR, formats=('png',), dpi=72, force=False,
+               workers=None):
+
+    """
+    Funkce pro vykreslení grafů do souborů s přeskočením grafů, jejichž vstupy se nezměnily.
+
+    Parametry:
+        names (iterable): Názvy grafů z tabulky FIGURES (None = všechny).
+        output_dir (str | Path): Složka pro uložené grafy.
+        formats (sequence): Formáty souborů ('png', 'svg', ...).
+        dpi (int): Rozlišení rastrových souborů.
+        force (bool): Vykreslit i grafy, jejichž otisk se nezměnil.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        tuple: Seznam vykreslených a seznam přeskočených grafů.
+    """
+
+    names = list(FIGURES) if names is None else list(names)
+    unknown = [name for name in names if name not in FIGURES]
+    if unknown:
+        raise ValueError(f'Neznámé grafy {unknown}, dostupné jsou {list(FIGURES)}')
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    formats = tuple(formats)
+
+    # Porovnání otisků s posledním vykreslením
+    cache_path = output_dir / CACHE_FILE
+    try:
+        cache = json.loads(cache_path.read_text()) if cache_path.exists() else {}
+    except json.JSONDecodeError:
+        cache = {}
+    hashes = {name: figure_hash(name, formats, dpi) for name in names}
+    pending = [name for name in names
+               if force or cache.get(name) != hashes[name]
+               or not all((output_dir / f'{name}.{extension}').exists() for extension in formats)]
+    skipped = [name for name in names if name not in pending]
+
+    # Výsledek každého grafu zvlášť, aby chyba jednoho grafu nezahodila ostatní
+    rendered, errors = [], {}
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(pending) <= 1:
+        for name in pending:
+            try:
+                rendered.append(_render_figure(name, output_dir, formats, dpi))
+            except Exception as error:
+                errors[name] = error
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {name: executor.submit(_render_figure, name, output_dir, formats, dpi)
+                       for name in pending}
+            for name, future in futures.items():
+                try:
+                    rendered.append(future.result())
+                except Exception as error:
+                    errors[name] = error
+
+    # Zápis otisků úspěšně vykreslených grafů (i když jiný graf selhal)
+    cache.update({name: hashes[name] for name in rendered})
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    os.replace(tmp_path, cache_path)
+    if errors:
+        raise next(iter(errors.values()))
+    return rendered, skipped
+
+
+# Definice funkce pro spuštění z příkazové řádky (python -m mmb.render)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Dávkové vykreslení grafů do složky Plots/.')
+    parser.add_argument('names', nargs='*', help='názvy grafů (výchozí: všechny)')
+    parser.add_argument('--output-dir', default=PLOTS_DIR, help='složka pro grafy')
+    parser.add_argument('--format', dest='formats', action='append', choices=('png', 'svg', 'pdf'),
+                        help='formát souborů (lze zadat vícekrát, výchozí png)')
+    parser.add_argument('--dpi', type=int, default=72, help='rozlišení rastrových souborů')
+    parser.add_argument('--force', action='store_true', help='vykreslit i nezměněné grafy')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='počet pracovních procesů (0 = bez procesů)')
+    args = parser.parse_args(argv)
+
+    rendered, skipped = render_all(args.names or None, args.output_dir, args.formats or ('png',),
+                                   args.dpi, args.force, args.workers)
+    print(f'Vykresleno: {", ".join(rendered) or "-"}')
+    print(f'Přeskočeno (beze změny): {", ".join(skipped) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
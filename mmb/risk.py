@@ -0,0 +1,177 @@
+# Načtení knihoven
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS
+from mmb.profiling import stage
+
+# Přesná pravděpodobnost vzniku rakoviny v intervalech a kumulativně podle věku.
+#
+# Věkové intervaly (společná konvence pro mmb.risk, mmb.continuous, mmb.mixture
+# a mmb.incremental): věková skupina a_i je středem intervalu [e_i, e_{i+1}), kde
+# hranice e leží v polovině mezi sousedními skupinami a krajní intervaly mají
+# stejnou délku jako jejich soused (pro skupiny po 5 letech tedy [a - 2,5, a + 2,5)).
+# Bod a_i, ve kterém model počítá roční intenzitu λ = n p, je tak středem
+# intervalu, na který se λ vztahuje.
+#
+# Z kumulované intenzity H_i = ∫ λ(t) dt přes interval (pro konstantní λ v intervalu
+# H_i = λ_i (e_{i+1} - e_i)) plyne pravděpodobnost zůstat zdravý do konce intervalu
+#
+#   S(e_{i+1}) = exp(-Σ_{j ≤ i} H_j).
+#
+# Součin se počítá jako kumulativní součet v logaritmu (bez podtečení) a riziko
+# 1 - S se počítá přes expm1 (bez ztráty přesnosti pro malá rizika). Riziko
+# v intervalu je 1 - exp(-H_i), na rozdíl od lineární náhrady 5 * p_cancer_year
+# tedy nikdy nepřekročí 100 %. Vše pracuje s poli tvaru (..., A), takže se křivky
+# celoživotního rizika pro celý blok prohledávání spočítají najednou.
+
+
+# Definice výsledku výpočtu rizika
+@dataclass
+class RiskResult:
+
+    """
+    Třída s přesnými riziky vzniku rakoviny jako poli tvaru (..., A).
+
+    Atributy:
+        age_groups (ndarray): Středy věkových intervalů v letech, tvar (A,).
+        log_survival (ndarray): Logaritmus pravděpodobnosti, že do konce intervalu rakovina nevznikla.
+        interval_risk (ndarray): Pravděpodobnost (v %) vzniku rakoviny v intervalu.
+        cumulative_risk (ndarray): Pravděpodobnost (v %) vzniku rakoviny do konce intervalu.
+    """
+
+    age_groups: np.ndarray
+    log_survival: np.ndarray
+    interval_risk: np.ndarray
+    cumulative_risk: np.ndarray
+
+    @property
+    def lifetime_risk(self):
+        return self.cumulative_risk[..., -1]
+
+
+# Definice funkce pro hranice věkových intervalů
+def age_edges(age_groups=AGE_GROUPS, width=None):
+
+    """
+    Funkce pro hranice věkových intervalů se středy ve věkových skupinách.
+
+    Parametry:
+        age_groups (array-like): Středy věkových intervalů v letech (rostoucí), tvar (A,).
+        width (float): Pevná délka intervalů [a - width/2, a + width/2) (None = hranice
+            v polovině mezi sousedními skupinami).
+
+    Návratová hodnota:
+        ndarray: Hranice intervalů, tvar (A + 1,).
+    """
+
+    age_groups = np.asarray(age_groups, dtype=np.float64)
+    if width is not None:
+        edges = np.append(age_groups - width / 2, age_groups[-1] + width / 2)
+    elif len(age_groups) == 1:
+        raise ValueError('Pro jednu věkovou skupinu je nutné zadat délku intervalu width')
+    else:
+        middle = (age_groups[:-1] + age_groups[1:]) / 2
+        edges = np.concatenate([[2 * age_groups[0] - middle[0]], middle,
+                                [2 * age_groups[-1] - middle[-1]]])
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError('Věkové skupiny musí být rostoucí')
+    return edges
+
+
+# Definice funkce pro délky věkových intervalů
+def interval_widths(age_groups=AGE_GROUPS, width=None):
+
+    """
+    Funkce pro délky věkových intervalů v letech (viz age_edges).
+
+    Parametry:
+        age_groups (array-like): Středy věkových intervalů v letech, tvar (A,).
+        width (float): Pevná délka intervalů (None = podle sousedních skupin).
+
+    Návratová hodnota:
+        ndarray: Délky intervalů, tvar (A,).
+    """
+
+    return np.diff(age_edges(age_groups, width))
+
+
+# Definice funkce pro rizika z kumulované intenzity v intervalech
+def hazard_risk(hazard, age_groups=AGE_GROUPS):
+
+    """
+    Funkce pro rizika v intervalech a kumulativní rizika z kumulované intenzity H = ∫ λ dt.
+
+    Parametry:
+        hazard (array-like): Kumulovaná intenzita v každém věkovém intervalu, tvar (..., A).
+        age_groups (array-like): Středy věkových intervalů v letech, tvar (A,).
+
+    Návratová hodnota:
+        RiskResult: Logaritmus přežití, rizika v intervalech a kumulativní rizika.
+    """
+
+    with stage('risk'):
+        hazard = np.asarray(hazard, dtype=np.float64)
+        log_survival = -np.cumsum(hazard, axis=-1)
+        return RiskResult(
+            age_groups=np.asarray(age_groups),
+            log_survival=log_survival,
+            interval_risk=-100 * np.expm1(-hazard),
+            cumulative_risk=-100 * np.expm1(log_survival),
+        )
+
+
+# Definice funkce pro výpočet rizik ze součinu pravděpodobností přežití
+def survival_risk(lambda_np, age_groups=AGE_GROUPS, width=None):
+
+    """
+    Funkce pro přesná rizika v intervalech a kumulativní rizika z roční intenzity λ = n p.
+
+    Intenzita λ_i se považuje za konstantní v intervalu se středem a_i (viz age_edges).
+
+    Parametry:
+        lambda_np (array-like): Roční intenzita vzniku rakoviny pro každou věkovou skupinu, tvar (..., A).
+        age_groups (array-like): Středy věkových intervalů v letech, tvar (A,).
+        width (float): Pevná délka intervalů (None = podle sousedních skupin).
+
+    Návratová hodnota:
+        RiskResult: Logaritmus přežití, rizika v intervalech a kumulativní rizika.
+    """
+
+    widths = interval_widths(age_groups, width)
+    return hazard_risk(np.asarray(lambda_np, dtype=np.float64) * widths, age_groups)
+
+
+# Definice funkce pro rizika z výsledku modelu
+def model_risk(model, width=None):
+
+    """
+    Funkce pro přesná rizika z (dávkového) výsledku evaluate().
+
+    Parametry:
+        model (ModelResult): Výsledek mmb.model.evaluate.
+        width (float): Pevná délka intervalů (None = podle sousedních skupin).
+
+    Návratová hodnota:
+        RiskResult: Rizika pro všechny sady parametrů modelu.
+    """
+
+    return survival_risk(model.lambda_np, model.age_groups, width)
+
+
+# Definice funkce pro kumulativní riziko z pozorovaných rizik v intervalech
+def cumulative_from_intervals(interval_risk):
+
+    """
+    Funkce pro kumulativní riziko z rizik (v %) v po sobě jdoucích intervalech, 1 - Π (1 - r_i).
+
+    Parametry:
+        interval_risk (array-like): Rizika v intervalech (v %), tvar (..., A).
+
+    Návratová hodnota:
+        ndarray: Kumulativní rizika (v %), tvar (..., A).
+    """
+
+    interval_risk = np.asarray(interval_risk, dtype=np.float64)
+    return -100 * np.expm1(np.cumsum(np.log1p(-interval_risk / 100), axis=-1))
@@ -0,0 +1,292 @@
+# Načtení knihoven
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import (AGE_GROUPS, CANCERSTATS, GENERATION, PARAMETER_N, PARAMETER_N_CONSTANT,
+                      P_CONSTANT, Q)
+from mmb.metrics import r2_score
+from mmb.model import evaluate, scale_generation
+
+# Globální analýza citlivosti modelu (Sobolovy indexy a Morrisovy elementární efekty).
+#
+# Zkoumané faktory jsou práh q, log10 p_c, sklon křivky generation (viz
+# scale_generation) a míra poklesu obnovy buněk s věkem d, pro kterou je
+#
+#   n(d) = n_konst * (n / n_konst)^d,
+#
+# takže d = 0 je model bez snižování obnovy a d = 1 model z článku. Práh q se
+# bere jako spojitý (chvost Poissonova rozdělení je definován i pro neceločíselné q).
+# Body se vybírají kvazináhodně (Haltonova posloupnost s náhodnou permutací
+# číslic) a model se pro ně vyhodnotí po velkých dávkách jediným voláním evaluate(),
+# případně v několika procesech. Výstupy jsou predikce P(cancer)/5 let pro každou
+# věkovou skupinu a R² vůči pozorovaným datům.
+#
+# Sobolovy indexy prvního řádu a celkové indexy se odhadují Saltelliho schématem
+# (matice A, B a A_B^(i), celkem N (k + 2) vyhodnocení) s odhady podle Saltelliho
+# (2010) a Jansena. Morrisovy efekty se počítají z trajektorií na mřížce s p
+# úrovněmi (krok Δ = p / (2 (p - 1))).
+
+# Zkoumané faktory a jejich výchozí rozsahy (hodnoty z článku leží uvnitř)
+FACTORS = {
+    'q': (110.0, 126.0),
+    'log10_p_c': (-19.0, -17.0),
+    'generation_slope': (0.9, 1.1),
+    'n_decline': (0.5, 1.5),
+}
+
+# Hodnoty faktorů z článku (použijí se pro faktory, které se nezkoumají)
+BASELINE = {
+    'q': float(Q),
+    'log10_p_c': float(np.log10(P_CONSTANT)),
+    'generation_slope': 1.0,
+    'n_decline': 1.0,
+}
+
+# Prvočísla pro jednotlivé rozměry Haltonovy posloupnosti
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+# Definice výsledku Sobolovy analýzy
+@dataclass
+class SobolResult:
+
+    """
+    Třída se Sobolovými indexy pro všechny výstupy modelu.
+
+    Atributy:
+        factors (list): Názvy faktorů, délka k.
+        outputs (list): Názvy výstupů (věkové skupiny a 'r2'), délka O.
+        first_order (ndarray): Indexy prvního řádu S_i, tvar (O, k).
+        total (ndarray): Celkové indexy S_Ti, tvar (O, k).
+        variance (ndarray): Rozptyl každého výstupu, tvar (O,).
+        evaluations (int): Počet vyhodnocení modelu.
+    """
+
+    factors: list
+    outputs: list
+    first_order: np.ndarray
+    total: np.ndarray
+    variance: np.ndarray
+    evaluations: int
+
+
+# Definice výsledku Morrisovy analýzy
+@dataclass
+class MorrisResult:
+
+    """
+    Třída s Morrisovými elementárními efekty pro všechny výstupy modelu.
+
+    Efekty jsou vztaženy k faktorům přeškálovaným na interval [0, 1].
+
+    Atributy:
+        factors (list): Názvy faktorů, délka k.
+        outputs (list): Názvy výstupů (věkové skupiny a 'r2'), délka O.
+        mu (ndarray): Průměrný efekt, tvar (O, k).
+        mu_star (ndarray): Průměr absolutních hodnot efektů, tvar (O, k).
+        sigma (ndarray): Směrodatná odchylka efektů, tvar (O, k).
+        evaluations (int): Počet vyhodnocení modelu.
+    """
+
+    factors: list
+    outputs: list
+    mu: np.ndarray
+    mu_star: np.ndarray
+    sigma: np.ndarray
+    evaluations: int
+
+
+# Definice funkce pro kvazináhodné body
+def halton(n, dimensions, seed=0, skip=1):
+
+    """
+    Funkce pro výpočet bodů Haltonovy posloupnosti s náhodnou permutací číslic.
+
+    Parametry:
+        n (int): Počet bodů.
+        dimensions (int): Počet rozměrů (nejvýše 12).
+        seed (int): Semínko pro permutace číslic (None = bez permutace).
+        skip (int): Počet vynechaných úvodních bodů.
+
+    Návratová hodnota:
+        ndarray: Body v jednotkové krychli, tvar (n, dimensions).
+    """
+
+    if dimensions > len(_PRIMES):
+        raise ValueError(f'Haltonova posloupnost je zde jen pro nejvýše {len(_PRIMES)} rozměrů')
+    rng = np.random.default_rng(seed)
+    index = np.arange(skip, skip + n, dtype=np.int64)
+    points = np.empty((n, dimensions))
+    for dim, base in enumerate(_PRIMES[:dimensions]):
+        digits = int(np.ceil(np.log(skip + n + 1) / np.log(base))) + 1
+        permutation = np.arange(base) if seed is None else rng.permutation(base)
+        remaining, value, scale = index.copy(), np.zeros(n), 1.0 / base
+        for _ in range(digits):
+            value += scale * permutation[remaining % base]
+            remaining //= base
+            scale /= base
+        points[:, dim] = value
+    return points
+
+
+# Definice funkce pro převod faktorů na parametry modelu
+def factor_parameters(values, factors):
+
+    """
+    Funkce pro převod hodnot faktorů na vstupy funkce evaluate().
+
+    Parametry:
+        values (ndarray): Hodnoty faktorů, tvar (N, k).
+        factors (sequence): Názvy faktorů (sloupců values) z FACTORS.
+
+    Návratová hodnota:
+        tuple: generation (N, A), parameter_n (N, A), p_c (N,) a q (N,).
+    """
+
+    columns = {name: np.full(len(values), BASELINE[name]) for name in BASELINE}
+    columns.update({name: values[:, i] for i, name in enumerate(factors)})
+    generation = scale_generation(columns['generation_slope'], GENERATION)
+    ratio = np.log(np.asarray(PARAMETER_N) / PARAMETER_N_CONSTANT)
+    parameter_n = PARAMETER_N_CONSTANT * np.exp(columns['n_decline'][:, None] * ratio)
+    return generation, parameter_n, 10.0 ** columns['log10_p_c'], columns['q']
+
+
+# Funkce spouštěná v pracovním procesu: výstupy modelu pro blok bodů
+def _model_outputs(values, factors, observed, log):
+    generation, parameter_n, p_c, q = factor_parameters(values, factors)
+    model = evaluate(AGE_GROUPS, generation, parameter_n, p_c, q)
+    predicted = np.log10(model.p_cancer_5_years) if log else model.p_cancer_5_years
+    return np.column_stack([predicted, r2_score(observed, model.p_cancer_5_years)])
+
+
+# Definice funkce pro vyhodnocení modelu v mnoha bodech
+def model_outputs(values, factors, observed=CANCERSTATS, log=False, chunk_size=50_000, workers=0):
+
+    """
+    Funkce pro výpočet výstupů modelu (predikce pro věkové skupiny a R²) po dávkách.
+
+    Parametry:
+        values (ndarray): Hodnoty faktorů, tvar (N, k).
+        factors (sequence): Názvy faktorů.
+        observed (array-like): Pozorované hodnoty pro výpočet R².
+        log (bool): Zda predikce převést na log10 (R² se počítá vždy z původních hodnot).
+        chunk_size (int): Počet bodů v jedné dávce.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        ndarray: Výstupy tvaru (N, A + 1), poslední sloupec je R².
+    """
+
+    blocks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+    observed = np.asarray(observed, dtype=np.float64)
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(blocks) == 1:
+        parts = [_model_outputs(block, factors, observed, log) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_model_outputs, blocks, [factors] * len(blocks),
+                                      [observed] * len(blocks), [log] * len(blocks)))
+    return np.concatenate(parts)
+
+
+# Definice funkce pro převod jednotkové krychle na rozsahy faktorů
+def _scale(unit, bounds):
+    bounds = np.asarray(bounds, dtype=np.float64)
+    return bounds[:, 0] + unit * (bounds[:, 1] - bounds[:, 0])
+
+
+# Definice funkce pro Sobolovy indexy
+def sobol_indices(n=2 ** 14, factors=FACTORS, observed=CANCERSTATS, log=False, seed=0,
+                  chunk_size=50_000, workers=0):
+
+    """
+    Funkce pro odhad Sobolových indexů prvního řádu a celkových indexů.
+
+    Parametry:
+        n (int): Počet bodů základních matic A a B (celkem n (k + 2) vyhodnocení).
+        factors (dict): Zkoumané faktory a jejich rozsahy (dolní, horní mez).
+        observed (array-like): Pozorované hodnoty pro výpočet R².
+        log (bool): Zda analyzovat log10 predikcí místo predikcí.
+        seed (int): Semínko pro permutace Haltonovy posloupnosti.
+        chunk_size (int): Počet bodů v jedné dávce modelu.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        SobolResult: Indexy pro všechny výstupy.
+    """
+
+    names = list(factors)
+    k = len(names)
+    bounds = [factors[name] for name in names]
+
+    # Matice A a B z jedné 2k-rozměrné posloupnosti a matice A_B^(i) s i-tým sloupcem z B
+    unit = halton(n, 2 * k, seed)
+    a, b = _scale(unit[:, :k], bounds), _scale(unit[:, k:], bounds)
+    ab = np.repeat(a[None], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+    samples = np.concatenate([a, b, ab.reshape(k * n, k)])
+
+    outputs = model_outputs(samples, names, observed, log, chunk_size, workers)
+    f_a, f_b, f_ab = outputs[:n], outputs[n:2 * n], outputs[2 * n:].reshape(k, n, -1)
+    variance = np.var(np.concatenate([f_a, f_b]), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    return SobolResult(factors=names, outputs=list(AGE_GROUPS) + ['r2'], first_order=first_order.T,
+                       total=total.T, variance=variance, evaluations=len(samples))
+
+
+# Definice funkce pro Morrisovy elementární efekty
+def morris_effects(trajectories=1000, levels=4, factors=FACTORS, observed=CANCERSTATS, log=False,
+                   seed=0, chunk_size=50_000, workers=0):
+
+    """
+    Funkce pro výpočet Morrisových elementárních efektů z trajektorií na mřížce.
+
+    Parametry:
+        trajectories (int): Počet trajektorií (celkem trajectories (k + 1) vyhodnocení).
+        levels (int): Počet úrovní mřížky p (sudé číslo).
+        factors (dict): Zkoumané faktory a jejich rozsahy.
+        observed (array-like): Pozorované hodnoty pro výpočet R².
+        log (bool): Zda analyzovat log10 predikcí místo predikcí.
+        seed (int): Semínko generátoru náhodných čísel.
+        chunk_size (int): Počet bodů v jedné dávce modelu.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        MorrisResult: Statistiky efektů pro všechny výstupy.
+    """
+
+    names = list(factors)
+    k = len(names)
+    bounds = [factors[name] for name in names]
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+
+    # Počáteční body na mřížce z Haltonovy posloupnosti; z nižší poloviny úrovní se jde nahoru
+    start = np.minimum(np.floor(halton(trajectories, k, seed) * levels), levels - 1)
+    direction = np.where(start < levels / 2, 1.0, -1.0)
+    order = np.argsort(rng.random((trajectories, k)), axis=1)
+
+    # Trajektorie: v kroku j se změní faktor order[:, j] o ±Δ
+    steps = np.zeros((trajectories, k + 1, k))
+    rows = np.arange(trajectories)
+    for j in range(k):
+        steps[:, j + 1] = steps[:, j]
+        steps[rows, j + 1, order[:, j]] = direction[rows, order[:, j]] * delta
+    unit = start[:, None, :] / (levels - 1) + steps
+
+    outputs = model_outputs(_scale(unit.reshape(-1, k), bounds), names, observed, log,
+                            chunk_size, workers).reshape(trajectories, k + 1, -1)
+
+    # Elementární efekt faktoru order[:, j] z rozdílu sousedních bodů trajektorie
+    effects = np.empty((trajectories, k, outputs.shape[-1]))
+    for j in range(k):
+        change = (outputs[:, j + 1] - outputs[:, j]) / (direction[rows, order[:, j]] * delta)[:, None]
+        effects[rows, order[:, j]] = change
+    return MorrisResult(factors=names, outputs=list(AGE_GROUPS) + ['r2'],
+                        mu=effects.mean(axis=0).T, mu_star=np.abs(effects).mean(axis=0).T,
+                        sigma=effects.std(axis=0, ddof=1).T, evaluations=trajectories * (k + 1))
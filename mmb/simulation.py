@@ -0,0 +1,244 @@
+# Načtení knihoven
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.model import evaluate
+from mmb.poisson import compute_pa, log_poisson_tail
+
+# Stochastická simulace (Monte Carlo) pro ověření analytického modelu.
+#
+# Každý virtuální jedinec prožije v každé věkové skupině jeden rok, během kterého
+# proběhne n dělení buněk. Z nich se rakovinnými stane
+#
+#   K_a ~ Binomial(n, p_a)  buněk kvůli akumulaci více než q mutací,
+#   K_c ~ Binomial(n, p_c)  buněk kvůli jedné mutaci v průběhu dělení,
+#
+# a jedinec onemocní, pokud K_a + K_c > 0. Analytický model místo binomického
+# rozdělení předpokládá Poissonovo, tj. P(0) = exp(-n p). Jedinci se simulují po
+# blocích pevné velikosti, takže paměť nezávisí na celkovém počtu jedinců, a bloky
+# lze rozdělit mezi pracovní procesy s nezávislými proudy náhodných čísel.
+#
+# Pozor: simulate() bere p_a z analytického chvostu Poissonova rozdělení
+# (compute_pa), takže ověřuje jen krok od p_a k p_cancer_year (binomické rozdělení
+# místo exp(-n p)), ne předpoklad, že počet mutací v buňce je Poissonův.
+# Ten ověřuje simulate_mutations: každá buňka projde D děleními a v každém
+# získá mutaci s pravděpodobností generation / D, takže počet mutací je součet
+# D nezávislých pokusů (Binomial(D, generation / D)) a teprve pro D → ∞ je
+# Poissonův. Empirický chvost P(X > q) se porovná s log_poisson_tail; rozlišit
+# ho od nuly lze jen pro malá q (chvost řádově alespoň 10 / n_cells).
+# simulate_tail naopak vzorkuje přímo X ~ Poisson(λ) a ověřuje jen numeriku
+# compute_pa.
+
+
+# Definice výsledku simulace
+@dataclass
+class SimulationResult:
+
+    """
+    Třída s empirickým výskytem rakoviny a jeho porovnáním s analytickým modelem.
+
+    Atributy:
+        age_groups (ndarray): Intervaly věku v letech, tvar (A,).
+        n_individuals (int): Počet simulovaných jedinců.
+        cases (ndarray): Počet jedinců, kteří v dané věkové skupině onemocněli.
+        cases_accumulative (ndarray): Počet jedinců s alespoň jednou buňkou s více než q mutacemi.
+        cases_constant (ndarray): Počet jedinců s alespoň jednou buňkou změněnou jedním dělením.
+        p_cancer_year (ndarray): Empirická pravděpodobnost vzniku rakoviny za rok.
+        lower (ndarray): Dolní mez Wilsonova intervalu spolehlivosti.
+        upper (ndarray): Horní mez Wilsonova intervalu spolehlivosti.
+        analytic (ndarray): Analytická hodnota p_cancer_year z modelu.
+    """
+
+    age_groups: np.ndarray
+    n_individuals: int
+    cases: np.ndarray
+    cases_accumulative: np.ndarray
+    cases_constant: np.ndarray
+    p_cancer_year: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    analytic: np.ndarray
+
+    @property
+    def z_scores(self):
+
+        """
+        Odchylka empirických hodnot od analytického modelu v násobcích směrodatné chyby.
+        """
+
+        se = np.sqrt(self.analytic * (1 - self.analytic) / self.n_individuals)
+        return (self.p_cancer_year - self.analytic) / se
+
+
+# Definice funkce pro výpočet Wilsonova intervalu spolehlivosti
+def wilson_interval(successes, trials, confidence=0.95):
+
+    """
+    Funkce pro výpočet Wilsonova intervalu spolehlivosti pro podíl.
+
+    Parametry:
+        successes (array-like): Počet úspěchů.
+        trials (int): Počet pokusů.
+        confidence (float): Hladina spolehlivosti.
+
+    Návratová hodnota:
+        tuple: Dolní a horní mez intervalu.
+    """
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = np.asarray(successes, dtype=np.float64) / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return centre - half_width, centre + half_width
+
+
+# Funkce spouštěná v pracovním procesu: simulace části jedinců po blocích
+def _simulate_block(n_individuals, chunk_size, parameter_n, p_accumulative, p_c, seed):
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((3, len(parameter_n)), dtype=np.int64)
+    remaining = n_individuals
+    while remaining > 0:
+        size = (min(chunk_size, remaining), len(parameter_n))
+        k_a = rng.binomial(parameter_n, p_accumulative, size=size)
+        k_c = rng.binomial(parameter_n, p_c, size=size)
+        counts[0] += np.count_nonzero(k_a + k_c, axis=0)
+        counts[1] += np.count_nonzero(k_a, axis=0)
+        counts[2] += np.count_nonzero(k_c, axis=0)
+        remaining -= size[0]
+    return counts
+
+
+# Definice funkce pro simulaci výskytu rakoviny
+def simulate(n_individuals, age_groups=AGE_GROUPS, generation=GENERATION, parameter_n=PARAMETER_N,
+             p_c=P_CONSTANT, q=Q, chunk_size=250_000, confidence=0.95, seed=0, workers=0):
+
+    """
+    Funkce pro simulaci výskytu rakoviny u velkého počtu virtuálních jedinců.
+
+    Parametry:
+        n_individuals (int): Počet simulovaných jedinců.
+        age_groups (array-like): Intervaly věku v letech.
+        generation (array-like): Průměrný počet mutací pro každou buňku.
+        parameter_n (array-like): Počet obnov buněk během jednoho roku.
+        p_c (float): Pravděpodobnost vzniku rakoviny během jednoho dělení.
+        q (int): Práh počtu akumulovaných mutací.
+        chunk_size (int): Počet jedinců simulovaných najednou (určuje spotřebu paměti).
+        confidence (float): Hladina spolehlivosti intervalů.
+        seed (int): Semínko generátoru náhodných čísel.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+
+    Návratová hodnota:
+        SimulationResult: Empirický výskyt s intervaly spolehlivosti a analytické hodnoty.
+    """
+
+    model = evaluate(age_groups, generation, parameter_n, p_c, q)
+    parameter_n = np.rint(np.asarray(parameter_n, dtype=np.float64)).astype(np.int64)
+    p_accumulative = np.asarray(model.p_accumulative)
+
+    # Rozdělení jedinců mezi procesy s nezávislými proudy náhodných čísel
+    workers = os.cpu_count() if workers is None else workers
+    parts = max(workers, 1)
+    sizes = [n_individuals // parts + (i < n_individuals % parts) for i in range(parts)]
+    seeds = np.random.SeedSequence(seed).spawn(parts)
+    if workers <= 1:
+        counts = sum(_simulate_block(size, chunk_size, parameter_n, p_accumulative, p_c, s)
+                     for size, s in zip(sizes, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = sum(executor.map(_simulate_block, sizes, [chunk_size] * parts,
+                                      [parameter_n] * parts, [p_accumulative] * parts,
+                                      [p_c] * parts, seeds))
+
+    lower, upper = wilson_interval(counts[0], n_individuals, confidence)
+    return SimulationResult(
+        age_groups=np.asarray(age_groups),
+        n_individuals=n_individuals,
+        cases=counts[0],
+        cases_accumulative=counts[1],
+        cases_constant=counts[2],
+        p_cancer_year=counts[0] / n_individuals,
+        lower=lower,
+        upper=upper,
+        analytic=np.asarray(model.p_cancer_year),
+    )
+
+
+# Definice funkce pro simulaci počtu mutací v buňkách
+def simulate_tail(q, lambd, n_cells, chunk_size=1_000_000, confidence=0.95, seed=0):
+
+    """
+    Funkce pro empirický odhad P(X > q) vzorkováním počtu mutací X ~ Poisson(λ) v buňkách.
+
+    Slouží k ověření mmb.poisson.compute_pa tam, kde chvost není příliš malý
+    (řádově alespoň 10 / n_cells).
+
+    Parametry:
+        q (int): Práh mutací.
+        lambd (array-like): Průměrné počty mutací, tvar (L,).
+        n_cells (int): Počet simulovaných buněk pro každé λ.
+        chunk_size (int): Počet buněk vzorkovaných najednou.
+        confidence (float): Hladina spolehlivosti intervalů.
+        seed (int): Semínko generátoru náhodných čísel.
+
+    Návratová hodnota:
+        tuple: Empirický chvost, dolní a horní mez intervalu a analytický chvost.
+    """
+
+    rng = np.random.default_rng(seed)
+    lambd = np.atleast_1d(np.asarray(lambd, dtype=np.float64))
+    exceed = np.zeros(lambd.shape, dtype=np.int64)
+    remaining = n_cells
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        exceed += np.count_nonzero(rng.poisson(lambd, size=(size, len(lambd))) > q, axis=0)
+        remaining -= size
+    lower, upper = wilson_interval(exceed, n_cells, confidence)
+    return exceed / n_cells, lower, upper, compute_pa(q, lambd)
+
+
+# Definice funkce pro simulaci počtu mutací v buňkách po jednotlivých děleních
+def simulate_mutations(q, generation, divisions, n_cells, chunk_size=1_000_000, confidence=0.95, seed=0):
+
+    """
+    Funkce pro empirický odhad P(X > q), kde X je počet mutací, které buňka nasbírá během divisions
+    dělení (v každém dělení nejvýš jednu, s pravděpodobností generation / divisions).
+
+    Na rozdíl od simulate a simulate_tail nepředpokládá Poissonovo rozdělení, takže porovnání
+    s analytickým chvostem ověřuje samotný předpoklad modelu. Použitelné jen pro malá q
+    (empirický chvost řádově alespoň 10 / n_cells).
+
+    Parametry:
+        q (int): Práh mutací.
+        generation (array-like): Průměrné počty mutací v buňce, tvar (L,).
+        divisions (int): Počet dělení, během kterých buňka mutace sbírá.
+        n_cells (int): Počet simulovaných buněk pro každou hodnotu generation.
+        chunk_size (int): Počet buněk vzorkovaných najednou.
+        confidence (float): Hladina spolehlivosti intervalů.
+        seed (int): Semínko generátoru náhodných čísel.
+
+    Návratová hodnota:
+        tuple: Empirický chvost, dolní a horní mez intervalu a chvost Poissonova rozdělení.
+    """
+
+    generation = np.atleast_1d(np.asarray(generation, dtype=np.float64))
+    rate = generation / divisions
+    if np.any((rate < 0) | (rate > 1)):
+        raise ValueError('Pravděpodobnost mutace v jednom dělení generation / divisions musí být v [0, 1]')
+
+    # Součet nezávislých pokusů v jednotlivých děleních má binomické rozdělení
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(generation.shape, dtype=np.int64)
+    remaining = n_cells
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        mutations = rng.binomial(divisions, rate, size=(size, len(generation)))
+        exceed += np.count_nonzero(mutations > q, axis=0)
+        remaining -= size
+    lower, upper = wilson_interval(exceed, n_cells, confidence)
+    return exceed / n_cells, lower, upper, np.exp(log_poisson_tail(q, generation))
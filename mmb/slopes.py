@@ -0,0 +1,196 @@
+# Načtení knihoven
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS
+from mmb.profiling import stage
+
+# Sklony log(P(cancer)/rok) proti log(věk) pro mnoho křivek a věkových oken najednou.
+#
+# Pro přímku y = a + b x metodou nejmenších čtverců v okně s vycentrovanými
+# hodnotami x' = x - x̄, y' = y - ȳ platí
+#
+#   b = Σx'y' / Σx'²,   a = ȳ - b x̄,   R² = (Σx'y')² / (Σx'² Σy'²).
+#
+# Okna stejné délky jsou posuvná okna přes věkové skupiny, takže se pro každou
+# délku okna spočítají všechna okna a všechny křivky jedním vektorizovaným
+# výpočtem (cyklus jen přes nejvýš A délek). Každé okno se centruje svým vlastním
+# průměrem, takže rozptyl nevzniká odečtením velkých součtů n Σy² - (Σy)².
+#
+# Okno nemá smysl, pokud v něm P(cancer)/rok dosáhlo 1 (nasycení) nebo se křivka
+# v okně nemění (Σy'² je na úrovni zaokrouhlovací chyby vůči Σy²). Takové okno
+# dostane NaN a nikdy se nevybere. Nejlepší okno je nejširší okno, jehož R² dosáhne
+# zadaného prahu (při shodě počtu bodů rozhoduje vyšší R²); pokud takové okno
+# neexistuje, vybere se okno s nejvyšším R². Křivka bez platného okna má
+# v nejlepším okně NaN.
+
+# Pravděpodobnost za rok, od které se bod považuje za nasycený
+SATURATION = 1 - 4 * np.finfo(np.float64).eps
+
+# Relativní tolerance Σy'² / Σy², pod kterou se okno považuje za ploché
+FLAT_TOLERANCE = (64 * np.finfo(np.float64).eps) ** 2
+
+
+# Definice výsledku analýzy sklonů
+@dataclass
+class SlopeAnalysis:
+
+    """
+    Třída se sklony v logaritmickém měřítku pro všechna věková okna.
+
+    Atributy:
+        age_groups (ndarray): Věkové skupiny, tvar (A,).
+        windows (ndarray): První a poslední index věkové skupiny každého okna, tvar (W, 2).
+        slope (ndarray): Sklon přímky (NaN pro nasycená nebo plochá okna), tvar (..., W).
+        intercept (ndarray): Úsek přímky, tvar (..., W).
+        r2 (ndarray): Koeficient determinace přímky, tvar (..., W).
+        best (ndarray): Index nejlepšího okna pro každou křivku, tvar (...).
+    """
+
+    age_groups: np.ndarray
+    windows: np.ndarray
+    slope: np.ndarray
+    intercept: np.ndarray
+    r2: np.ndarray
+    best: np.ndarray
+
+    def window(self, age_from, age_to):
+
+        """
+        Funkce pro index okna s danými krajními věkovými skupinami (včetně).
+
+        Parametry:
+            age_from (float): Věk první skupiny okna.
+            age_to (float): Věk poslední skupiny okna.
+
+        Návratová hodnota:
+            int: Index okna v polích slope, intercept a r2.
+        """
+
+        first = int(np.searchsorted(self.age_groups, age_from))
+        last = int(np.searchsorted(self.age_groups, age_to, side='right')) - 1
+        matches = np.flatnonzero((self.windows[:, 0] == first) & (self.windows[:, 1] == last))
+        if not len(matches):
+            raise ValueError(f'Okno {age_from}-{age_to} let není mezi počítanými okny')
+        return int(matches[0])
+
+    @property
+    def best_slope(self):
+        return np.take_along_axis(self.slope, self.best[..., None], axis=-1)[..., 0]
+
+    @property
+    def best_r2(self):
+        return np.take_along_axis(self.r2, self.best[..., None], axis=-1)[..., 0]
+
+    @property
+    def best_ages(self):
+        ages = self.age_groups[self.windows[self.best]].astype(np.float64)
+        return np.where(np.isnan(self.best_r2)[..., None], np.nan, ages)
+
+
+# Definice funkce pro seznam věkových oken
+def age_windows(count, min_points=3):
+
+    """
+    Funkce pro všechna souvislá okna věkových skupin s alespoň min_points body.
+
+    Parametry:
+        count (int): Počet věkových skupin.
+        min_points (int): Nejmenší počet bodů okna.
+
+    Návratová hodnota:
+        ndarray: První a poslední index každého okna, tvar (W, 2).
+    """
+
+    first, last = np.triu_indices(count, k=min_points - 1)
+    return np.column_stack([first, last])
+
+
+# Definice funkce pro sklony ve všech oknech
+def log_slopes(p_cancer_year, age_groups=AGE_GROUPS, min_points=3, r2_threshold=0.99):
+
+    """
+    Funkce pro sklony log10(P(cancer)/rok) proti log10(věk) pro všechny křivky a věková okna.
+
+    Parametry:
+        p_cancer_year (array-like): Pravděpodobnost vzniku rakoviny za rok, tvar (..., A).
+        age_groups (array-like): Věkové skupiny, tvar (A,).
+        min_points (int): Nejmenší počet bodů okna.
+        r2_threshold (float): Práh R² pro výběr nejlepšího (nejširšího dostatečně lineárního) okna.
+
+    Návratová hodnota:
+        SlopeAnalysis: Sklony, úseky a R² pro všechna okna a nejlepší okno každé křivky.
+    """
+
+    with stage('slopes'):
+        age_groups = np.asarray(age_groups)
+        log_age = np.log10(age_groups.astype(np.float64))
+        p_cancer_year = np.asarray(p_cancer_year, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_p = np.log10(p_cancer_year)
+
+        # Body bez platné hodnoty nebo nasycené body dostanou NaN, které se přenese do oken
+        log_p = np.where(np.isfinite(log_p) & (p_cancer_year < SATURATION), log_p, np.nan)
+        windows = age_windows(len(log_age), min_points)
+        points = windows[:, 1] - windows[:, 0] + 1
+        slope, intercept, r2 = (np.full(log_p.shape[:-1] + (len(windows),), np.nan) for _ in range(3))
+
+        # Všechna okna jedné délky jako posuvná okna (v pořadí podle první skupiny)
+        for length in np.unique(points):
+            index = np.flatnonzero(points == length)
+            x_window = np.lib.stride_tricks.sliding_window_view(log_age, length)
+            y_window = np.lib.stride_tricks.sliding_window_view(log_p, length, axis=-1)
+            x_mean, y_mean = x_window.mean(axis=-1), y_window.mean(axis=-1)
+            x = x_window - x_mean[:, None]
+            y = y_window - y_mean[..., None]
+            sxx, sxy, syy = np.sum(x * x, axis=-1), np.sum(x * y, axis=-1), np.sum(y * y, axis=-1)
+
+            # Plochá okna (bez změny log P nad zaokrouhlovací chybou) jsou neplatná
+            flat = syy <= FLAT_TOLERANCE * np.sum(y_window * y_window, axis=-1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope_window = np.where(flat, np.nan, sxy / sxx)
+                r2[..., index] = np.where(flat, np.nan, sxy ** 2 / (sxx * syy))
+            slope[..., index] = slope_window
+            intercept[..., index] = y_mean - slope_window * x_mean
+
+        # Nejlepší okno: nejvíc bodů mezi okny s R² ≥ prahu, při shodě vyšší R²
+        r2_valid = np.nan_to_num(r2, nan=-1.0)
+        best = np.argmax(np.where(r2_valid >= r2_threshold, points, 0) + r2_valid, axis=-1)
+
+        return SlopeAnalysis(age_groups=age_groups, windows=windows, slope=slope,
+                             intercept=intercept, r2=r2, best=best)
+
+
+# Definice funkce pro mapu sklonů přes úložiště výsledků prohledávání
+def store_slopes(store, chunk_size=100_000, min_points=3, r2_threshold=0.99,
+                 age_groups=AGE_GROUPS):
+
+    """
+    Funkce pro sklon v nejlepším okně pro všechny body prohledávání uložené v mmb.store.
+
+    Sloupec p_cancer_5_years se čte po blocích, takže paměť nezávisí na velikosti úložiště.
+
+    Parametry:
+        store (ResultStore): Úložiště výsledků prohledávání (viz mmb.store.sweep_to_store).
+        chunk_size (int): Počet bodů v jednom bloku.
+        min_points (int): Nejmenší počet bodů okna.
+        r2_threshold (float): Práh R² pro výběr nejlepšího okna.
+        age_groups (array-like): Věkové skupiny, tvar (A,).
+
+    Návratová hodnota:
+        dict: Pole 'slope', 'r2', 'age_from' a 'age_to' pro nejlepší okno, tvar (N,)
+            (NaN pro křivky bez platného okna).
+    """
+
+    count = len(store)
+    result = {'slope': np.empty(count), 'r2': np.empty(count),
+              'age_from': np.empty(count), 'age_to': np.empty(count)}
+    for start in range(0, count, chunk_size):
+        rows = slice(start, min(start + chunk_size, count))
+        p_cancer_year = store['p_cancer_5_years'][rows] / 500
+        analysis = log_slopes(p_cancer_year, age_groups, min_points, r2_threshold)
+        ages = analysis.best_ages
+        result['slope'][rows], result['r2'][rows] = analysis.best_slope, analysis.best_r2
+        result['age_from'][rows], result['age_to'][rows] = ages[..., 0], ages[..., 1]
+    return result
@@ -0,0 +1,296 @@
+# Načtení knihoven
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from mmb.profiling import stage
+
+# Sloupcové úložiště výsledků (složka se soubory .npy a schématem).
+#
+# Každý sloupec je samostatný soubor <název>.npy s pevným datovým typem a tvarem
+# (řádky, ...). Soubor schema.json popisuje pořadí sloupců, jejich typy, tvary a
+# popisky v Unicode (např. 'λ = np'), které se použijí při převodu na tabulku.
+# Sloupce se čtou přes np.load(mmap_mode='r'), takže otevření úložiště nic
+# nenačítá a výběr řádků nebo sloupců čte z disku jen potřebná data. Velká
+# úložiště (např. výsledky prohledávání s miliony bodů) se zapisují po částech
+# přes create_store() a mapované sloupce v režimu 'r+'.
+
+# Název souboru se schématem a verze formátu
+SCHEMA_FILE = 'schema.json'
+FORMAT_VERSION = 1
+
+# Popisky sloupců výsledků modelu (hlavičky původního vysledky.csv)
+MODEL_LABELS = {
+    'age_groups': 'Age group',
+    'generation': 'Generation (λ_pa)',
+    'parameter_n': 'n (turnover/year)',
+    'p_c': 'p_c',
+    'p_accumulative': 'p_a',
+    'p_all': 'p = p_c + p_a',
+    'lambda_np': 'λ = np',
+    'e_lambda': 'e^λ',
+    'p_0': 'p(0)',
+    'p_cancer_year': 'p(cancer)/year',
+    'p_cancer_5_years': 'p(cancer)/5 years (%)',
+    'cancerstats': 'Cancerstats P(cancer)/5 years (%)',
+}
+
+# Popisky sloupců výsledků prohledávání mřížky
+SWEEP_LABELS = {
+    'q': 'q',
+    'p_c': 'p_c',
+    'generation_slope': 'Generation slope',
+    'curve': 'n curve',
+    'r2': 'R²',
+    'p_cancer_5_years': 'p(cancer)/5 years (%)',
+    'cumulative_risk': 'Cumulative risk (%)',
+}
+
+
+# Definice úložiště výsledků
+class ResultStore:
+
+    """
+    Třída pro přístup ke sloupcovému úložišti výsledků mapovanému do paměti.
+
+    Atributy:
+        path (Path): Složka úložiště.
+        schema (dict): Obsah souboru schema.json.
+        columns (dict): Sloupce jako np.memmap podle názvu.
+    """
+
+    def __init__(self, path, mode='r'):
+        self.path = Path(path)
+        schema_path = self.path / SCHEMA_FILE
+        if not schema_path.exists():
+            raise FileNotFoundError(f'V adresáři {self.path} není úložiště výsledků ({SCHEMA_FILE})')
+        self.schema = json.loads(schema_path.read_text(encoding='utf-8'))
+        if self.schema.get('version') != FORMAT_VERSION:
+            raise ValueError(f'Nepodporovaná verze úložiště {self.schema.get("version")!r}')
+        self.columns = {column['name']: np.load(self.path / f'{column["name"]}.npy', mmap_mode=mode)
+                        for column in self.schema['columns']}
+
+    def __len__(self):
+        return self.schema['rows']
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    @property
+    def names(self):
+        return [column['name'] for column in self.schema['columns']]
+
+    @property
+    def attrs(self):
+        return self.schema.get('attrs', {})
+
+    def label(self, name):
+        return next(column['label'] for column in self.schema['columns'] if column['name'] == name)
+
+    def select(self, rows=slice(None), names=None):
+
+        """
+        Funkce pro načtení vybraných řádků a sloupců do paměti.
+
+        Parametry:
+            rows (slice | array-like): Výběr řádků (řez, indexy nebo logická maska).
+            names (iterable): Názvy sloupců (None = všechny).
+
+        Návratová hodnota:
+            dict: Pole vybraných řádků pro každý sloupec.
+        """
+
+        names = self.names if names is None else list(names)
+        return {name: np.asarray(self.columns[name][rows]) for name in names}
+
+    def flush(self):
+        for column in self.columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
+
+    def to_frame(self, rows=slice(None), names=None):
+
+        """
+        Funkce pro převod vybraných řádků na tabulku s popisky sloupců ze schématu.
+
+        Vícerozměrné sloupce se rozloží na sloupce 'popisek [i]'.
+
+        Parametry:
+            rows (slice | array-like): Výběr řádků.
+            names (iterable): Názvy sloupců (None = všechny).
+
+        Návratová hodnota:
+            pandas.DataFrame: Tabulka vybraných dat.
+        """
+
+        import pandas as pd
+
+        frame = {}
+        for name, values in self.select(rows, names).items():
+            label = self.label(name)
+            if values.ndim == 1:
+                frame[label] = values
+            else:
+                values = values.reshape(len(values), -1)
+                frame.update({f'{label} [{i}]': values[:, i] for i in range(values.shape[1])})
+        with stage('frame'):
+            return pd.DataFrame(frame)
+
+
+# Definice funkce pro vytvoření prázdného úložiště
+def create_store(path, rows, columns, labels=None, attrs=None):
+
+    """
+    Funkce pro vytvoření úložiště s předem známým počtem řádků, které se plní po částech.
+
+    Parametry:
+        path (str | Path): Složka úložiště (vytvoří se).
+        rows (int): Počet řádků.
+        columns (dict): Pro každý název sloupce dvojice (dtype, tvar jednoho řádku).
+        labels (dict): Popisky sloupců (výchozí je název sloupce).
+        attrs (dict): Doplňující údaje uložené ve schématu (musí jít převést na JSON).
+
+    Návratová hodnota:
+        ResultStore: Úložiště otevřené pro zápis (režim 'r+').
+    """
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    labels = labels or {}
+    schema = {'version': FORMAT_VERSION, 'rows': int(rows), 'columns': [], 'attrs': attrs or {}}
+    for name, (dtype, shape) in columns.items():
+        shape = tuple(int(size) for size in shape)
+        np.lib.format.open_memmap(path / f'{name}.npy', mode='w+', dtype=dtype,
+                                  shape=(int(rows),) + shape).flush()
+        schema['columns'].append({'name': name, 'dtype': np.dtype(dtype).str, 'shape': list(shape),
+                                  'label': labels.get(name, name)})
+
+    # Schéma se zapisuje jako poslední, takže neúplné úložiště nejde otevřít
+    tmp_path = path / (SCHEMA_FILE + '.tmp')
+    tmp_path.write_text(json.dumps(schema, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_path, path / SCHEMA_FILE)
+    return ResultStore(path, mode='r+')
+
+
+# Definice funkce pro zápis celých sloupců do úložiště
+def write_store(path, arrays, labels=None, attrs=None):
+
+    """
+    Funkce pro uložení sloupců stejné délky do nového úložiště.
+
+    Parametry:
+        path (str | Path): Složka úložiště.
+        arrays (dict): Sloupce jako pole tvaru (řádky, ...).
+        labels (dict): Popisky sloupců.
+        attrs (dict): Doplňující údaje uložené ve schématu.
+
+    Návratová hodnota:
+        ResultStore: Úložiště otevřené pro čtení.
+    """
+
+    arrays = {name: np.asarray(values) for name, values in arrays.items()}
+    lengths = {len(values) for values in arrays.values()}
+    if len(lengths) != 1:
+        raise ValueError('Všechny sloupce musí mít stejný počet řádků')
+    store = create_store(path, lengths.pop(),
+                         {name: (values.dtype, values.shape[1:]) for name, values in arrays.items()},
+                         labels, attrs)
+    for name, values in arrays.items():
+        store[name][:] = values
+    store.flush()
+    return ResultStore(path)
+
+
+# Definice funkce pro otevření úložiště
+def open_store(path, mode='r'):
+
+    """
+    Funkce pro otevření úložiště se sloupci mapovanými do paměti.
+
+    Parametry:
+        path (str | Path): Složka úložiště.
+        mode (str): Režim mapování ('r' pro čtení, 'r+' pro úpravy).
+
+    Návratová hodnota:
+        ResultStore: Otevřené úložiště.
+    """
+
+    return ResultStore(path, mode)
+
+
+# Definice funkce pro uložení výsledků modelu
+def store_model(path, model, cancerstats=None):
+
+    """
+    Funkce pro uložení výsledků modelu (jeden řádek pro každou sadu parametrů a věkovou skupinu).
+
+    Parametry:
+        path (str | Path): Složka úložiště.
+        model (ModelResult): Výsledky z mmb.model.evaluate.
+        cancerstats (array-like): Pozorované hodnoty pro věkové skupiny, tvar (A,).
+
+    Návratová hodnota:
+        ResultStore: Úložiště otevřené pro čtení.
+    """
+
+    shape = np.shape(model.p_cancer_5_years)
+    arrays = {name: np.broadcast_to(getattr(model, name), shape).ravel()
+              for name in MODEL_LABELS if name != 'cancerstats'}
+    if cancerstats is not None:
+        arrays['cancerstats'] = np.broadcast_to(cancerstats, shape).ravel()
+    return write_store(path, arrays, MODEL_LABELS, {'q': np.unique(model.q).tolist()})
+
+
+# Definice funkce pro převod výsledků prohledávání do úložiště
+def sweep_to_store(sweep_dir, path):
+
+    """
+    Funkce pro spojení bloků chunk_XXXXXX.npz z mmb.sweep do jednoho úložiště.
+
+    Bloky se kopírují jeden po druhém do mapovaných sloupců, takže se nikdy
+    nenačte víc než jeden blok.
+
+    Parametry:
+        sweep_dir (str | Path): Adresář s výsledky prohledávání.
+        path (str | Path): Složka nového úložiště.
+
+    Návratová hodnota:
+        ResultStore: Úložiště otevřené pro čtení.
+    """
+
+    paths = sorted(Path(sweep_dir).glob('chunk_[0-9]*[0-9].npz'))
+    if not paths:
+        raise FileNotFoundError(f'V adresáři {sweep_dir} nejsou žádné výsledky prohledávání')
+
+    # Rozsah řádků každého bloku a typy sloupců z prvního bloku
+    extents = []
+    for chunk_path in paths:
+        with np.load(chunk_path) as chunk:
+            extents.append((int(chunk['start']), len(chunk['r2'])))
+            if len(extents) == 1:
+                columns = {key: (chunk[key].dtype, chunk[key].shape[1:])
+                           for key in chunk.files if key != 'start'}
+    rows = sum(size for _, size in extents)
+    if [start for start, _ in extents] != list(np.cumsum([0] + [size for _, size in extents[:-1]])):
+        raise ValueError(f'Výsledky prohledávání v adresáři {sweep_dir} nejsou úplné')
+
+    # Chybějící bloky na konci mřížky odhalí jen počet bodů z definice prohledávání
+    manifest_path = Path(sweep_dir) / 'sweep.npz'
+    if manifest_path.exists():
+        with np.load(manifest_path) as manifest:
+            if rows != int(manifest['size']):
+                raise ValueError(f'Výsledky prohledávání v adresáři {sweep_dir} nejsou úplné '
+                                 f'({rows} z {int(manifest["size"])} bodů)')
+
+    store = create_store(path, rows, columns, SWEEP_LABELS)
+    for chunk_path, (start, size) in zip(paths, extents):
+        with np.load(chunk_path) as chunk:
+            for key in columns:
+                store[key][start:start + size] = chunk[key]
+    store.flush()
+    return ResultStore(path)
@@ -0,0 +1,500 @@
+# Načtení knihoven
+import hashlib
+import json
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, CANCERSTATS, GENERATION, PARAMETER_N, P_CONSTANT, Q
+from mmb.incidence import score_sites
+from mmb.metrics import r2_score
+from mmb.model import evaluate, scale_generation
+from mmb.profiling import stage
+from mmb.risk import model_risk
+
+# Prohledávání mřížky parametrů q × p_c × sklon generation × křivky parameter_n.
+#
+# Mřížka se rozdělí na souvislé bloky (chunky) indexů bodů. Každý blok se
+# vyhodnotí jedním dávkovým voláním evaluate() v samostatném procesu a jeho
+# výsledky (parametry bodu, R² a predikovaná křivka) se hned zapíší na disk do
+# souboru chunk_XXXXXX.npz. V paměti tak nikdy není víc než několik bloků.
+#
+# Rozdělení na bloky je dané jen mřížkou a velikostí bloku, které se spolu
+# s pozorovanými daty uloží do adresáře jako sweep.npz. Adresář tak slouží jako
+# fronta na sdíleném souborovém systému: pracovníci na různých uzlech (run_worker)
+# si blok zaberou vytvořením souboru chunk_XXXXXX.lock (os.link, atomické i na
+# NFS) a hotový blok zapíší pod dočasným jménem a přejmenují. Po pádu se
+# dokončené bloky přeskočí a zámek mrtvého procesu se převezme hned (stejný uzel)
+# nebo po vypršení doby pronájmu lease (jiný uzel).
+
+# Soubor s definicí prohledávání v adresáři výsledků
+MANIFEST_FILE = 'sweep.npz'
+
+# Výchozí doba pronájmu zabraného bloku v sekundách (musí být delší než výpočet jednoho bloku)
+LEASE = 3600.0
+
+
+# Definice mřížky parametrů
+@dataclass
+class SweepGrid:
+
+    """
+    Třída popisující mřížku parametrů pro prohledávání.
+
+    Atributy:
+        q (ndarray): Prahy počtu akumulovaných mutací.
+        p_c (ndarray): Pravděpodobnosti vzniku rakoviny během jednoho dělení.
+        generation_slope (ndarray): Násobky sklonu křivky generation (viz scale_generation).
+        parameter_n (ndarray): Křivky počtu obnov buněk, tvar (C, A).
+        age_groups (ndarray): Intervaly věku v letech, tvar (A,).
+        generation (ndarray): Výchozí křivka generation, tvar (A,).
+    """
+
+    q: np.ndarray = field(default_factory=lambda: np.array([Q]))
+    p_c: np.ndarray = field(default_factory=lambda: np.array([P_CONSTANT]))
+    generation_slope: np.ndarray = field(default_factory=lambda: np.array([1.0]))
+    parameter_n: np.ndarray = field(default_factory=lambda: np.array([PARAMETER_N]))
+    age_groups: np.ndarray = field(default_factory=lambda: np.array(AGE_GROUPS))
+    generation: np.ndarray = field(default_factory=lambda: np.array(GENERATION, dtype=np.float64))
+
+    def __post_init__(self):
+        self.q = np.atleast_1d(np.asarray(self.q, dtype=np.int64))
+        self.p_c = np.atleast_1d(np.asarray(self.p_c, dtype=np.float64))
+        self.generation_slope = np.atleast_1d(np.asarray(self.generation_slope, dtype=np.float64))
+        self.parameter_n = np.atleast_2d(np.asarray(self.parameter_n, dtype=np.float64))
+        self.age_groups = np.asarray(self.age_groups)
+        self.generation = np.asarray(self.generation, dtype=np.float64)
+        if self.parameter_n.shape[1] != len(self.age_groups):
+            raise ValueError('Křivky parameter_n musí mít hodnotu pro každou věkovou skupinu')
+
+    @property
+    def shape(self):
+        return (len(self.q), len(self.p_c), len(self.generation_slope), len(self.parameter_n))
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def points(self, start, stop):
+
+        """
+        Funkce pro převod rozsahu indexů bodů na hodnoty parametrů.
+
+        Body jsou seřazeny tak, že nejrychleji se mění křivka parameter_n a nejpomaleji q.
+
+        Parametry:
+            start (int): Index prvního bodu (včetně).
+            stop (int): Index posledního bodu (bez něj).
+
+        Návratová hodnota:
+            dict: Pole q, p_c, generation_slope a curve (index křivky parameter_n).
+        """
+
+        iq, ipc, islope, icurve = np.unravel_index(np.arange(start, stop), self.shape)
+        return {
+            'q': self.q[iq],
+            'p_c': self.p_c[ipc],
+            'generation_slope': self.generation_slope[islope],
+            'curve': icurve,
+        }
+
+
+# Definice funkce pro vyhodnocení jednoho bloku mřížky
+def evaluate_chunk(grid, start, stop, observed=CANCERSTATS):
+
+    """
+    Funkce pro vyhodnocení modelu pro body mřížky s indexy start..stop - 1.
+
+    Parametry:
+        grid (SweepGrid): Mřížka parametrů.
+        start (int): Index prvního bodu (včetně).
+        stop (int): Index posledního bodu (bez něj).
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,) nebo (S, A)
+            pro více druhů rakoviny najednou (viz mmb.incidence).
+
+    Návratová hodnota:
+        dict: Parametry bodů, R² ('r2', tvar (N,) nebo (N, S)), predikované křivky ('p_cancer_5_years')
+        a křivky kumulativního rizika ('cumulative_risk', viz mmb.risk).
+    """
+
+    points = grid.points(start, stop)
+    generation = scale_generation(points['generation_slope'], grid.generation)
+    model = evaluate(grid.age_groups, generation, grid.parameter_n[points['curve']],
+                     points['p_c'], points['q'])
+    if np.ndim(observed) == 2:
+        points['r2'] = score_sites(observed, model.p_cancer_5_years).T
+    else:
+        points['r2'] = r2_score(observed, model.p_cancer_5_years)
+    points['p_cancer_5_years'] = model.p_cancer_5_years
+    points['cumulative_risk'] = model_risk(model).cumulative_risk
+    return points
+
+
+# Definice funkce pro cestu k souboru bloku
+def _chunk_path(output_dir, index, suffix='.npz'):
+    return Path(output_dir) / f'chunk_{index:06d}{suffix}'
+
+
+# Definice funkce pro dočasné jméno souboru jedinečné napříč uzly a procesy
+def _tmp_path(path, tag='tmp'):
+    return path.with_name(f'{path.stem}.{socket.gethostname()}.{os.getpid()}.{tag}{path.suffix}')
+
+
+# Definice funkce pro rozdělení mřížky na bloky
+def sweep_chunks(size, chunk_size):
+
+    """
+    Funkce pro deterministické rozdělení bodů mřížky na bloky.
+
+    Parametry:
+        size (int): Počet bodů mřížky.
+        chunk_size (int): Počet bodů v jednom bloku.
+
+    Návratová hodnota:
+        list: Trojice (index bloku, první bod, bod za posledním).
+    """
+
+    return [(index, start, min(start + chunk_size, size))
+            for index, start in enumerate(range(0, size, chunk_size))]
+
+
+# Definice funkce pro otisk definice prohledávání
+def _fingerprint(arrays):
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        values = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}:{values.dtype.str}:{values.shape}'.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+# Definice funkce pro uložení definice prohledávání
+def write_manifest(grid, output_dir, observed=CANCERSTATS, chunk_size=20_000):
+
+    """
+    Funkce pro uložení mřížky, pozorování a velikosti bloku do adresáře výsledků.
+
+    Pokud adresář už definici obsahuje, musí být stejná (jinak by se spojily bloky
+    z různých prohledávání).
+
+    Parametry:
+        grid (SweepGrid): Mřížka parametrů.
+        output_dir (str | Path): Adresář výsledků.
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,) nebo (S, A).
+        chunk_size (int): Počet bodů mřížky v jednom bloku.
+
+    Návratová hodnota:
+        str: Otisk definice prohledávání.
+    """
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    arrays = {name: getattr(grid, name) for name in ('q', 'p_c', 'generation_slope', 'parameter_n',
+                                                     'age_groups', 'generation')}
+    arrays['observed'] = np.asarray(observed, dtype=np.float64)
+    arrays['chunk_size'] = np.int64(chunk_size)
+    fingerprint = _fingerprint(arrays)
+
+    path = output_dir / MANIFEST_FILE
+    if path.exists():
+        with np.load(path) as manifest:
+            if str(manifest['fingerprint']) != fingerprint:
+                raise ValueError(f'Adresář {output_dir} obsahuje výsledky jiného prohledávání')
+        return fingerprint
+    tmp_path = _tmp_path(path)
+    np.savez(tmp_path, size=grid.size, fingerprint=fingerprint, **arrays)
+    os.replace(tmp_path, path)
+    return fingerprint
+
+
+# Definice funkce pro načtení definice prohledávání
+def load_manifest(output_dir):
+
+    """
+    Funkce pro načtení definice prohledávání uložené funkcí write_manifest.
+
+    Parametry:
+        output_dir (str | Path): Adresář výsledků.
+
+    Návratová hodnota:
+        tuple: Mřížka (SweepGrid), pozorování (ndarray) a velikost bloku (int).
+    """
+
+    path = Path(output_dir) / MANIFEST_FILE
+    if not path.exists():
+        raise FileNotFoundError(f'V adresáři {output_dir} není definice prohledávání ({MANIFEST_FILE})')
+    with np.load(path) as manifest:
+        grid = SweepGrid(**{name: manifest[name] for name in ('q', 'p_c', 'generation_slope',
+                                                              'parameter_n', 'age_groups', 'generation')})
+        return grid, manifest['observed'], int(manifest['chunk_size'])
+
+
+# Definice funkce pro zjištění nedokončených bloků
+def pending_chunks(output_dir):
+
+    """
+    Funkce pro seznam bloků, jejichž výsledek v adresáři ještě není.
+
+    Parametry:
+        output_dir (str | Path): Adresář výsledků s definicí prohledávání.
+
+    Návratová hodnota:
+        list: Trojice (index bloku, první bod, bod za posledním).
+    """
+
+    grid, _, chunk_size = load_manifest(output_dir)
+    return [chunk for chunk in sweep_chunks(grid.size, chunk_size)
+            if not _chunk_path(output_dir, chunk[0]).exists()]
+
+
+# Definice funkce pro zjištění, zda zámek bloku patří živému pracovníkovi
+def _stale_lock(path, lease):
+
+    """
+    Funkce pro posouzení zámku bloku.
+
+    Zámek je zastaralý, pokud patří mrtvému procesu na stejném uzlu nebo pokud je
+    starší než lease. Prázdný nebo poškozený zámek se posuzuje jen podle stáří.
+
+    Parametry:
+        path (Path): Soubor zámku.
+        lease (float): Doba pronájmu v sekundách.
+
+    Návratová hodnota:
+        os.stat_result: Údaje zastaralého zámku (None, pokud zámek platí nebo neexistuje).
+    """
+
+    try:
+        status = path.stat()
+        text = path.read_text(encoding='utf-8')
+    except OSError:
+        return None
+    try:
+        owner = json.loads(text)
+    except ValueError:
+        owner = None
+    if isinstance(owner, dict) and owner.get('host') == socket.gethostname():
+        try:
+            os.kill(int(owner['pid']), 0)
+        except ProcessLookupError:
+            return status
+        except (OSError, KeyError, TypeError, ValueError):
+            pass
+    return status if time.time() - status.st_mtime > lease else None
+
+
+# Definice funkce pro identitu souboru zámku
+def _identity(status):
+    return status.st_dev, status.st_ino, status.st_mtime_ns, status.st_size
+
+
+# Definice funkce pro odstranění zastaralého zámku
+def _break_lock(lock, status):
+
+    """
+    Funkce pro odstranění zámku, který byl posouzen jako zastaralý.
+
+    Zámek se přejmenuje na jedinečné jméno a teprve potom se ověří, že jde o stejný
+    soubor, který byl posouzen (inode, čas změny a velikost; samotný inode nestačí,
+    protože ho souborový systém může hned přidělit novému zámku). Pokud mezitím jiný pracovník zastaralý zámek
+    odstranil a vytvořil vlastní, vrátí se jeho zámek zpět.
+
+    Parametry:
+        lock (Path): Soubor zámku.
+        status (os.stat_result): Údaje zámku z _stale_lock.
+
+    Návratová hodnota:
+        bool: Zda má smysl zkusit blok zabrat znovu.
+    """
+
+    moved = _tmp_path(lock, 'stale')
+    try:
+        os.rename(lock, moved)
+    except FileNotFoundError:
+        return True
+    if _identity(moved.stat()) == _identity(status):
+        moved.unlink(missing_ok=True)
+        return True
+    try:
+        os.link(moved, lock)
+    except FileExistsError:
+        pass
+    moved.unlink(missing_ok=True)
+    return False
+
+
+# Definice funkce pro zabrání bloku
+def _claim(output_dir, index, lease):
+
+    """
+    Funkce pro atomické zabrání bloku vytvořením souboru zámku.
+
+    Údaje o vlastníkovi se zapíší do dočasného souboru, který se na jméno zámku
+    připojí přes os.link (selže, pokud zámek existuje), takže zámek nikdy není
+    prázdný. Zastaralý zámek se odstraní přes _break_lock a blok se zabere znovu.
+
+    Parametry:
+        output_dir (Path): Adresář výsledků.
+        index (int): Index bloku.
+        lease (float): Doba pronájmu v sekundách.
+
+    Návratová hodnota:
+        bool: Zda byl blok zabrán (False, pokud je hotový nebo ho počítá jiný pracovník).
+    """
+
+    if _chunk_path(output_dir, index).exists():
+        return False
+    lock = _chunk_path(output_dir, index, '.lock')
+    record = _tmp_path(lock)
+    record.write_text(json.dumps({'host': socket.gethostname(), 'pid': os.getpid(), 'time': time.time()}),
+                      encoding='utf-8')
+    try:
+        for _ in range(3):
+            try:
+                os.link(record, lock)
+            except FileExistsError:
+                status = _stale_lock(lock, lease)
+                if status is None or not _break_lock(lock, status):
+                    return False
+                continue
+
+            # Blok mohl dokončit pracovník, jehož zámek jsme právě převzali
+            if _chunk_path(output_dir, index).exists():
+                lock.unlink(missing_ok=True)
+                return False
+            return True
+        return False
+    finally:
+        record.unlink(missing_ok=True)
+
+
+# Funkce spouštěná v pracovním procesu: vyhodnocení bloku a jeho zápis na disk
+def _run_chunk(grid, index, start, stop, observed, output_dir):
+    with stage('sweep_chunk', size=stop - start):
+        points = evaluate_chunk(grid, start, stop, observed)
+    with stage('write_chunk'):
+        path = _chunk_path(output_dir, index)
+        tmp_path = _tmp_path(path)
+        np.savez(tmp_path, start=start, **points)
+        os.replace(tmp_path, path)
+    return index, stop - start
+
+
+# Definice funkce pro paralelní prohledávání mřížky
+def run_sweep(grid, output_dir, observed=CANCERSTATS, chunk_size=20_000, workers=None,
+              progress=None, lease=LEASE):
+
+    """
+    Funkce pro paralelní vyhodnocení celé mřížky se zápisem výsledků po blocích.
+
+    Opakované spuštění se stejnými parametry pokračuje od nedokončených bloků. Další
+    uzly se ke stejnému prohledávání mohou přidat přes run_worker(output_dir).
+
+    Parametry:
+        grid (SweepGrid): Mřížka parametrů.
+        output_dir (str | Path): Adresář pro soubory chunk_XXXXXX.npz.
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,) nebo (S, A).
+        chunk_size (int): Počet bodů mřížky v jednom bloku.
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+        progress (callable): Volitelná funkce progress(hotovo, celkem) volaná po každém bloku.
+        lease (float): Doba pronájmu zabraného bloku v sekundách.
+
+    Návratová hodnota:
+        Path: Adresář s výsledky.
+    """
+
+    write_manifest(grid, output_dir, observed, chunk_size)
+    return run_worker(output_dir, workers, progress, lease)
+
+
+# Definice funkce pro pracovníka sdílené fronty bloků
+def run_worker(output_dir, workers=None, progress=None, lease=LEASE):
+
+    """
+    Funkce pro vyhodnocení všech dosud nezabraných bloků prohledávání uloženého v adresáři.
+
+    Funkci lze současně spustit na více uzlech se sdíleným adresářem; každý blok
+    spočítá jen pracovník, který si ho zabral. Funkce skončí, když už není žádný
+    blok k zabrání (bloky rozpracované jinými pracovníky nečeká).
+
+    Parametry:
+        output_dir (str | Path): Adresář s definicí prohledávání (viz write_manifest).
+        workers (int): Počet pracovních procesů (None = počet jader, 0 = bez procesů).
+        progress (callable): Volitelná funkce progress(hotovo, celkem) volaná po každém bloku.
+        lease (float): Doba pronájmu zabraného bloku v sekundách.
+
+    Návratová hodnota:
+        Path: Adresář s výsledky.
+    """
+
+    output_dir = Path(output_dir)
+    grid, observed, chunk_size = load_manifest(output_dir)
+    chunks = sweep_chunks(grid.size, chunk_size)
+    done = sum(stop - start for index, start, stop in chunks if _chunk_path(output_dir, index).exists())
+
+    # Bloky se zabírají až těsně před spuštěním, aby zbytek zůstal volný pro jiné uzly
+    pending = ((index, start, stop) for index, start, stop in chunks if _claim(output_dir, index, lease))
+
+    def finish(index, size):
+        nonlocal done
+        _chunk_path(output_dir, index, '.lock').unlink(missing_ok=True)
+        done += size
+        if progress is not None:
+            progress(done, grid.size)
+
+    if workers == 0:
+        for index, start, stop in pending:
+            finish(*_run_chunk(grid, index, start, stop, observed, output_dir))
+        return output_dir
+
+    # Bloky se odesílají postupně, aby ve frontě nečekalo víc než několik bloků na proces
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = set()
+        for index, start, stop in pending:
+            futures.add(executor.submit(_run_chunk, grid, index, start, stop, observed, output_dir))
+            if len(futures) >= 2 * workers:
+                break
+        while futures:
+            future = next(as_completed(futures))
+            futures.remove(future)
+            finish(*future.result())
+            for index, start, stop in pending:
+                futures.add(executor.submit(_run_chunk, grid, index, start, stop, observed,
+                                            output_dir))
+                break
+    return output_dir
+
+
+# Definice funkce pro načtení výsledků prohledávání
+def load_sweep(output_dir):
+
+    """
+    Funkce pro načtení a spojení všech bloků výsledků v pořadí bodů mřížky.
+
+    Parametry:
+        output_dir (str | Path): Adresář se soubory chunk_XXXXXX.npz.
+
+    Návratová hodnota:
+        dict: Spojená pole q, p_c, generation_slope, curve, r2, p_cancer_5_years a cumulative_risk.
+    """
+
+    paths = sorted(Path(output_dir).glob('chunk_[0-9]*[0-9].npz'))
+    if not paths:
+        raise FileNotFoundError(f'V adresáři {output_dir} nejsou žádné výsledky prohledávání')
+    if (Path(output_dir) / MANIFEST_FILE).exists():
+        missing = pending_chunks(output_dir)
+        if missing:
+            raise ValueError(f'Výsledky prohledávání v adresáři {output_dir} nejsou úplné '
+                             f'(chybí {len(missing)} bloků)')
+    chunks = [dict(np.load(path)) for path in paths]
+    sizes = [len(chunk['r2']) for chunk in chunks]
+    if [int(chunk['start']) for chunk in chunks] != list(np.cumsum([0] + sizes[:-1])):
+        raise ValueError(f'Výsledky prohledávání v adresáři {output_dir} nejsou úplné')
+    keys = [key for key in chunks[0] if key != 'start']
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in keys}
@@ -0,0 +1,121 @@
+# Načtení knihoven
+import numpy as np
+
+from mmb.poisson import log_poisson_pmf, log_poisson_tail
+
+
+# Tabulka pravých chvostů P(X > q; λ) pro souvislý rozsah prahů q.
+#
+# Chvosty pro sousední prahy se liší jen o jeden člen:
+#
+#   P(X > q - 1) = P(X > q) + P(X = q),
+#
+# takže stačí jednou spočítat chvost pro nejvyšší práh a pak v logaritmickém
+# měřítku (np.logaddexp.accumulate) přičítat Poissonovy pravděpodobnosti směrem
+# dolů. Sestavení stojí O(počet λ × počet q) a každý dotaz je pak jen indexace.
+class TailTable:
+
+    """
+    Třída s předpočítanými hodnotami p_accumulative pro rozsah prahů q.
+
+    Atributy:
+        lambd (ndarray): Hodnoty parametru rozdělení (generation), tvar (L,).
+        q_min (int): Nejnižší práh v tabulce.
+        q_max (int): Nejvyšší práh v tabulce.
+        log_tail (ndarray): log P(X > q) pro q = q_min..q_max, tvar (Q, L).
+        log_pmf (ndarray): log P(X = q) pro q = q_min..q_max + 1, tvar (Q + 1, L).
+    """
+
+    def __init__(self, lambd, q_max, q_min=0):
+
+        """
+        Sestavení tabulky.
+
+        Parametry:
+            lambd (array-like): Hodnoty parametru rozdělení (např. generation).
+            q_max (int): Nejvyšší práh mutací.
+            q_min (int): Nejnižší práh mutací.
+        """
+
+        if q_min < 0 or q_max < q_min:
+            raise ValueError(f'Neplatný rozsah prahů: q_min = {q_min}, q_max = {q_max}')
+        self.lambd = np.atleast_1d(np.asarray(lambd, dtype=np.float64))
+        self.q_min = int(q_min)
+        self.q_max = int(q_max)
+
+        # Poissonovy pravděpodobnosti pro k = q_min..q_max + 1
+        k = np.arange(self.q_min, self.q_max + 2, dtype=np.float64)
+        self.log_pmf = log_poisson_pmf(k[:, None], self.lambd[None, :])
+
+        # Chvost pro nejvyšší práh a postupné přičítání členů směrem dolů
+        top = log_poisson_tail(self.q_max, self.lambd)
+        steps = np.concatenate([top[None, :], self.log_pmf[-2:0:-1]], axis=0)
+        self.log_tail = np.logaddexp.accumulate(steps, axis=0)[::-1]
+
+    # Převod prahů na řádky tabulky
+    def _rows(self, q):
+        q = np.asarray(q)
+        if np.any(q < self.q_min) or np.any(q > self.q_max):
+            raise ValueError(f'Práh q mimo rozsah tabulky [{self.q_min}, {self.q_max}]')
+        return q.astype(np.int64) - self.q_min
+
+    def log_pa(self, q):
+
+        """
+        Funkce pro vyhledání log p_accumulative pro dané prahy.
+
+        Parametry:
+            q (array-like): Práh mutací (celá čísla v rozsahu tabulky).
+
+        Návratová hodnota:
+            ndarray: log P(X > q) tvaru q.shape + (L,).
+        """
+
+        return self.log_tail[self._rows(q)]
+
+    def compute_pa(self, q):
+
+        """
+        Funkce pro vyhledání p_accumulative pro dané prahy.
+
+        Parametry:
+            q (array-like): Práh mutací (celá čísla v rozsahu tabulky).
+
+        Návratová hodnota:
+            ndarray: P(X > q) tvaru q.shape + (L,).
+        """
+
+        return np.exp(self.log_pa(q))
+
+    def pmf(self, q):
+
+        """
+        Funkce pro vyhledání Poissonovy pravděpodobnosti P(X = q).
+
+        Parametry:
+            q (array-like): Celá čísla v rozsahu [q_min, q_max + 1].
+
+        Návratová hodnota:
+            ndarray: P(X = q) tvaru q.shape + (L,).
+        """
+
+        q = np.asarray(q)
+        if np.any(q < self.q_min) or np.any(q > self.q_max + 1):
+            raise ValueError(f'Hodnota q mimo rozsah tabulky [{self.q_min}, {self.q_max + 1}]')
+        return np.exp(self.log_pmf[q.astype(np.int64) - self.q_min])
+
+    def pa_range(self, q_start, q_stop):
+
+        """
+        Funkce pro vrácení p_accumulative pro souvislý rozsah prahů.
+
+        Parametry:
+            q_start (int): První práh (včetně).
+            q_stop (int): Poslední práh (bez něj).
+
+        Návratová hodnota:
+            ndarray: P(X > q) pro q = q_start..q_stop - 1, tvar (q_stop - q_start, L).
+        """
+
+        rows = self._rows([q_start, q_stop - 1])
+        return np.exp(self.log_tail[rows[0]:rows[1] + 1])
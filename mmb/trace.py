@@ -0,0 +1,37 @@
+# Načtení knihoven
+import argparse
+import runpy
+import sys
+
+from mmb.profiling import stage, tracing
+
+# Spuštění libovolného skriptu se zapnutým sledováním částí výpočtu (viz mmb.profiling).
+#
+#   python -m mmb.trace --allocations --trace trace.json Figures/figure_3a.py
+#
+# Po doběhnutí se vypíše souhrn podle částí a záznam se uloží ve formátu Chrome
+# trace (a volitelně jako složené zásobníky pro flamegraph).
+
+
+# Definice funkce pro spuštění z příkazové řádky
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Spuštění skriptu se sledováním částí výpočtu.')
+    parser.add_argument('script', help='spouštěný skript')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='parametry skriptu')
+    parser.add_argument('--trace', default='trace.json', help='výstupní soubor ve formátu Chrome trace')
+    parser.add_argument('--folded', default=None, help='výstupní soubor se složenými zásobníky')
+    parser.add_argument('--allocations', action='store_true', help='sledovat i alokace paměti')
+    args = parser.parse_args(argv)
+
+    sys.argv = [args.script] + args.args
+    with tracing(args.allocations) as tracer:
+        with stage('script', path=args.script):
+            runpy.run_path(args.script, run_name='__main__')
+    print(tracer.format_summary())
+    tracer.to_chrome_trace(args.trace)
+    if args.folded:
+        tracer.to_folded(args.folded)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+# Načtení knihoven
+from dataclasses import dataclass
+
+import numpy as np
+
+from mmb.data import AGE_GROUPS, GENERATION, PARAMETER_N_CONSTANT, P_CONSTANT, Q
+from mmb.metrics import r2_score
+from mmb.model import evaluate
+
+# Křivky snižování počtu obnov buněk s věkem (parameter_n) a jejich porovnání.
+#
+# Místo ručně zadaných 19 hodnot parameter_n lze křivku popsat několika parametry:
+#
+#   exponential:  n(a) = n_0 exp(-rate · max(a - onset, 0)),
+#   logistic:     n(a) = n_old + (n_young - n_old) / (1 + exp((a - midpoint) / width)),
+#   linear/spline: lomená čára nebo přirozený kubický spline přes zadané uzly
+#                 (standardně v logaritmu n, takže křivka zůstane kladná).
+#
+# Parametry se broadcastují, takže jedním voláním vznikne pole křivek tvaru
+# (K, A). Interpolace přes uzly je lineární v hodnotách uzlů, a proto se počítá
+# jako součin s maticí báze (A, M) pro všechny křivky najednou. compare_curves
+# pošle všechny křivky jedním dávkovým voláním evaluate() a seřadí je podle shody
+# s pozorováním.
+
+
+# Definice výsledku porovnání křivek
+@dataclass
+class CurveComparison:
+
+    """
+    Třída s porovnáním křivek parameter_n podle shody modelu s pozorováním.
+
+    Atributy:
+        labels (list): Popisky křivek.
+        curves (ndarray): Křivky parameter_n, tvar (K, A).
+        p_cancer_5_years (ndarray): Predikce modelu pro každou křivku, tvar (K, A).
+        r2 (ndarray): Koeficient determinace, tvar (K,).
+        sse (ndarray): Součet čtverců reziduí, tvar (K,).
+        log_sse (ndarray): Součet čtverců reziduí logaritmů, tvar (K,).
+        order (ndarray): Indexy křivek seřazené od nejlepší podle R².
+    """
+
+    labels: list
+    curves: np.ndarray
+    p_cancer_5_years: np.ndarray
+    r2: np.ndarray
+    sse: np.ndarray
+    log_sse: np.ndarray
+    order: np.ndarray
+
+    def ranked(self, count=10):
+
+        """
+        Funkce pro výběr nejlépe padnoucích křivek.
+
+        Parametry:
+            count (int): Počet křivek.
+
+        Návratová hodnota:
+            list: Trojice (popisek, R², součet čtverců reziduí logaritmů) seřazené podle R².
+        """
+
+        return [(self.labels[i], float(self.r2[i]), float(self.log_sse[i])) for i in self.order[:count]]
+
+    def format(self, count=10):
+
+        """
+        Funkce pro převod pořadí křivek na textovou tabulku.
+
+        Parametry:
+            count (int): Počet křivek v tabulce.
+
+        Návratová hodnota:
+            str: Tabulka jako text.
+        """
+
+        width = max(len(label) for label in self.labels)
+        lines = [f'{"pořadí":>6}  {"křivka":<{width}}{"R²":>10}{"log SSE":>12}']
+        for rank, (label, r2, log_sse) in enumerate(self.ranked(count), start=1):
+            lines.append(f'{rank:>6}  {label:<{width}}{r2:>10.4f}{log_sse:>12.4f}')
+        return '\n'.join(lines)
+
+
+# Definice funkce pro exponenciální pokles
+def exponential(n0=PARAMETER_N_CONSTANT, rate=0.0575, onset=35.0, ages=AGE_GROUPS):
+
+    """
+    Funkce pro křivky exponenciálního poklesu počtu obnov po věku onset.
+
+    Parametry:
+        n0 (array-like): Počet obnov za rok před začátkem poklesu, tvar (...).
+        rate (array-like): Rychlost poklesu za rok, tvar (...).
+        onset (array-like): Věk začátku poklesu, tvar (...).
+        ages (array-like): Věky, pro které se křivka počítá, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Křivky parameter_n tvaru (..., A).
+    """
+
+    ages = np.asarray(ages, dtype=np.float64)
+    n0, rate, onset = (np.asarray(value, dtype=np.float64)[..., None] for value in (n0, rate, onset))
+    return n0 * np.exp(-rate * np.maximum(ages - onset, 0.0))
+
+
+# Definice funkce pro logistický pokles
+def logistic(n_young=PARAMETER_N_CONSTANT, n_old=5e11, midpoint=65.0, width=10.0, ages=AGE_GROUPS):
+
+    """
+    Funkce pro křivky logistického přechodu mezi počtem obnov v mládí a ve stáří.
+
+    Parametry:
+        n_young (array-like): Počet obnov za rok v mládí, tvar (...).
+        n_old (array-like): Počet obnov za rok ve stáří, tvar (...).
+        midpoint (array-like): Věk poloviny přechodu, tvar (...).
+        width (array-like): Šířka přechodu v letech, tvar (...).
+        ages (array-like): Věky, pro které se křivka počítá, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Křivky parameter_n tvaru (..., A).
+    """
+
+    ages = np.asarray(ages, dtype=np.float64)
+    n_young, n_old, midpoint, width = (np.asarray(value, dtype=np.float64)[..., None]
+                                       for value in (n_young, n_old, midpoint, width))
+    return n_old + (n_young - n_old) / (1 + np.exp((ages - midpoint) / width))
+
+
+# Definice funkce pro matici báze lomené čáry
+def _linear_basis(ages, knot_ages):
+    identity = np.eye(len(knot_ages))
+    return np.stack([np.interp(ages, knot_ages, column) for column in identity], axis=-1)
+
+
+# Definice funkce pro matici báze přirozeného kubického splinu
+def _spline_basis(ages, knot_ages):
+
+    """
+    Funkce pro matici B tvaru (A, M), pro kterou je spline přes hodnoty y v uzlech roven B @ y.
+
+    Druhé derivace v uzlech řeší tridiagonální soustavu s nulovými druhými derivacemi
+    v krajních uzlech (přirozený spline). Mimo rozsah uzlů je křivka konstantní.
+
+    Parametry:
+        ages (ndarray): Věky, pro které se křivka počítá, tvar (A,).
+        knot_ages (ndarray): Věky uzlů (rostoucí), tvar (M,).
+
+    Návratová hodnota:
+        ndarray: Matice báze, tvar (A, M).
+    """
+
+    m = len(knot_ages)
+    if m < 3:
+        return _linear_basis(ages, knot_ages)
+    h = np.diff(knot_ages)
+
+    # Soustava pro druhé derivace M_1..M_{m-2}: A M = D y
+    system = np.diag(2 * (h[:-1] + h[1:])) + np.diag(h[1:-1], 1) + np.diag(h[1:-1], -1)
+    rhs = np.zeros((m - 2, m))
+    rows = np.arange(m - 2)
+    rhs[rows, rows] = 6 / h[:-1]
+    rhs[rows, rows + 1] = -6 / h[:-1] - 6 / h[1:]
+    rhs[rows, rows + 2] = 6 / h[1:]
+    second = np.zeros((m, m))
+    second[1:-1] = np.linalg.solve(system, rhs)
+
+    # Vyhodnocení na intervalech mezi uzly
+    ages = np.clip(ages, knot_ages[0], knot_ages[-1])
+    i = np.clip(np.searchsorted(knot_ages, ages, side='right') - 1, 0, m - 2)
+    t = (ages - knot_ages[i]) / h[i]
+    basis = np.zeros((len(ages), m))
+    rows = np.arange(len(ages))
+    basis[rows, i] += 1 - t
+    basis[rows, i + 1] += t
+    factor = (h[i] ** 2 / 6)[:, None]
+    basis += factor * (((1 - t) ** 3 - (1 - t))[:, None] * second[i] + (t ** 3 - t)[:, None] * second[i + 1])
+    return basis
+
+
+# Definice funkce pro křivky zadané hodnotami v uzlech
+def knot_curve(knot_values, knot_ages, kind='spline', log=True, ages=AGE_GROUPS):
+
+    """
+    Funkce pro křivky parameter_n interpolované přes hodnoty v uzlech.
+
+    Parametry:
+        knot_values (array-like): Počet obnov za rok v uzlech, tvar (..., M).
+        knot_ages (array-like): Věky uzlů (rostoucí), tvar (M,).
+        kind (str): 'spline' (přirozený kubický spline) nebo 'linear' (lomená čára).
+        log (bool): Zda interpolovat logaritmus počtu obnov.
+        ages (array-like): Věky, pro které se křivka počítá, tvar (A,).
+
+    Návratová hodnota:
+        ndarray: Křivky parameter_n tvaru (..., A).
+    """
+
+    if kind not in ('spline', 'linear'):
+        raise ValueError(f"Neznámý typ interpolace {kind!r}, podporované jsou ('spline', 'linear')")
+    knot_ages = np.asarray(knot_ages, dtype=np.float64)
+    if np.any(np.diff(knot_ages) <= 0):
+        raise ValueError('Věky uzlů musí být rostoucí')
+    ages = np.asarray(ages, dtype=np.float64)
+    basis = _spline_basis(ages, knot_ages) if kind == 'spline' else _linear_basis(ages, knot_ages)
+    values = np.asarray(knot_values, dtype=np.float64)
+    if log:
+        return np.exp(np.log(values) @ basis.T)
+    return values @ basis.T
+
+
+# Parametrické rodiny křivek
+FAMILIES = {
+    'exponential': exponential,
+    'logistic': logistic,
+}
+
+
+# Definice funkce pro mřížku křivek jedné rodiny
+def family_grid(family, ages=AGE_GROUPS, **values):
+
+    """
+    Funkce pro křivky parametrické rodiny pro všechny kombinace zadaných hodnot parametrů.
+
+    Příklad:
+        curves, labels = family_grid('exponential', rate=np.linspace(0.02, 0.1, 50),
+                                     onset=[25, 30, 35, 40, 45])
+
+    Parametry:
+        family (str): Název rodiny z FAMILIES.
+        ages (array-like): Věky, pro které se křivky počítají, tvar (A,).
+        **values: Hodnoty parametrů rodiny (nezadané parametry mají výchozí hodnotu).
+
+    Návratová hodnota:
+        tuple: Křivky tvaru (K, A) a jejich popisky (K).
+    """
+
+    if family not in FAMILIES:
+        raise ValueError(f'Neznámá rodina {family!r}, podporované jsou {list(FAMILIES)}')
+    names = list(values)
+    grids = np.meshgrid(*(np.atleast_1d(np.asarray(values[name], dtype=np.float64)) for name in names),
+                        indexing='ij')
+    flat = {name: grid.reshape(-1) for name, grid in zip(names, grids)}
+    curves = FAMILIES[family](ages=ages, **flat)
+    count = len(curves) if curves.ndim == 2 else 1
+    labels = [f'{family}(' + ', '.join(f'{name}={flat[name][k]:.4g}' for name in names) + ')'
+              for k in range(count)]
+    return np.atleast_2d(curves), labels
+
+
+# Definice funkce pro porovnání křivek
+def compare_curves(curves, observed, labels=None, p_c=P_CONSTANT, q=Q, age_groups=AGE_GROUPS,
+                   generation=GENERATION):
+
+    """
+    Funkce pro vyhodnocení modelu pro všechny křivky parameter_n najednou a jejich seřazení.
+
+    Parametry:
+        curves (array-like): Křivky parameter_n, tvar (K, A).
+        observed (array-like): Pozorované hodnoty P(cancer)/5 let (%), tvar (A,).
+        labels (list): Popisky křivek (None = 'curve 0', 'curve 1', ...).
+        p_c (float): Pravděpodobnost vzniku rakoviny během jednoho dělení.
+        q (int): Práh počtu akumulovaných mutací.
+        age_groups (array-like): Intervaly věku v letech, tvar (A,).
+        generation (array-like): Průměrný počet mutací pro každou buňku, tvar (A,).
+
+    Návratová hodnota:
+        CurveComparison: Predikce, míry shody a pořadí křivek.
+    """
+
+    curves = np.atleast_2d(np.asarray(curves, dtype=np.float64))
+    observed = np.asarray(observed, dtype=np.float64)
+    if labels is None:
+        labels = [f'curve {k}' for k in range(len(curves))]
+    if len(labels) != len(curves):
+        raise ValueError('Počet popisků musí odpovídat počtu křivek')
+
+    predicted = evaluate(age_groups, generation, curves, p_c, q).p_cancer_5_years
+    r2 = r2_score(observed, predicted)
+    sse = np.sum((predicted - observed) ** 2, axis=-1)
+    with np.errstate(divide='ignore'):
+        log_sse = np.sum((np.log(predicted) - np.log(observed)) ** 2, axis=-1)
+    return CurveComparison(labels=list(labels), curves=curves, p_cancer_5_years=predicted, r2=r2,
+                           sse=sse, log_sse=log_sse,
+                           order=np.argsort(-np.nan_to_num(r2, nan=-np.inf), kind='stable'))